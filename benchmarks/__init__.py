@@ -0,0 +1,76 @@
+import gc
+import statistics
+import time
+
+import solaredge_modbus
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    # Register a benchmark. The decorated generator sets up the case,
+    # yields the operation to time and the number of items it handles per
+    # call, and cleans up when it is closed.
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def measure(operation, items=1, repeat=5, duration=0.2):
+    # Calibrate the number of calls so each sample takes about `duration`
+    operation()
+    number = 1
+    elapsed = 0
+
+    while True:
+        start = time.perf_counter()
+
+        for _ in range(number):
+            operation()
+
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= duration / 4 or number >= 1 << 20:
+            break
+
+        number *= 4
+
+    number = max(1, int(number * duration / max(elapsed, 1e-9)))
+    samples = []
+    collecting = gc.isenabled()
+    gc.disable()
+
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+
+            for _ in range(number):
+                operation()
+
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if collecting:
+            gc.enable()
+
+    return {
+        "calls": number * repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "items": items,
+        "per_item": min(samples) / items
+    }
+
+
+def offline_devices():
+    # An inverter with a meter and a battery on a connection that is never
+    # opened, for benchmarks that do not read
+    inverter = solaredge_modbus.Inverter(host="benchmark.invalid", port=0)
+    meter = solaredge_modbus.Meter(offset=0, parent=inverter)
+    battery = solaredge_modbus.Battery(offset=0, parent=inverter)
+
+    return inverter, [inverter, meter, battery]
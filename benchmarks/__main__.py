@@ -0,0 +1,67 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import pymodbus
+
+from . import BENCHMARKS, measure
+from . import plan, decode, transport, poll, startup, export  # noqa: F401
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(prog="python -m benchmarks")
+    argparser.add_argument("names", type=str, nargs="*", help="Run only benchmarks starting with these names")
+    argparser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    argparser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    argparser.add_argument("--duration", type=float, default=0.2, help="Duration of a sample")
+    argparser.add_argument("--units", type=int, default=4, help="Simulated inverters in a fleet")
+    argparser.add_argument("--latency", type=float, default=0, help="Simulated response delay")
+    argparser.add_argument("--timeout", type=int, default=1, help="Connection timeout")
+    args = argparser.parse_args()
+
+    results = {}
+
+    for name, setup in BENCHMARKS.items():
+        if args.names and not any(name.startswith(n) for n in args.names):
+            continue
+
+        case = setup(args)
+
+        try:
+            operation, items = next(case)
+            results[name] = measure(operation, items, args.repeat, args.duration)
+        finally:
+            case.close()
+
+        result = results[name]
+        print(f"{name:<24} {result['min'] * 1e6:12.1f} us/call {result['per_item'] * 1e6:10.2f} us/item  (median {result['median'] * 1e6:.1f}, {result['calls']} calls)", file=sys.stderr)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pymodbus": pymodbus.__version__,
+        "options": vars(args),
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
@@ -0,0 +1,79 @@
+from pymodbus.constants import Endian
+from pymodbus.payload import BinaryPayloadDecoder
+
+from solaredge_modbus.simulator import SimulatedUnit
+
+from . import benchmark, offline_devices
+
+
+@benchmark("decode.value")
+def decode_value(options):
+    # One BinaryPayloadDecoder per register, as read() does
+    inverter, devices = offline_devices()
+    unit = SimulatedUnit(1, meters=1, batteries=1, seed=1)
+    cases = []
+
+    for device in devices:
+        for address, length, rtype, dtype, vtype, label, fmt, batch in device.registers.values():
+            wordorder = Endian.LITTLE if address in device.little_endian_registers else device.wordorder
+            cases.append((device, unit.read(address, length), length, dtype, vtype, wordorder))
+
+    def operation():
+        for device, registers, length, dtype, vtype, wordorder in cases:
+            decoder = BinaryPayloadDecoder.fromRegisters(registers, byteorder=Endian.BIG, wordorder=wordorder)
+            device._decode_value(decoder, length, dtype, vtype)
+
+    try:
+        yield operation, len(cases)
+    finally:
+        inverter.close()
+
+
+@benchmark("decode.block")
+def decode_block(options):
+    # The blocks of the read_all() plans, as read_all() decodes them
+    inverter, devices = offline_devices()
+    unit = SimulatedUnit(1, meters=1, batteries=1, seed=1)
+    cases = []
+
+    for device in devices:
+        for block in device._read_plan():
+            cases.append((block, unit.read(block.address + device.offset, block.length)))
+
+    def operation():
+        for block, registers in cases:
+            block.decode(registers)
+
+    try:
+        yield operation, sum(len(block.fields) for block, registers in cases)
+    finally:
+        inverter.close()
+
+
+@benchmark("decode.bulk")
+def decode_bulk(options):
+    # The same blocks, a thousand reads of each decoded in one go
+    import numpy
+
+    inverter, devices = offline_devices()
+    unit = SimulatedUnit(1, meters=1, batteries=1, seed=1)
+    cases = []
+
+    for device in devices:
+        for block in device._read_plan():
+            registers = []
+
+            for t in range(1000):
+                unit.refresh(force=True)
+                registers.append(unit.read(block.address + device.offset, block.length))
+
+            cases.append((block, numpy.array(registers, dtype=numpy.uint16)))
+
+    def operation():
+        for block, registers in cases:
+            block.decode_bulk(registers)
+
+    try:
+        yield operation, sum(len(block.fields) * len(registers) for block, registers in cases)
+    finally:
+        inverter.close()
@@ -0,0 +1,57 @@
+import solaredge_modbus
+
+from solaredge_modbus.simulator import SimulatedUnit
+
+from . import benchmark, offline_devices
+
+
+def _readings():
+    # Scaled read_all() values of every device, decoded from simulated
+    # registers
+    inverter, devices = offline_devices()
+    unit = SimulatedUnit(1, meters=1, batteries=1, seed=1)
+    readings = []
+
+    for device in devices:
+        values = {}
+
+        for block in device._read_plan():
+            values.update(block.decode(unit.read(block.address + device.offset, block.length)))
+
+        readings.append((device, device._scale(values)))
+
+    return inverter, readings
+
+
+@benchmark("export.lineprotocol")
+def export_lineprotocol(options):
+    inverter, readings = _readings()
+    encoder = solaredge_modbus.LineProtocol()
+
+    def operation():
+        encoder.add_all(readings)
+        encoder.payload()
+
+    try:
+        yield operation, sum(len(values) for device, values in readings)
+    finally:
+        inverter.close()
+
+
+@benchmark("export.pipeline")
+def export_pipeline(options):
+    # Handing a poll of line protocol to a running pipeline, as the poll
+    # loop does
+    inverter, readings = _readings()
+    encoder = solaredge_modbus.LineProtocol()
+    pipeline = solaredge_modbus.ExportPipeline(lambda batch: None, flush_interval=0.01).start()
+
+    def operation():
+        encoder.add_all(readings)
+        pipeline.put(encoder.payload())
+
+    try:
+        yield operation, 1
+    finally:
+        pipeline.stop()
+        inverter.close()
@@ -0,0 +1,66 @@
+import solaredge_modbus
+
+from . import benchmark, offline_devices
+
+
+@benchmark("plan.read_all")
+def read_all_plan(options):
+    inverter, devices = offline_devices()
+
+    def operation():
+        solaredge_modbus.SolarEdge._read_plans.clear()
+
+        for device in devices:
+            device._read_plan()
+
+    try:
+        yield operation, len(devices)
+    finally:
+        inverter.close()
+
+
+@benchmark("plan.read_all.cached")
+def read_all_plan_cached(options):
+    inverter, devices = offline_devices()
+
+    def operation():
+        for device in devices:
+            device._read_plan()
+
+    try:
+        yield operation, len(devices)
+    finally:
+        inverter.close()
+
+
+@benchmark("plan.read_fields")
+def read_fields_plan(options):
+    inverter, devices = offline_devices()
+    groups = [(device, frozenset(device.register_groups["power"])) for device in devices]
+
+    def operation():
+        solaredge_modbus.SolarEdge._read_covers.clear()
+
+        for device, keys in groups:
+            device._read_cover(keys)
+
+    try:
+        yield operation, len(groups)
+    finally:
+        inverter.close()
+
+
+@benchmark("construct.devices")
+def construct_devices(options):
+    # A meter and a battery on an existing connection, as discover() and
+    # large fleets create them
+    inverter = solaredge_modbus.Inverter(host="benchmark.invalid", port=0)
+
+    def operation():
+        solaredge_modbus.Meter(offset=1, parent=inverter).close()
+        solaredge_modbus.Battery(offset=1, parent=inverter).close()
+
+    try:
+        yield operation, 2
+    finally:
+        inverter.close()
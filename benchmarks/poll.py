@@ -0,0 +1,82 @@
+import asyncio
+
+import solaredge_modbus
+
+from solaredge_modbus.simulator import Simulator
+
+from . import benchmark
+
+
+def _simulator(options):
+    simulator = Simulator(latency=options.latency, seed=1)
+
+    for unit in range(1, options.units + 1):
+        simulator.add_unit(unit, meters=1, batteries=1)
+
+    return simulator
+
+
+def _fleet(options, simulator):
+    inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port, timeout=options.timeout)
+    devices = []
+
+    for unit in range(1, options.units + 1):
+        device = inverter if unit == 1 else solaredge_modbus.Inverter(parent=inverter, unit=unit)
+        devices += [device, solaredge_modbus.Meter(offset=0, parent=device, unit=unit), solaredge_modbus.Battery(offset=0, parent=device, unit=unit)]
+
+    return devices
+
+
+@benchmark("poll.fleet.serial")
+def fleet_serial(options):
+    with _simulator(options) as simulator:
+        devices = _fleet(options, simulator)
+
+        def operation():
+            for device in devices:
+                device.read_all()
+
+        try:
+            yield operation, len(devices)
+        finally:
+            for device in devices:
+                device.close()
+
+
+@benchmark("poll.fleet.pipelined")
+def fleet_pipelined(options):
+    with _simulator(options) as simulator:
+        devices = _fleet(options, simulator)
+
+        def operation():
+            solaredge_modbus.read_all_pipelined(devices)
+
+        try:
+            yield operation, len(devices)
+        finally:
+            for device in devices:
+                device.close()
+
+
+@benchmark("poll.fleet.asyncio")
+def fleet_asyncio(options):
+    # One connection per inverter, polled concurrently
+    with _simulator(options) as simulator:
+        loop = asyncio.new_event_loop()
+        devices = []
+
+        for unit in range(1, options.units + 1):
+            inverter = solaredge_modbus.AsyncInverter(host=simulator.host, port=simulator.port, timeout=options.timeout, unit=unit)
+            loop.run_until_complete(inverter.connect())
+            devices += [inverter, solaredge_modbus.AsyncMeter(offset=0, parent=inverter, unit=unit), solaredge_modbus.AsyncBattery(offset=0, parent=inverter, unit=unit)]
+
+        async def poll():
+            await asyncio.gather(*(device.read_all() for device in devices))
+
+        try:
+            yield lambda: loop.run_until_complete(poll()), len(devices)
+        finally:
+            for device in devices:
+                device.close()
+
+            loop.close()
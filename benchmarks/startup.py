@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from . import benchmark
+
+
+def _interpreter(code):
+    # A fresh interpreter per call, with the search path of this one, so
+    # the import of the package is measured as a cron job would see it
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+
+    def operation():
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+    yield operation, 1
+
+
+@benchmark("startup.python")
+def startup_python(options):
+    yield from _interpreter("pass")
+
+
+@benchmark("startup.import")
+def startup_import(options):
+    yield from _interpreter("import solaredge_modbus")
+
+
+@benchmark("startup.inverter.tcp")
+def startup_inverter_tcp(options):
+    yield from _interpreter("import solaredge_modbus; solaredge_modbus.Inverter(host='benchmark.invalid', port=0).close()")
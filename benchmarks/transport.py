@@ -0,0 +1,48 @@
+import solaredge_modbus
+
+from solaredge_modbus.simulator import Simulator
+
+from . import benchmark
+
+
+def _request(options, framer, length):
+    # Round trip of a single read against a simulator without latency, the
+    # overhead of the Modbus stack and the local socket
+    simulator = Simulator(framer=framer, seed=1)
+
+    with simulator:
+        if framer == "tcp":
+            inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port, timeout=options.timeout)
+        else:
+            inverter = solaredge_modbus.Inverter(device=simulator.device, timeout=options.timeout)
+
+        inverter.connect()
+
+        def operation():
+            if not inverter._read_registers(solaredge_modbus.registerType.HOLDING, 0x9c40, length):
+                raise IOError("read failed")
+
+        try:
+            yield operation, 1
+        finally:
+            inverter.close()
+
+
+@benchmark("transport.tcp.1")
+def tcp_short(options):
+    yield from _request(options, "tcp", 1)
+
+
+@benchmark("transport.tcp.125")
+def tcp_long(options):
+    yield from _request(options, "tcp", 125)
+
+
+@benchmark("transport.rtu.1")
+def rtu_short(options):
+    yield from _request(options, "rtu", 1)
+
+
+@benchmark("transport.rtu.125")
+def rtu_long(options):
+    yield from _request(options, "rtu", 125)
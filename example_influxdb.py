@@ -9,13 +9,11 @@ from influxdb_client .client.write_api import SYNCHRONOUS
 import requests
 import solaredge_modbus
 
-previous_values = {}
+line_protocol = solaredge_modbus.LineProtocol()
 
 def fetchData(inverter):
     values = {}
-    values = inverter.read_all()
-
-    current_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    values = inverter.read_all(scaled=True)
 
     if not values: # this is a daemon, try to keep going
     # FIXME: add a logged error
@@ -23,59 +21,18 @@ def fetchData(inverter):
     if not values["c_model"]:
         return
 
-    inverter_data = {
-        "measurement": "inverter",
-        "tags": {
-            "c_manufacturer": values["c_manufacturer"],
-            "c_model": values["c_model"],
-            "c_version": values["c_version"],
-            "c_serialnumber": values["c_serialnumber"],
-            "c_deviceaddress": values["c_deviceaddress"],
-            "c_sunspec_did": values["c_sunspec_did"]
-        },
-        "time": current_time,
-        "fields": {}
-    }
-
     if ( ( int(values["status"]) <= 2 ) and ( int(values["status"]) >= 0 ) ):
         if( ( int(float(values["temperature"])) == int(0) ) or ( int(float(values["l1_voltage"])) == int(0) ) ):
         # ignore what looks like a periodic reboot
             return
-    for k, v in values.items():
-        if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-            k_split = k.split("_")
-            scale = 0
-
-            if f"{k_split[len(k_split) - 1]}_scale" in values:
-                scale = values[f"{k_split[len(k_split) - 1]}_scale"]
-            elif f"{k}_scale" in values:
-                scale = values[f"{k}_scale"]
-
-            inverter_data["fields"].update({k: float(v * (10 ** scale))})
-
-    json_body.append(inverter_data)
+    line_protocol.add(inverter, values)
 
     #meters = inverter.meters()
     #batteries = inverter.batteries()
     meters = {}
     batteries = {}
     for meter, params in meters.items():
-        meter_values = params.read_all()
-
-        meter_data = {
-            "measurement": "meter",
-            "tags": {
-                "c_manufacturer": meter_values["c_manufacturer"],
-                "c_model": meter_values["c_model"],
-                "c_option": meter_values["c_option"],
-                "c_version": meter_values["c_version"],
-                "c_serialnumber": meter_values["c_serialnumber"],
-                "c_deviceaddress": meter_values["c_deviceaddress"],
-                "c_sunspec_did": meter_values["c_sunspec_did"]
-            },
-            "time": current_time,
-            "fields": {}
-        }
+        meter_values = params.read_all(scaled=True)
 
         if ( ( int(meter_values["status"]) <= 2 ) and ( int(meter_values["status"]) >= 0 ) ):
             if( ( int(float(meter_values["temperature"])) == int(0) ) or ( int(float(meter_values["l1_voltage"])) == int(0) ) ):
@@ -86,21 +43,7 @@ def fetchData(inverter):
         #elif ( ! (isinstance(meter_values["l1_voltage"], int) or isinstance(meter_values["l1_voltage"], float)):
         #    continue
         #elif ( (values["c_serialnumber"] in previous_values.keys()) and  ):
-        for k, v in meter_values.items():
-            if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-                k_split = k.split("_")
-                scale = 0
-
-                if f"{k_split[len(k_split) - 1]}_scale" in meter_values:
-                    scale = meter_values[f"{k_split[len(k_split) - 1]}_scale"]
-                elif f"{k}_scale" in meter_values:
-                    scale = meter_values[f"{k}_scale"]
-
-                meter_data["fields"].update({k: float(v * (10 ** scale))})
-
-        json_body.append(meter_data)
-        # cache previous values, so we can skip if
-        previous_values[meter_data["tags"]["c_serialnumber"]] = meter_data
+        line_protocol.add(params, meter_values)
 
 
 
@@ -112,26 +55,7 @@ def fetchData(inverter):
         if not battery_values["c_model"]:
             continue
 
-        battery_data = {
-            "measurement": "battery",
-            "tags": {
-                "c_manufacturer": battery_values["c_manufacturer"],
-                "c_model": battery_values["c_model"],
-                "c_version": battery_values["c_version"],
-                "c_serialnumber": battery_values["c_serialnumber"],
-                "c_deviceaddress": battery_values["c_deviceaddress"],
-                "c_sunspec_did": battery_values["c_sunspec_did"]
-            },
-            "time": current_time,
-            "fields": {}
-        }
-
-        for k, v in battery_values.items():
-            if isinstance(v, int) or isinstance(v, float):
-                battery_data["fields"].update({k: v})
-
-        json_body.append(battery_data)
-
+        line_protocol.add(params, battery_values)
 
 
 inverters = []
@@ -140,7 +64,7 @@ if __name__ == "__main__":
     argparser.add_argument("host", type=str, help="Modbus TCP address")
     argparser.add_argument("port", type=int, help="Modbus TCP port")
     argparser.add_argument("--timeout", type=int, default=1, help="Connection timeout")
-    argparser.add_argument("--unit", type=str, default=1, help="Modbus device address")
+    argparser.add_argument("--unit", type=str, default="1", help="Modbus device addresses, comma separated, or \"scan\"")
     argparser.add_argument("--interval", type=int, default=10, help="Update interval")
     argparser.add_argument("--influx_host", type=str, default="localhost", help="InfluxDB host")
     argparser.add_argument("--influx_port", type=int, default=8086, help="InfluxDB port")
@@ -148,6 +72,7 @@ if __name__ == "__main__":
     argparser.add_argument("--influx_user", type=str, help="InfluxDB username")
     argparser.add_argument("--influx_pass", type=str, help="InfluxDB password")
     argparser.add_argument("--influx_token", type=str, help="InfluxDB auth token")
+    argparser.add_argument("--spool", type=str, help="Spool file for readings InfluxDB did not take")
     args = argparser.parse_args()
 
     try:
@@ -175,26 +100,36 @@ if __name__ == "__main__":
         print(f"database connection failed: {args.influx_host,}:{args.influx_port}/{args.influx_db}")
         sys.exit()
 
-    unit_list = args.unit.split(",")
-    master_unit = unit_list.pop(0)
-    master_inverter = solaredge_modbus.Inverter(
-        host=args.host,
-        port=args.port,
-        timeout=args.timeout,
-        unit=int(master_unit)
-    )
-    inverters.append(master_inverter)
-    for unitnum in unit_list:
-        secondary_inverter = solaredge_modbus.Inverter(parent=master_inverter, unit=int(unitnum))
-        inverters.append(secondary_inverter)
+    # Writes happen in the background, so a slow or unreachable database
+    # does not hold up polling
+    pipeline = solaredge_modbus.ExportPipeline(
+        lambda batch: influx_write_api.write(bucket=args.influx_db, record=batch),
+        spool=args.spool
+    ).start()
+
+    if args.unit == "scan":
+        inverters = solaredge_modbus.scan(host=args.host, port=args.port, timeout=args.timeout)
+        print(f"found units: {[inverter.unit for inverter in inverters]}")
+    else:
+        unit_list = args.unit.split(",")
+        master_unit = unit_list.pop(0)
+        master_inverter = solaredge_modbus.Inverter(
+            host=args.host,
+            port=args.port,
+            timeout=args.timeout,
+            unit=int(master_unit)
+        )
+        inverters.append(master_inverter)
+        for unitnum in unit_list:
+            secondary_inverter = solaredge_modbus.Inverter(parent=master_inverter, unit=int(unitnum))
+            inverters.append(secondary_inverter)
 
     while True:
         startTime = time.time()
-        json_body = []
         for inverter in inverters:
             fetchData(inverter)
-        #client.write_points(json_body)
-        influx_write_api.write(bucket=args.influx_db, record=json_body)
+        if len(line_protocol):
+            pipeline.put(line_protocol.payload())
         sleep_interval = args.interval - (time.time() - startTime)
         if(sleep_interval > 0):
             time.sleep(sleep_interval)
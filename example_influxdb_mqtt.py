@@ -4,7 +4,6 @@ import argparse
 import sys
 import time
 import copy
-import re
 import math
 
 from influxdb_client import InfluxDBClient
@@ -16,40 +15,30 @@ import paho.mqtt.client as mqttClient
 import json
 
 previous_values = {}
+change_filters = {}
 
 mqtt_topic_prefix = "solaredge_test"
 
-unitclass_table = [ # order unfortunately matters
-    { "re": "voltage",     "class": "voltage",        "unit": "V" },
-    { "re": "current",     "class": "current",        "unit": "A" },
-    { "re": "reactive",    "class": "reactive_power", "unit": "VA" },
-    { "re": "apparent",    "class": "apparent_power", "unit": "VA" },
-    { "re": "factor",      "class": "power_factor",   "unit": "%" },
-    { "re": "efficiency",  "class": None,             "unit": "%" },
-    { "re": "power",       "class": "power",          "unit": "W" },
-    { "re": "temperature", "class": "temperature",    "unit": chr(176)+"C" },
-    { "re": "frequency",   "class": "frequency",      "unit": "Hz" },
-    { "re": "time",        "class": "duration",       "unit": "s" },
-]
-for idx,e in enumerate(unitclass_table):
-    e = unitclass_table[idx]
-    e["re"] = re.compile(e["re"])
-
-def ha_mqtt_devclass(name):
-    for e in unitclass_table:
-        if re.search(e["re"], name):
-            return e["class"]
-
-def ha_mqtt_devunit(name):
-    for e in unitclass_table:
-        if re.search(e["re"], name):
-            return e["unit"]
+# Discovery config is generated from the register maps and only
+# published when a device first shows up or its identity changes
+discovery = solaredge_modbus.HomeAssistantDiscovery(
+    state_prefix=mqtt_topic_prefix,
+    entities={
+        "efficiency": {"name": "Efficiency", "state_class": "measurement", "unit_of_measurement": "%"},
+        "retrieval_time": {"name": "Retrieval Time", "device_class": "duration", "state_class": "measurement", "unit_of_measurement": "s", "entity_category": "diagnostic"}
+    }
+)
+readings = []
 
 def fetchData(inverter):
     fetch_start_time = time.time()
 
+    # an inverter missing from the readings would lose its entities
+    reading = {}
+    readings.append((inverter, reading))
+
     values = {}
-    values = inverter.read_all()
+    values = inverter.read_all(scaled=True)
 
     current_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
@@ -86,16 +75,8 @@ def fetchData(inverter):
             print ("skipping periodic reboot")
             return
     for k, v in values.items():
-        if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-            k_split = k.split("_")
-            scale = 0
-
-            if f"{k_split[len(k_split) - 1]}_scale" in values:
-                scale = values[f"{k_split[len(k_split) - 1]}_scale"]
-            elif f"{k}_scale" in values:
-                scale = values[f"{k}_scale"]
-
-            inverter_data["fields"].update({ k: round( float(v * (10 ** scale)), 4 ) })
+        if isinstance(v, int) or isinstance(v, float):
+            inverter_data["fields"].update({ k: round( float(v), 4 ) })
 
     fields = inverter_data["fields"]
     fields["retrieval_time"] = round(time.time() - fetch_start_time, 6)
@@ -104,6 +85,14 @@ def fetchData(inverter):
     else:
         fields["efficiency"] = float(0)
 
+    reading.update(values, **fields)
+
+    # only publish when something moved past its deadband, or on the heartbeat
+    changed_fields = change_filters[inverter].filter(fields)
+    if not changed_fields:
+        print("no changes")
+        return
+
     device_mqtt_data = copy.deepcopy(inverter_data)
     device_mqtt_topic = "{0}/{1}".format(mqtt_topic_prefix, values['c_serialnumber'])
     device_mqtt_data = device_mqtt_data["fields"]
@@ -114,26 +103,9 @@ def fetchData(inverter):
     print("publishing {}: {}".format(device_mqtt_topic, json_string))
     mqttc.publish(device_mqtt_topic, json_string)
 
-    ha_entities = [ "l1_current", "l1_voltage", #FIXME: 3-phase needs l1, l2, l3
-        "power_apparent", "power_reactive", "power_factor", "power_ac",
-        "frequency", "efficiency",
-        "voltage_dc", "power_dc",
-        "temperature", "retrieval_time"]
-    for ha_entity in ha_entities:
-        device_mqtt_metadata_topic_prefix = "homeassistant/sensor/solaredge_" + values['c_serialnumber']
-        device_mqtt_metadata_topic = device_mqtt_metadata_topic_prefix + "/" + ha_entity + "/config"
-        device_mqtt_metadata = { "state_topic": device_mqtt_topic, "state_class": "measurement" }
-        device_mqtt_metadata["name"] = ha_entity
-        device_mqtt_metadata["device"] = { "name": "SolarEdge " + values['c_serialnumber'] }
-        device_mqtt_metadata["device"]["identifiers"] = "solaredge_" + values['c_serialnumber']
-        device_mqtt_metadata["device_class"] = ha_mqtt_devclass(ha_entity)
-        device_mqtt_metadata["unit_of_measurement"] = ha_mqtt_devunit(ha_entity)
-        device_mqtt_metadata["unique_id"] = "solaredge_" + values['c_serialnumber'] + "_" + ha_entity
-        device_mqtt_metadata["value_template"] = "{{ value_json."+ha_entity + " }}"
-        mqttc.publish(device_mqtt_metadata_topic, json.dumps(device_mqtt_metadata))
-
     #print(f"mqtt JSON data {mqtt_topic}")
     #print(json_string)
+    inverter_data["fields"] = changed_fields
     json_body.append(inverter_data)
 
 """
@@ -142,7 +114,7 @@ def fetchData(inverter):
     meters = {}
     batteries = {}
     for meter, params in meters.items():
-        meter_values = params.read_all()
+        meter_values = params.read_all(scaled=True)
 
         meter_data = {
             "measurement": "meter",
@@ -169,16 +141,8 @@ def fetchData(inverter):
         #    continue
         #elif ( (values["c_serialnumber"] in previous_values.keys()) and  ):
         for k, v in meter_values.items():
-            if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-                k_split = k.split("_")
-                scale = 0
-
-                if f"{k_split[len(k_split) - 1]}_scale" in meter_values:
-                    scale = meter_values[f"{k_split[len(k_split) - 1]}_scale"]
-                elif f"{k}_scale" in meter_values:
-                    scale = meter_values[f"{k}_scale"]
-
-                meter_data["fields"].update({k: float(v * (10 ** scale))})
+            if isinstance(v, int) or isinstance(v, float):
+                meter_data["fields"].update({k: float(v)})
 
         json_body.append(meter_data)
         # cache previous values, so we can skip if
@@ -243,6 +207,7 @@ if __name__ == "__main__":
     argparser.add_argument("--timeout", type=int, default=1, help="Connection timeout")
     argparser.add_argument("--unit", type=str, default=1, help="Modbus device address")
     argparser.add_argument("--interval", type=int, default=10, help="Update interval")
+    argparser.add_argument("--heartbeat", type=int, default=300, help="Publish unchanged values at least this often")
     argparser.add_argument("--influx_host", type=str, default="localhost", help="InfluxDB host")
     argparser.add_argument("--influx_port", type=int, default=8086, help="InfluxDB port")
     argparser.add_argument("--influx_db", type=str, default="solaredge", help="InfluxDB database")
@@ -296,13 +261,22 @@ if __name__ == "__main__":
     for unitnum in unit_list:
         secondary_inverter = solaredge_modbus.Inverter(parent=master_inverter, unit=int(unitnum))
         inverters.append(secondary_inverter)
+    for inverter in inverters:
+        change_filters[inverter] = solaredge_modbus.ChangeFilter(
+            inverter,
+            heartbeat=args.heartbeat,
+            deadbands={"retrieval_time": (math.inf, 0), "efficiency": (0.5, 0)}
+        )
 
     while True:
         start_time = time.time()
         json_body = []
+        readings = []
         for inverter in inverters:
             fetchData(inverter)
             mqttc.loop(timeout=0.1)
+        for topic, payload in discovery.messages(readings):
+            mqttc.publish(topic, payload, retain=True)
         #client.write_points(json_body)
         influx_write_api.write(bucket=args.influx_db, record=json_body)
         calc_sleep_interval = args.interval - (time.time() - start_time)
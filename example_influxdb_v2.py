@@ -22,6 +22,7 @@ if __name__ == "__main__":
     argparser.add_argument("--influx_org", type=str, help="InfluxDB organisation")
     argparser.add_argument("--influx_bucket", type=str, default="solaredge", help="InfluxDB bucket")
     argparser.add_argument("--influx_token", type=str, help="InfluxDB token")
+    argparser.add_argument("--spool", type=str, help="Spool file for readings InfluxDB did not take")
     args = argparser.parse_args()
 
     try:
@@ -41,75 +42,22 @@ if __name__ == "__main__":
         timeout=args.timeout,
         unit=args.unit
     )
+    line_protocol = solaredge_modbus.LineProtocol()
+    pipeline = solaredge_modbus.ExportPipeline(
+        lambda batch: influx.write(bucket=args.influx_bucket, record=batch),
+        spool=args.spool
+    ).start()
 
     while True:
         values = {}
-        values = inverter.read_all()
+        values = inverter.read_all(scaled=True)
         meters = inverter.meters()
         batteries = inverter.batteries()
 
-        json_body = []
-        current_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
-        inverter_data = {
-            "measurement": "inverter",
-            "tags": {
-                "c_manufacturer": values["c_manufacturer"],
-                "c_model": values["c_model"],
-                "c_version": values["c_version"],
-                "c_serialnumber": values["c_serialnumber"],
-                "c_deviceaddress": values["c_deviceaddress"],
-                "c_sunspec_did": values["c_sunspec_did"]
-            },
-            "time": current_time,
-            "fields": {}
-        }
-
-        for k, v in values.items():
-            if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-                k_split = k.split("_")
-                scale = 0
-
-                if f"{k_split[len(k_split) - 1]}_scale" in values:
-                    scale = values[f"{k_split[len(k_split) - 1]}_scale"]
-                elif f"{k}_scale" in values:
-                    scale = values[f"{k}_scale"]
-
-                inverter_data["fields"].update({k: float(v * (10 ** scale))})
-
-        json_body.append(inverter_data)
+        line_protocol.add(inverter, values)
 
         for meter, params in meters.items():
-            meter_values = params.read_all()
-
-            meter_data = {
-                "measurement": "meter",
-                "tags": {
-                    "c_manufacturer": meter_values["c_manufacturer"],
-                    "c_model": meter_values["c_model"],
-                    "c_option": meter_values["c_option"],
-                    "c_version": meter_values["c_version"],
-                    "c_serialnumber": meter_values["c_serialnumber"],
-                    "c_deviceaddress": meter_values["c_deviceaddress"],
-                    "c_sunspec_did": meter_values["c_sunspec_did"]
-                },
-                "time": current_time,
-                "fields": {}
-            }
-
-            for k, v in meter_values.items():
-                if (isinstance(v, int) or isinstance(v, float)) and "_scale" not in k:
-                    k_split = k.split("_")
-                    scale = 0
-
-                    if f"{k_split[len(k_split) - 1]}_scale" in meter_values:
-                        scale = meter_values[f"{k_split[len(k_split) - 1]}_scale"]
-                    elif f"{k}_scale" in meter_values:
-                        scale = meter_values[f"{k}_scale"]
-
-                    meter_data["fields"].update({k: float(v * (10 ** scale))})
-
-            json_body.append(meter_data)
+            line_protocol.add(params, params.read_all(scaled=True))
 
         for battery, params in batteries.items():
             battery_values = params.read_all()
@@ -117,25 +65,9 @@ if __name__ == "__main__":
             if not battery_values["c_model"]:
                 continue
 
-            battery_data = {
-                "measurement": "battery",
-                "tags": {
-                    "c_manufacturer": battery_values["c_manufacturer"],
-                    "c_model": battery_values["c_model"],
-                    "c_version": battery_values["c_version"],
-                    "c_serialnumber": battery_values["c_serialnumber"],
-                    "c_deviceaddress": battery_values["c_deviceaddress"],
-                    "c_sunspec_did": battery_values["c_sunspec_did"]
-                },
-                "time": current_time,
-                "fields": {}
-            }
-
-            for k, v in battery_values.items():
-                if isinstance(v, int) or isinstance(v, float):
-                    battery_data["fields"].update({k: v})
+            line_protocol.add(params, battery_values)
 
-            json_body.append(battery_data)
+        if len(line_protocol):
+            pipeline.put(line_protocol.payload())
 
-        influx.write(args.influx_db, org, json_body)
         time.sleep(args.interval)
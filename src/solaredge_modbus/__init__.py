@@ -1,17 +1,67 @@
 import enum
+import socket
+import struct
+import threading
 import time
 
+from types import MappingProxyType
+
 from pymodbus.constants import Endian
 from pymodbus.payload import BinaryPayloadBuilder
 from pymodbus.payload import BinaryPayloadDecoder
-from pymodbus.client import ModbusTcpClient
-from pymodbus.client import ModbusSerialClient
+from pymodbus.exceptions import ModbusException
+from pymodbus.pdu import ExceptionResponse
 from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_read_message import ReadInputRegistersResponse
+
+from .capture import Capture, CapturedBlock, Recorder, ReplayClient  # noqa: F401
+from .deadband import ChangeFilter, DEADBANDS  # noqa: F401
+from .export import ExportPipeline, Spool  # noqa: F401
+from .history import History  # noqa: F401
+from .homeassistant import HomeAssistantDiscovery  # noqa: F401
+from .lineprotocol import LineProtocol  # noqa: F401
+from .metrics import Metrics, METRICS  # noqa: F401
+from .retry import CircuitBreaker, RetryPolicy, RETRY_POLICY  # noqa: F401
+from .scheduler import Scheduler, ScheduledRead  # noqa: F401
+from .topology import TopologyCache  # noqa: F401
+from .values import NotImplementedValue, implemented, not_implemented  # noqa: F401
 
 
 RETRIES = 3
 TIMEOUT = 1
 UNIT = 1
+IDENTITY_TTL = 3600
+MAX_READ_LENGTH = 125
+TCP_REQUEST_OVERHEAD = 0.01
+TCP_REGISTER_COST = 0.00005
+RTU_TURNAROUND = 0.01
+BRIDGE_GAP_HYSTERESIS = 0.25
+PIPELINE_WINDOW = 16
+MBAP_MAX_LENGTH = 254
+SCAN_UNITS = range(1, 248)
+SCAN_TIMEOUT = 0.5
+SCAN_MIN_TIMEOUT = 0.05
+SCAN_TIMEOUT_FACTOR = 4
+SUNSPEC_ADDRESS = 0x9c40
+SUNSPEC_ID = b"SunS"
+
+
+def _asyncio():
+    # Only the async devices need asyncio, which is slow to import
+    import asyncio
+
+    return asyncio
+
+
+def __getattr__(name):
+    # The pymodbus clients used to be imported with the package, keep them
+    # reachable as attributes without importing them up front
+    if name in ("ModbusTcpClient", "ModbusSerialClient", "AsyncModbusTcpClient", "AsyncModbusSerialClient"):
+        import pymodbus.client
+
+        return getattr(pymodbus.client, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class sunspecDID(enum.Enum):
@@ -174,6 +224,8 @@ STOREDGE_CHARGE_DISCHARGE_MODE = {
     7: "Maximize self consumption",
 }
 
+SCALE_FACTORS = {scale: 10.0 ** scale for scale in range(-10, 11)}
+
 METER_REGISTER_OFFSETS = [
     0x0,
     0xae,
@@ -186,6 +238,393 @@ BATTERY_REGISTER_OFFSETS = [
 ]
 
 
+class _Connection:
+
+    __slots__ = ("key", "client", "lock", "async_lock", "references", "cost", "label", "breakers")
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.lock = threading.RLock()
+        self.async_lock = None
+        self.references = 0
+        self.cost = None
+        self.label = None
+        self.breakers = {}
+
+    def __repr__(self):
+        return f"_Connection({self.key}, references={self.references})"
+
+
+class ConnectionRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    def __len__(self):
+        return len(self._connections)
+
+    def acquire(self, key, factory):
+        # Devices with the same key share a single client, and must hold the
+        # connection lock for the duration of each Modbus transaction. A key
+        # of None always creates a private, unregistered connection.
+        with self._lock:
+            connection = self._connections.get(key) if key is not None else None
+
+            if connection is None:
+                connection = _Connection(key, factory())
+
+                if key is not None:
+                    self._connections[key] = connection
+
+            connection.references += 1
+
+        return connection
+
+    def retain(self, connection):
+        with self._lock:
+            connection.references += 1
+
+        return connection
+
+    def release(self, connection):
+        with self._lock:
+            if connection.references <= 0:
+                return
+
+            connection.references -= 1
+
+            if connection.references:
+                return
+
+            if self._connections.get(connection.key) is connection:
+                del self._connections[connection.key]
+
+        with connection.lock:
+            connection.client.close()
+
+
+CONNECTIONS = ConnectionRegistry()
+
+
+STRUCT_FORMATS = {
+    registerDataType.UINT16: "H",
+    registerDataType.UINT32: "I",
+    registerDataType.UINT64: "Q",
+    registerDataType.INT16: "h",
+    registerDataType.ACC32: "I",
+    registerDataType.FLOAT32: "f",
+    registerDataType.SEFLOAT: "f",
+    registerDataType.INT32: "i"
+}
+
+
+def _notimplemented(dtype):
+    # The not implemented pattern of a register type as it decodes, which
+    # for signed integers is the negative number with the same bits
+    pattern = SUNSPEC_NOTIMPLEMENTED[dtype.name]
+
+    if dtype not in STRUCT_FORMATS:
+        return pattern
+
+    code = STRUCT_FORMATS[dtype]
+    return struct.unpack(f">{code}", pattern.to_bytes(struct.calcsize(code), "big"))[0]
+
+
+def _request_result(result, response_type, length):
+    if isinstance(result, response_type):
+        return "ok" if len(result.registers) == length else "short"
+    if isinstance(result, ExceptionResponse):
+        # Acknowledge and slave device busy ask to try again later
+        return "busy" if result.exception_code in (5, 6) else "exception"
+
+    return "error"
+
+
+class _ReadBlock:
+
+    __slots__ = ("rtype", "address", "length", "fields", "batch", "_order", "_pack", "_unpack", "_decoders", "_dtype")
+
+    def __init__(self, rtype, address, length, fields, little_endian=(), batch=None):
+        self.rtype = rtype
+        self.address = address
+        self.length = length
+        self.fields = fields
+        self.batch = batch
+
+        # Build a single big endian struct format covering the whole block,
+        # with pad bytes for gaps. Fields using little endian word order get
+        # their words reversed up front so the same format applies to them.
+        order = list(range(length))
+        fmt = ">"
+        position = 0
+        decoders = []
+
+        for key, offset, field_length, dtype, vtype in fields:
+            if offset < position:
+                raise ValueError(f"overlapping register {key} at offset {offset}")
+            if offset > position:
+                fmt += f"{(offset - position) * 2}x"
+
+            if dtype == registerDataType.STRING:
+                fmt += f"{field_length * 2}s"
+                position = offset + field_length
+            elif dtype in STRUCT_FORMATS:
+                code = STRUCT_FORMATS[dtype]
+                words = struct.calcsize(code) // 2
+                fmt += code
+                position = offset + words
+
+                if key in little_endian and words > 1:
+                    order[offset:offset + words] = reversed(order[offset:offset + words])
+            else:
+                raise NotImplementedError(dtype)
+
+            decoders.append((key, dtype == registerDataType.STRING, _notimplemented(dtype), vtype, not_implemented(vtype)))
+
+        self._order = None if order == list(range(length)) else tuple(order)
+        self._pack = struct.Struct(f">{length}H")
+        self._unpack = struct.Struct(fmt)
+        self._decoders = tuple(decoders)
+        self._dtype = None
+
+    def __repr__(self):
+        return f"_ReadBlock({self.rtype}, address={hex(self.address)}, length={self.length}, fields={len(self.fields)})"
+
+    def decode(self, registers):
+        if self._order:
+            registers = [registers[i] for i in self._order]
+
+        results = {}
+        values = self._unpack.unpack_from(self._pack.pack(*registers))
+
+        for (key, is_string, notimplemented, vtype, missing), value in zip(self._decoders, values):
+            if is_string:
+                value = value.decode(encoding="utf-8", errors="ignore").replace("\x00", "").rstrip()
+
+            if value == notimplemented or value != value:
+                results[key] = missing
+            else:
+                results[key] = vtype(value)
+
+        return results
+
+    def decode_bulk(self, registers):
+        # Decode many reads of the block at once, one per row of a 2-D
+        # array, into a column per field. A structured dtype overlays the
+        # fields on the raw big endian words. Numbers come out as float64,
+        # NaN where the register holds the SunSpec not implemented pattern.
+        import numpy
+
+        if self._dtype is None:
+            self._dtype = numpy.dtype({
+                "names": [key for key, offset, length, dtype, vtype in self.fields],
+                "formats": [
+                    f"S{length * 2}" if dtype == registerDataType.STRING else f">{STRUCT_FORMATS[dtype]}"
+                    for key, offset, length, dtype, vtype in self.fields
+                ],
+                "offsets": [offset * 2 for key, offset, length, dtype, vtype in self.fields],
+                "itemsize": self.length * 2
+            })
+
+        registers = numpy.asarray(registers, dtype=numpy.uint16).reshape(-1, self.length)
+
+        if self._order:
+            registers = registers[:, self._order]
+
+        rows = numpy.ascontiguousarray(registers, dtype=">u2").view(self._dtype).reshape(-1)
+        columns = {}
+
+        for key, offset, length, dtype, vtype in self.fields:
+            column = rows[key]
+
+            if dtype == registerDataType.STRING:
+                columns[key] = numpy.array(
+                    [value.decode(encoding="utf-8", errors="ignore").replace("\x00", "").rstrip() for value in column],
+                    dtype=object
+                )
+                continue
+
+            # Compare bit patterns, so signed and float registers are
+            # masked too
+            values = column.astype(numpy.float64)
+            values[column.view(f">u{column.dtype.itemsize}") == SUNSPEC_NOTIMPLEMENTED[dtype.name]] = numpy.nan
+
+            if vtype is int and column.dtype.kind == "f":
+                values = numpy.trunc(values)
+
+            columns[key] = values
+
+        return columns
+
+
+def _compile_block(registers, rtype, offset=0, wordorder=Endian.BIG, little_endian_registers=(), batch=None):
+    # Block addresses are stored relative to the device offset, and each
+    # field records its position inside the block, so a block can be shared
+    # by every instance of a device class.
+    start = min(v[0] for k, v in registers)
+    end = max(v[0] + v[1] for k, v in registers)
+    fields = tuple(
+        (k, v[0] - start, v[1], v[3], v[4])
+        for k, v in sorted(registers, key=lambda r: r[1][0])
+    )
+    little_endian = {
+        k for k, v in registers
+        if wordorder == Endian.LITTLE or v[0] in little_endian_registers
+    }
+
+    return _ReadBlock(rtype, start - offset, end - start, fields, little_endian, batch)
+
+
+def _compile_cover(registers, rtype, offset=0, wordorder=Endian.BIG, little_endian_registers=(), bridge_gap=MAX_READ_LENGTH, max_length=MAX_READ_LENGTH, batch=None):
+    # Split the registers into contiguous requests of at most max_length,
+    # minimising the total cost of the requests. With costs normalised to
+    # one per register, a request costs bridge_gap plus its length: reading
+    # a gap of more than bridge_gap registers is slower than sending a
+    # second request. Solved exactly by dynamic programming over the
+    # registers in address order.
+    registers = sorted(((k, v) for k, v in registers.items() if v[2] == rtype), key=lambda r: r[1][0])
+    best = [(0, 0)] + [None] * len(registers)
+    split = [0] * (len(registers) + 1)
+
+    for j in range(1, len(registers) + 1):
+        end = 0
+
+        for i in range(j - 1, -1, -1):
+            address, length = registers[i][1][0], registers[i][1][1]
+            end = max(end, address + length)
+
+            if end - address > max_length:
+                break
+
+            cost = (best[i][0] + bridge_gap + end - address, best[i][1] + 1)
+
+            if best[j] is None or cost < best[j]:
+                best[j] = cost
+                split[j] = i
+
+    blocks = []
+    j = len(registers)
+
+    while j:
+        blocks.append(_compile_block(registers[split[j]:j], rtype, offset, wordorder, little_endian_registers, batch))
+        j = split[j]
+
+    return tuple(reversed(blocks))
+
+
+def _compile_read_plan(registers, rtype, offset=0, wordorder=Endian.BIG, little_endian_registers=(), bridge_gap=MAX_READ_LENGTH, identity_batch=None, identity_probe=()):
+    # The identity batch is planned on its own so it can be cached, the rest
+    # of the map, and the identity registers that are probed on every read,
+    # is covered by cost. So are those between the probed registers, which
+    # the probe reads anyway. Blocks keep the order of the batches of their
+    # registers, so read_all() returns keys in register map order.
+    probed = [v for k, v in registers.items() if k in identity_probe]
+    start = min((v[0] for v in probed), default=0)
+    end = max((v[0] + v[1] for v in probed), default=0)
+    identity = {
+        k: v for k, v in registers.items()
+        if identity_batch is not None and v[7] == identity_batch and not start <= v[0] < end
+    }
+    measurements = {k: v for k, v in registers.items() if k not in identity}
+    blocks = _compile_cover(identity, rtype, offset, wordorder, little_endian_registers, bridge_gap, batch=identity_batch)
+    blocks += _compile_cover(measurements, rtype, offset, wordorder, little_endian_registers, bridge_gap)
+
+    return tuple(sorted(
+        blocks,
+        key=lambda block: (min(registers[field[0]][7] for field in block.fields), block.address)
+    ))
+
+
+class LinkCost:
+
+    def __init__(self, request_overhead, register_cost, adaptive=True, decay=0.98):
+        self.request_overhead = request_overhead
+        self.register_cost = register_cost
+        self.adaptive = adaptive
+        self.decay = decay
+
+        self._n = self._x = self._y = self._xx = self._xy = 0.0
+        self._bridge_gap = None
+
+        # Shared by every device on a connection, which observe requests
+        # outside the connection lock
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"LinkCost(request_overhead={self.request_overhead:.6f}, register_cost={self.register_cost:.6f}, bridge_gap={self.bridge_gap})"
+
+    @classmethod
+    def tcp(cls, adaptive=True):
+        return cls(TCP_REQUEST_OVERHEAD, TCP_REGISTER_COST, adaptive)
+
+    @classmethod
+    def rtu(cls, baud, parity="N", stopbits=1, turnaround=RTU_TURNAROUND, adaptive=True):
+        character = (10 + (parity != "N") + (stopbits - 1)) / baud
+
+        # 8 byte request, 5 bytes of response header and CRC, and 3.5
+        # characters of silence after each frame
+        return cls(turnaround + (8 + 5 + 7) * character, 2 * character, adaptive)
+
+    @property
+    def bridge_gap(self):
+        # Read plans are compiled per bridge gap, so it moves in powers of
+        # two, and only once the estimate is well outside the current step
+        # rather than with every request that is observed
+        with self._lock:
+            if self.register_cost <= 0:
+                gap = MAX_READ_LENGTH
+            else:
+                gap = max(0, min(MAX_READ_LENGTH, int(self.request_overhead / self.register_cost)))
+
+            current = self._bridge_gap
+
+            if (
+                current is None
+                or gap < current * (1 - BRIDGE_GAP_HYSTERESIS)
+                or gap >= min(max(2 * current, 1) * (1 + BRIDGE_GAP_HYSTERESIS), MAX_READ_LENGTH) > current
+            ):
+                self._bridge_gap = MAX_READ_LENGTH if gap >= MAX_READ_LENGTH else 1 << gap.bit_length() >> 1
+
+            return self._bridge_gap
+
+    def observe(self, length, elapsed):
+        # Fit elapsed = request_overhead + length * register_cost by
+        # exponentially weighted least squares over recent requests
+        if not self.adaptive:
+            return
+
+        with self._lock:
+            self._n = self._n * self.decay + 1
+            self._x = self._x * self.decay + length
+            self._y = self._y * self.decay + elapsed
+            self._xx = self._xx * self.decay + length * length
+            self._xy = self._xy * self.decay + length * elapsed
+
+            if self._n < 8:
+                return
+
+            mean_x = self._x / self._n
+            mean_y = self._y / self._n
+            variance = self._xx / self._n - mean_x * mean_x
+
+            if variance >= 1:
+                slope = (self._xy / self._n - mean_x * mean_y) / variance
+                intercept = mean_y - slope * mean_x
+
+                if slope > 0 and intercept > 0:
+                    self.register_cost = slope
+                    self.request_overhead = intercept
+                    return
+
+            # Not enough spread in request lengths to separate the two terms
+            intercept = mean_y - self.register_cost * mean_x
+
+            if intercept > 0:
+                self.request_overhead = intercept
+
+
 class SolarEdge:
 
     model = "SolarEdge"
@@ -193,17 +632,45 @@ class SolarEdge:
     parity = "N"
     baud = 115200
     wordorder = Endian.BIG
+    offset = 0
+    identity_batch = None
+    # Identity registers read on every poll, to tell when the device behind
+    # the address changed and the cached identity is stale. They are kept
+    # to one short block, c_deviceaddress sits between them.
+    identity_probe = ("c_serialnumber", "c_sunspec_did")
+    scale_factors = {}
+    register_groups = {}
+    register_table = MappingProxyType({})
+    little_endian_registers = frozenset()
+    history = None
+    recorder = None
+    metrics = METRICS
+    retry_policy = RETRY_POLICY
+
+    _register_maps = {}
+    _read_plans = {}
+    _read_fields = {}
+    _read_covers = {}
+    _captured_blocks = {}
+    _scale_plans = {}
 
     def __init__(
         self, host=False, port=False,
         device=False, stopbits=False, parity=False, baud=False,
         timeout=TIMEOUT, retries=RETRIES, unit=UNIT,
-        parent=False
+        parent=False, identity_ttl=IDENTITY_TTL
     ):
-        self.little_endian_registers = set()
+        self.identity_ttl = identity_ttl
+        self._identity = {}
+        self._identity_expires = 0
+        self._identity_probe = None
 
         if parent:
-            self.client = parent.client
+            self._connection = CONNECTIONS.retain(parent._connection)
+            self.client = self._connection.client
+            self.metrics = parent.metrics
+            self.retry_policy = parent.retry_policy
+            self.recorder = parent.recorder
             self.mode = parent.mode
             self.timeout = parent.timeout
             self.retries = parent.retries
@@ -243,20 +710,55 @@ class SolarEdge:
 
             if device:
                 self.mode = connectionType.RTU
-                self.client = ModbusSerialClient(
-                    method="rtu",
-                    port=self.device,
-                    stopbits=self.stopbits,
-                    parity=self.parity,
-                    baudrate=self.baud,
-                    timeout=self.timeout)
             else:
                 self.mode = connectionType.TCP
-                self.client = ModbusTcpClient(
-                    host=self.host,
-                    port=self.port,
-                    timeout=self.timeout
-                )
+
+            self._connection = CONNECTIONS.acquire(self._connection_key(), self._create_client)
+            self.client = self._connection.client
+
+            if self._connection.cost is None:
+                if self.mode is connectionType.RTU:
+                    self._connection.cost = LinkCost.rtu(self.baud, self.parity, self.stopbits)
+                    self._connection.label = self.device
+                else:
+                    self._connection.cost = LinkCost.tcp()
+                    self._connection.label = f"{self.host}:{self.port}"
+
+    def _connection_key(self):
+        if self.mode is connectionType.RTU:
+            return (self.mode, self.device)
+        elif self.mode is connectionType.TCP:
+            return (self.mode, self.host, self.port)
+        else:
+            raise NotImplementedError(self.mode)
+
+    def _create_client(self):
+        # The pymodbus clients, and asyncio and pyserial with them, are
+        # imported when the first connection is made rather than with the
+        # package
+        if self.mode is connectionType.RTU:
+            from pymodbus.client import ModbusSerialClient
+
+            return ModbusSerialClient(
+                method="rtu",
+                port=self.device,
+                stopbits=self.stopbits,
+                parity=self.parity,
+                baudrate=self.baud,
+                timeout=self.timeout,
+                retries=0)
+        elif self.mode is connectionType.TCP:
+            from pymodbus.client import ModbusTcpClient
+
+            # Retries are up to the retry policy, not the client
+            return ModbusTcpClient(
+                host=self.host,
+                port=self.port,
+                timeout=self.timeout,
+                retries=0
+            )
+        else:
+            raise NotImplementedError(self.mode)
 
     def __repr__(self):
         if self.mode == connectionType.RTU:
@@ -266,25 +768,109 @@ class SolarEdge:
         else:
             return f"<{self.__class__.__module__}.{self.__class__.__name__} object at {hex(id(self))}>"
 
+    def _read_registers(self, rtype, address, length, attempt=0):
+        # `attempt` is the number of attempts already made elsewhere, like
+        # in a pipelined read, which count against the retries
+        if rtype == registerType.HOLDING:
+            request = self.client.read_holding_registers
+            response_type = ReadHoldingRegistersResponse
+        elif rtype == registerType.INPUT:
+            request = self.client.read_input_registers
+            response_type = ReadInputRegistersResponse
+        else:
+            raise NotImplementedError(rtype)
+
+        metrics = self.metrics
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+
+        if breaker and not breaker.allow(time.monotonic()):
+            if metrics:
+                metrics.request_skipped(self)
+
+            return None
+
+        outcome = "error"
+
+        for i in range(attempt, self.retries):
+            if i:
+                # Back off without holding the connection, so other devices
+                # sharing it can go ahead
+                time.sleep(policy.delay(i - 1))
+
+            with self._connection.lock:
+                if not self.connected():
+                    connected = self.connect()
+
+                    if metrics:
+                        metrics.reconnected(self, connected)
+
+                    if not connected:
+                        outcome = "error"
+                        continue
+
+                if metrics:
+                    metrics.request_started(self, rtype, address, length)
+
+                start = time.monotonic()
+
+                try:
+                    result = request(address, length, slave=self.unit)
+                except ModbusException:
+                    result = None
+
+                elapsed = time.monotonic() - start
+
+            outcome = _request_result(result, response_type, length)
+
+            if metrics:
+                metrics.request_finished(self, rtype, address, length, outcome, elapsed, i)
+
+            if outcome == "ok":
+                self._connection.cost.observe(length, elapsed)
+                break
+            if not policy.retry(outcome):
+                break
+
+        self._record_outcome(breaker, outcome)
+
+        if outcome != "ok":
+            return None
+        if self.recorder is not None:
+            self._capture(rtype, address, result.registers)
+
+        return result.registers
+
+    @property
+    def circuit_breaker(self):
+        # One breaker per unit on a connection, shared by the inverter and
+        # its meters and batteries
+        breakers = self._connection.breakers
+
+        if self.unit not in breakers:
+            breakers[self.unit] = self.retry_policy.breaker()
+
+        return breakers[self.unit]
+
+    def _record_outcome(self, breaker, outcome):
+        if not breaker:
+            return
+
+        # Any response, even an exception, shows the device is alive
+        if outcome == "error":
+            breaker.failure(time.monotonic())
+        else:
+            breaker.success()
+
     def _read_holding_registers(self, address, length):
         # Check if the register needs little endian
         wordorder = Endian.LITTLE if address in self.little_endian_registers else self.wordorder
+        registers = self._read_registers(registerType.HOLDING, address, length)
 
-        for i in range(self.retries):
-            if not self.connected():
-                self.connect()
-                time.sleep(0.1)
-                continue
+        if registers is None:
+            return None
 
-            result = self.client.read_holding_registers(address, length, slave=self.unit)
-            if not isinstance(result, ReadHoldingRegistersResponse):
-                continue
-            if len(result.registers) != length:
-                continue
-
-            return BinaryPayloadDecoder.fromRegisters(result.registers, byteorder=Endian.BIG, wordorder=wordorder)
-
-        return None
+        return BinaryPayloadDecoder.fromRegisters(registers, byteorder=Endian.BIG, wordorder=wordorder)
 
     def _write_holding_register(self, address, value, dtype):
         # Determine byte order based on address
@@ -292,7 +878,9 @@ class SolarEdge:
 
         # Use dtype and wordorder to encode the value properly
         encoded_value = self._encode_value(value, dtype, wordorder)
-        return self.client.write_registers(address=address, values=encoded_value, slave=self.unit)
+
+        with self._connection.lock:
+            return self.client.write_registers(address=address, values=encoded_value, slave=self.unit)
 
     def _encode_value(self, data, dtype, wordorder):
         builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=wordorder)
@@ -339,76 +927,296 @@ class SolarEdge:
                 decoded = data.decode_string(length * 2).decode(encoding="utf-8", errors="ignore").replace("\x00", "").rstrip()
             else:
                 raise NotImplementedError(dtype)
-            if decoded == SUNSPEC_NOTIMPLEMENTED[dtype.name]:
-                return vtype(False)
+            if decoded == _notimplemented(dtype):
+                return not_implemented(vtype)
             elif decoded != decoded:
-                return vtype(False)
+                return not_implemented(vtype)
             else:
                 return vtype(decoded)
         except NotImplementedError:
             raise
 
-    def _read(self, value):
+    def _read_field(self, value):
         address, length, rtype, dtype, vtype, label, fmt, batch = value
-        try:
-            if rtype == registerType.INPUT:
-                return self._decode_value(self._read_input_registers(address, length), length, dtype, vtype)
-            elif rtype == registerType.HOLDING:
-                return self._decode_value(self._read_holding_registers(address, length), length, dtype, vtype)
-            else:
-                raise NotImplementedError(rtype)
-        except NotImplementedError:
-            raise
-        except AttributeError:
+        key = (self.__class__, rtype, address - self.offset, length, dtype, vtype)
+        block = SolarEdge._read_fields.get(key)
+
+        if block is None:
+            little_endian = {"value"} if (self.wordorder == Endian.LITTLE or address in self.little_endian_registers) else set()
+            block = _ReadBlock(rtype, address - self.offset, length, (("value", 0, length, dtype, vtype),), little_endian)
+            SolarEdge._read_fields[key] = block
+
+        return block
+
+    def _read(self, value):
+        return self._read_block(self._read_field(value)).get("value", False)
+
+    @property
+    def registers(self):
+        # The register tables are shared by every instance of a class, with
+        # addresses relative to the device offset. The map with absolute
+        # addresses is built once per class and offset.
+        if not self.offset:
+            return self.register_table
+
+        key = (self.__class__, self.offset)
+        registers = SolarEdge._register_maps.get(key)
+
+        if registers is None:
+            registers = MappingProxyType({k: (v[0] + self.offset,) + v[1:] for k, v in self.register_table.items()})
+            SolarEdge._register_maps[key] = registers
+
+        return registers
+
+    @property
+    def link_cost(self):
+        return self._connection.cost
+
+    @link_cost.setter
+    def link_cost(self, cost):
+        self._connection.cost = cost
+
+    def _read_plan(self, rtype=registerType.HOLDING):
+        bridge_gap = self._connection.cost.bridge_gap
+        key = (self.__class__, rtype, bridge_gap)
+        plan = SolarEdge._read_plans.get(key)
+
+        if plan is None:
+            plan = _compile_read_plan(
+                {k: v for k, v in self.register_table.items() if v[2] == rtype},
+                rtype, 0, self.wordorder, self.little_endian_registers,
+                bridge_gap, self.identity_batch, self.identity_probe
+            )
+            SolarEdge._read_plans[key] = plan
+
+        return plan
+
+    def _read_cover(self, keys):
+        bridge_gap = self._connection.cost.bridge_gap
+        key = (self.__class__, keys, bridge_gap)
+        cover = SolarEdge._read_covers.get(key)
+
+        if cover is None:
+            registers = {}
+
+            for k in keys:
+                if k not in self.register_table:
+                    raise KeyError(k)
+
+                registers[k] = self.register_table[k]
+                scale = self.scale_factors.get(k)
+
+                if scale in self.register_table:
+                    registers[scale] = self.register_table[scale]
+
+            cover = tuple(
+                block
+                for rtype in registerType
+                for block in _compile_cover(registers, rtype, 0, self.wordorder, self.little_endian_registers, bridge_gap)
+            )
+            SolarEdge._read_covers[key] = cover
+
+        return cover
+
+    def _scale_plan(self, rtype=registerType.HOLDING):
+        key = (self.__class__, rtype)
+        plan = SolarEdge._scale_plans.get(key)
+
+        if plan is None:
+            registers = {k for k, v in self.register_table.items() if v[2] == rtype}
+            plan = tuple(
+                (k, scale)
+                for k, scale in self.scale_factors.items()
+                if k in registers and scale in registers
+            )
+            SolarEdge._scale_plans[key] = (plan, frozenset(scale for k, scale in plan))
+            plan = SolarEdge._scale_plans[key]
+
+        return plan
+
+    def _scale(self, results, rtype=registerType.HOLDING):
+        bindings, scales = self._scale_plan(rtype)
+
+        for key, scale in bindings:
+            if key in results and scale in results:
+                # SunSpec scale factors range from -10 to 10, anything else
+                # is treated like a value that is not implemented. So is a
+                # scale factor register that is not implemented, which
+                # would otherwise read as 0.
+                value = results[key]
+                factor = SCALE_FACTORS.get(results[scale]) if implemented(results[scale]) else None
+
+                if factor is None or not implemented(value):
+                    results[key] = not_implemented(float)
+                else:
+                    results[key] = value * factor
+
+        for scale in scales:
+            results.pop(scale, None)
+
+        return results
+
+    def _identity_blocks(self, rtype=registerType.HOLDING):
+        return [block for block in self._read_plan(rtype) if block.batch is not None and block.batch == self.identity_batch]
+
+    def _cached_block(self, block):
+        if block.batch is None or block.batch != self.identity_batch or not self._identity:
+            return None
+
+        if time.monotonic() >= self._identity_expires:
+            self._identity = {}
+            return None
+
+        return self._identity.get((block.rtype, block.address))
+
+    def _cache_block(self, block, values):
+        if not values or not self.identity_ttl:
+            return
+
+        if block.batch is None or block.batch != self.identity_batch:
+            return
+
+        if not self._identity:
+            self._identity_expires = time.monotonic() + self.identity_ttl
+
+        self._identity[(block.rtype, block.address)] = values
+
+    def _identity_changed(self, results):
+        # A different SunSpec DID, firmware version or serial number means
+        # the device behind this address was replaced, reconfigured or
+        # updated, so the cached nameplate is stale. The probe registers are
+        # never served from the cache.
+        if self.identity_batch is None:
+            return False
+
+        probe = tuple(results.get(k) for k in self.identity_probe)
+
+        if None in probe:
             return False
 
-    def _read_all(self, values, rtype):
-        addr_min = False
-        addr_max = False
+        if self._identity_probe is not None and probe != self._identity_probe:
+            self.invalidate_identity()
+            return True
 
-        for k, v in values.items():
-            v_addr = v[0]
-            v_length = v[1]
+        self._identity_probe = probe
+        return False
 
-            if addr_min is False:
-                addr_min = v_addr
-            if addr_max is False:
-                addr_max = v_addr + v_length
+    def invalidate_identity(self):
+        self._identity = {}
+        self._identity_probe = None
 
-            if v_addr < addr_min:
-                addr_min = v_addr
-            if (v_addr + v_length) > addr_max:
-                addr_max = v_addr + v_length
+    def enable_history(self, capacity, keys=None):
+        if keys is None:
+            scales = set(self.scale_factors.values())
+            keys = [
+                key for key, value in self.registers.items()
+                if value[4] in (int, float) and key not in scales
+            ]
 
-        results = {}
-        offset = addr_min
-        length = addr_max - addr_min
+        self.history = History(keys, capacity)
+        return self.history
 
-        try:
-            if rtype == registerType.INPUT:
-                data = self._read_input_registers(offset, length)
-            elif rtype == registerType.HOLDING:
-                data = self._read_holding_registers(offset, length)
-            else:
-                raise NotImplementedError(rtype)
+    def disable_history(self):
+        self.history = None
 
-            if not data:
-                return results
+    def _record(self, results, scaled):
+        if self.history is not None and results:
+            # Samples are stored scaled, also when the read was not, as the
+            # scale factors are not kept. Values read without their scale
+            # factor are left out.
+            if not scaled:
+                results = {k: v for k, v in results.items() if self.scale_factors.get(k, k) in results}
 
-            for k, v in values.items():
-                address, length, rtype, dtype, vtype, label, fmt, batch = v
+                for rtype in registerType:
+                    self._scale(results, rtype)
 
-                if address > offset:
-                    skip_bytes = address - offset
-                    offset += skip_bytes
-                    data.skip_bytes(skip_bytes * 2)
+            self.history.append(results)
 
-                results[k] = self._decode_value(data, length, dtype, vtype)
-                offset += length
-        except NotImplementedError:
-            raise
+    def _restore_identity(self, values):
+        for block in self._identity_blocks():
+            if all(field[0] in values for field in block.fields):
+                self._cache_block(block, {field[0]: values[field[0]] for field in block.fields})
 
-        return results
+    def _read_block(self, block, attempt=0):
+        registers = self._read_registers(block.rtype, block.address + self.offset, block.length, attempt)
+
+        if not registers:
+            return {}
+
+        return self._decode_block(block, registers)
+
+    def _capture(self, rtype, address, registers):
+        function = 0x04 if rtype == registerType.INPUT else 0x03
+        self.recorder.record(self.model, self.unit, function, address, registers, source=self._connection.label)
+
+    def _range_block(self, rtype, address, length):
+        # Captured blocks follow the read plan they were taken with, which
+        # need not be the current one, so decode every register that lies
+        # inside the range. Returns the block and its position in the range.
+        start = address - self.offset
+        key = (self.__class__, rtype, start, length)
+
+        if key not in SolarEdge._captured_blocks:
+            fields = [
+                (k, v) for k, v in self.register_table.items()
+                if v[2] == rtype and start <= v[0] and v[0] + v[1] <= start + length
+            ]
+            SolarEdge._captured_blocks[key] = _compile_block(fields, rtype, 0, self.wordorder, self.little_endian_registers) if fields else None
+
+        block = SolarEdge._captured_blocks[key]
+        return block, block.address - start if block is not None else 0
+
+    def _decode_captured(self, function, address, registers):
+        rtype = registerType.INPUT if function == 0x04 else registerType.HOLDING
+        block, skip = self._range_block(rtype, address, len(registers))
+
+        if block is None:
+            return {}
+
+        return self._decode_block(block, registers[skip:skip + block.length])
+
+    def decode_bulk(self, address, registers, rtype=registerType.HOLDING, scaled=False):
+        # Decode a 2-D array of raw blocks read from `address`, one read per
+        # row, into a column per register
+        import numpy
+
+        registers = numpy.asarray(registers, dtype=numpy.uint16)
+        block, skip = self._range_block(rtype, address, registers.shape[-1])
+
+        if block is None:
+            return {}
+
+        columns = block.decode_bulk(registers[..., skip:skip + block.length])
+
+        if scaled:
+            self.scale_columns(columns)
+
+        return columns
+
+    def scale_columns(self, columns):
+        # The vectorised counterpart of _scale(). Scale factors outside the
+        # SunSpec range of -10 to 10 give NaN.
+        import numpy
+
+        for key, scale in self.scale_factors.items():
+            if key in columns and scale in columns:
+                factor = columns[scale]
+                columns[key] = columns[key] * numpy.where(numpy.abs(factor) <= 10, 10.0 ** factor, numpy.nan)
+
+        for scale in set(self.scale_factors.values()):
+            columns.pop(scale, None)
+
+        return columns
+
+    def _decode_block(self, block, registers):
+        if not self.metrics:
+            return block.decode(registers)
+
+        start = time.perf_counter()
+        values = block.decode(registers)
+        self.metrics.decoded(self, block, values, time.perf_counter() - start)
+
+        return values
 
     def _write(self, value, data):
         # Unpack value tuple to extract necessary information
@@ -423,10 +1231,15 @@ class SolarEdge:
             raise
 
     def connect(self):
-        return self.client.connect()
+        with self._connection.lock:
+            return self.client.connect()
 
     def disconnect(self):
-        self.client.close()
+        with self._connection.lock:
+            self.client.close()
+
+    def close(self):
+        CONNECTIONS.release(self._connection)
 
     def connected(self):
         return self.client.is_socket_open()
@@ -443,321 +1256,1418 @@ class SolarEdge:
 
         return self._write(self.registers[key], data)
 
-    def read_all(self, rtype=registerType.HOLDING):
-        registers = {k: v for k, v in self.registers.items() if (v[2] == rtype)}
+    def read_fields(self, keys, scaled=False):
         results = {}
 
-        for batch in range(1, len(registers)):
-            register_batch = {k: v for k, v in registers.items() if (v[7] == batch)}
+        for block in self._read_cover(frozenset(keys)):
+            results.update(self._read_block(block))
 
-            if not register_batch:
-                break
+        if scaled:
+            for rtype in registerType:
+                self._scale(results, rtype)
+
+        self._record(results, scaled)
+        return results
+
+    def read_all(self, rtype=registerType.HOLDING, scaled=False):
+        results = {}
+
+        for block in self._read_plan(rtype):
+            values = self._cached_block(block)
+
+            if values is None:
+                values = self._read_block(block)
+                self._cache_block(block, values)
+
+            results.update(values)
+
+        if self._identity_changed(results):
+            for block in self._identity_blocks(rtype):
+                values = self._read_block(block)
+                self._cache_block(block, values)
+                results.update(values)
+
+            self._identity_changed(results)
 
-            results.update(self._read_all(register_batch, rtype))
+        if scaled:
+            self._scale(results, rtype)
 
+        self._record(results, scaled)
         return results
 
 
 class Inverter(SolarEdge):
 
-    def __init__(self, *args, **kwargs):
-        self.model = "Inverter"
-        self.wordorder = Endian.BIG
+    model = "Inverter"
+    wordorder = Endian.BIG
+    identity_batch = 1
+    register_groups = {
+        "identity": (
+            "c_id",
+            "c_did",
+            "c_length",
+            "c_manufacturer",
+            "c_model",
+            "c_version",
+            "c_serialnumber",
+            "c_deviceaddress",
+            "c_sunspec_did",
+            "c_sunspec_length"
+        ),
+        "power": (
+            "current",
+            "l1_current",
+            "l2_current",
+            "l3_current",
+            "current_scale",
+            "l1_voltage",
+            "l2_voltage",
+            "l3_voltage",
+            "l1n_voltage",
+            "l2n_voltage",
+            "l3n_voltage",
+            "voltage_scale",
+            "power_ac",
+            "power_ac_scale",
+            "frequency",
+            "frequency_scale",
+            "power_apparent",
+            "power_apparent_scale",
+            "power_reactive",
+            "power_reactive_scale",
+            "power_factor",
+            "power_factor_scale",
+            "current_dc",
+            "current_dc_scale",
+            "voltage_dc",
+            "voltage_dc_scale",
+            "power_dc",
+            "power_dc_scale",
+            "temperature",
+            "temperature_scale",
+            "status",
+            "vendor_status"
+        ),
+        "energy": (
+            "energy_total",
+            "energy_total_scale"
+        ),
+        "power_control": (
+            "rrcr_state",
+            "active_power_limit",
+            "cosphi",
+            "commit_power_control_settings",
+            "restore_power_control_default_settings",
+            "reactive_power_config",
+            "reactive_power_response_time",
+            "advanced_power_control_enable",
+            "export_control_mode",
+            "export_control_limit_mode",
+            "export_control_site_limit"
+        ),
+        "storedge": (
+            "storage_control_mode",
+            "storage_ac_charge_policy",
+            "storage_ac_charge_limit",
+            "storage_backup_reserved_setting",
+            "storage_default_mode",
+            "rc_cmd_timeout",
+            "rc_cmd_mode",
+            "rc_charge_limit",
+            "rc_discharge_limit"
+        )
+    }
+    scale_factors = {
+        "current": "current_scale",
+        "l1_current": "current_scale",
+        "l2_current": "current_scale",
+        "l3_current": "current_scale",
+        "l1_voltage": "voltage_scale",
+        "l2_voltage": "voltage_scale",
+        "l3_voltage": "voltage_scale",
+        "l1n_voltage": "voltage_scale",
+        "l2n_voltage": "voltage_scale",
+        "l3n_voltage": "voltage_scale",
+        "power_ac": "power_ac_scale",
+        "frequency": "frequency_scale",
+        "power_apparent": "power_apparent_scale",
+        "power_reactive": "power_reactive_scale",
+        "power_factor": "power_factor_scale",
+        "energy_total": "energy_total_scale",
+        "current_dc": "current_dc_scale",
+        "voltage_dc": "voltage_dc_scale",
+        "power_dc": "power_dc_scale",
+        "temperature": "temperature_scale"
+    }
+
+    topology_cache = None
+
+    # Registers that require different wordorder
+    little_endian_registers = frozenset({
+        0xf700,  # export_control_mode
+        0xf701,  # export_control_limit_mode
+        0xf702,  # export_control_site_limit
+        0xe004,  # storage_control_mode
+        0xe005,  # storage_ac_charge_policy
+        0xe006,  # storage_ac_charge_limit
+        0xe008,  # storage_backup_reserved_setting
+        0xe00a,  # storage_default_mode
+        0xe00B,  # rc_cmd_timeout
+        0xe00d,  # rc_cmd_mode
+        0xe00e,  # rc_charge_limit
+        0xe010   # rc_discharge_limit
+    })
+
+    register_table = MappingProxyType({
+        # name, address, length, register, type, target type, description, unit, batch
+        "c_id": (0x9c40, 2, registerType.HOLDING, registerDataType.STRING, str, "SunSpec ID", "", 1),
+        "c_did": (0x9c42, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", "", 1),
+        "c_length": (0x9c43, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec Length", "16Bit Words", 1),
+        "c_manufacturer": (0x9c44, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
+        "c_model": (0x9c54, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
+        "c_version": (0x9c6c, 8, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
+        "c_serialnumber": (0x9c74, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
+        "c_deviceaddress": (0x9c84, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
+        "c_sunspec_did": (0x9c85, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", C_SUNSPEC_DID_MAP, 2),
+        "c_sunspec_length": (0x9c86, 1, registerType.HOLDING, registerDataType.UINT16, int, "Length", "16Bit Words", 2),
+
+        "current": (0x9c87, 1, registerType.HOLDING, registerDataType.UINT16, int, "Current", "A", 2),
+        "l1_current": (0x9c88, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1 Current", "A", 2),
+        "l2_current": (0x9c89, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2 Current", "A", 2),
+        "l3_current": (0x9c8a, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3 Current", "A", 2),
+        "current_scale": (0x9c8b, 1, registerType.HOLDING, registerDataType.SCALE, int, "Current Scale Factor", "", 2),
+
+        "l1_voltage": (0x9c8c, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1 Voltage", "V", 2),
+        "l2_voltage": (0x9c8d, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2 Voltage", "V", 2),
+        "l3_voltage": (0x9c8e, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3 Voltage", "V", 2),
+        "l1n_voltage": (0x9c8f, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1-N Voltage", "V", 2),
+        "l2n_voltage": (0x9c90, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2-N Voltage", "V", 2),
+        "l3n_voltage": (0x9c91, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3-N Voltage", "V", 2),
+        "voltage_scale": (0x9c92, 1, registerType.HOLDING, registerDataType.SCALE, int, "Voltage Scale Factor", "", 2),
+
+        "power_ac": (0x9c93, 1, registerType.HOLDING, registerDataType.INT16, int, "Power", "W", 2),
+        "power_ac_scale": (0x9c94, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Scale Factor", "", 2),
+
+        "frequency": (0x9c95, 1, registerType.HOLDING, registerDataType.UINT16, int, "Frequency", "Hz", 2),
+        "frequency_scale": (0x9c96, 1, registerType.HOLDING, registerDataType.SCALE, int, "Frequency Scale Factor", "", 2),
+
+        "power_apparent": (0x9c97, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Apparent)", "VA", 2),
+        "power_apparent_scale": (0x9c98, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Apparent) Scale Factor", "", 2),
+        "power_reactive": (0x9c99, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Reactive)", "VAr", 2),
+        "power_reactive_scale": (0x9c9a, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Reactive) Scale Factor", "", 2),
+        "power_factor": (0x9c9b, 1, registerType.HOLDING, registerDataType.INT16, int, "Power Factor", "%", 2),
+        "power_factor_scale": (0x9c9c, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Factor Scale Factor", "", 2),
+
+        "energy_total": (0x9c9d, 2, registerType.HOLDING, registerDataType.ACC32, int, "Total Energy", "Wh", 2),
+        "energy_total_scale": (0x9c9f, 1, registerType.HOLDING, registerDataType.SCALE, int, "Total Energy Scale Factor", "", 2),
+
+        "current_dc": (0x9ca0, 1, registerType.HOLDING, registerDataType.UINT16, int, "DC Current", "A", 2),
+        "current_dc_scale": (0x9ca1, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Current Scale Factor", "", 2),
+
+        "voltage_dc": (0x9ca2, 1, registerType.HOLDING, registerDataType.UINT16, int, "DC Voltage", "V", 2),
+        "voltage_dc_scale": (0x9ca3, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Voltage Scale Factor", "", 2),
+
+        "power_dc": (0x9ca4, 1, registerType.HOLDING, registerDataType.INT16, int, "DC Power", "W", 2),
+        "power_dc_scale": (0x9ca5, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Power Scale Factor", "", 2),
+
+        "temperature": (0x9ca7, 1, registerType.HOLDING, registerDataType.INT16, int, "Temperature", "°C", 2),
+        "temperature_scale": (0x9caa, 1, registerType.HOLDING, registerDataType.SCALE, int, "Temperature Scale Factor", "", 2),
+
+        "status": (0x9cab, 1, registerType.HOLDING, registerDataType.UINT16, int, "Status", INVERTER_STATUS_MAP, 2),
+        "vendor_status": (0x9cac, 1, registerType.HOLDING, registerDataType.UINT16, int, "Vendor Status", "", 2),
+
+        "rrcr_state": (0xf000, 1, registerType.HOLDING, registerDataType.UINT16, int, "RRCR State", "", 3),
+        "active_power_limit": (0xf001, 1, registerType.HOLDING, registerDataType.UINT16, int, "Active Power Limit", "%", 3),
+        "cosphi": (0xf002, 2, registerType.HOLDING, registerDataType.FLOAT32, int, "CosPhi", "", 3),
+
+        "commit_power_control_settings": (0xf100, 1, registerType.HOLDING, registerDataType.INT16, int, "Commit Power Control Settings", "", 4),
+        "restore_power_control_default_settings": (0xf101, 1, registerType.HOLDING, registerDataType.INT16, int, "Restore Power Control Default Settings", "", 4),
+
+        "reactive_power_config": (0xf103, 2, registerType.HOLDING, registerDataType.INT32, int, "Reactive Power Config", REACTIVE_POWER_CONFIG_MAP, 4),
+        "reactive_power_response_time": (0xf105, 2, registerType.HOLDING, registerDataType.UINT32, int, "Reactive Power Response Time", "ms", 4),
+
+        "advanced_power_control_enable": (0xf142, 2, registerType.HOLDING, registerDataType.UINT16, int, "Advanced Power Control Enable", "", 4),
+
+        "export_control_mode": (0xf700, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Mode", "", 5),
+        "export_control_limit_mode": (0xf701, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Limit Mode", EXPORT_CONTROL_LIMIT_MAP, 5),
+        "export_control_site_limit": (0xf702, 2, registerType.HOLDING, registerDataType.FLOAT32, int, "Export Control Site Limit", "W", 5),
+
+        "storage_control_mode": (0xe004, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage Control Mode", "", 6),
+        "storage_ac_charge_policy": (0xe005, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage AC Charge Policy", "", 6),
+        "storage_ac_charge_limit": (0xe006, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Storage AC Charge Limit", "", 6),
+        "storage_backup_reserved_setting": (0xe008, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Storage Backup Reserved Setting", "%", 6),
+        "storage_default_mode": (0xe00a, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage Charge/Discharge Default Mode", "", 6),
+        "rc_cmd_timeout": (0xe00B, 2, registerType.HOLDING, registerDataType.UINT32, int, "Remote Control Command Timeout", "s", 6),
+        "rc_cmd_mode": (0xe00d, 1, registerType.HOLDING, registerDataType.UINT16, int, "Remote Control Command Mode", "", 6),
+        "rc_charge_limit": (0xe00e, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Remote Control Command Charge Limit", "W", 6),
+        "rc_discharge_limit": (0xe010, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Remote Control Command Discharge Limit", "W", 6)
+
+    })
 
+    def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # A dictionary to hold registers that require different wordorder
-        self.little_endian_registers = {
-            0xf700,  # export_control_mode
-            0xf701,  # export_control_limit_mode
-            0xf702,  # export_control_site_limit
-            0xe004,  # storage_control_mode
-            0xe005,  # storage_ac_charge_policy
-            0xe006,  # storage_ac_charge_limit
-            0xe008,  # storage_backup_reserved_setting
-            0xe00a,  # storage_default_mode
-            0xe00B,  # rc_cmd_timeout
-            0xe00d,  # rc_cmd_mode
-            0xe00e,  # rc_charge_limit
-            0xe010   # rc_discharge_limit
-        }
-
-        self.registers = {
-            # name, address, length, register, type, target type, description, unit, batch
-            "c_id": (0x9c40, 2, registerType.HOLDING, registerDataType.STRING, str, "SunSpec ID", "", 1),
-            "c_did": (0x9c42, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", "", 1),
-            "c_length": (0x9c43, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec Length", "16Bit Words", 1),
-            "c_manufacturer": (0x9c44, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
-            "c_model": (0x9c54, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
-            "c_version": (0x9c6c, 8, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
-            "c_serialnumber": (0x9c74, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
-            "c_deviceaddress": (0x9c84, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
-            "c_sunspec_did": (0x9c85, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", C_SUNSPEC_DID_MAP, 2),
-            "c_sunspec_length": (0x9c86, 1, registerType.HOLDING, registerDataType.UINT16, int, "Length", "16Bit Words", 2),
-
-            "current": (0x9c87, 1, registerType.HOLDING, registerDataType.UINT16, int, "Current", "A", 2),
-            "l1_current": (0x9c88, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1 Current", "A", 2),
-            "l2_current": (0x9c89, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2 Current", "A", 2),
-            "l3_current": (0x9c8a, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3 Current", "A", 2),
-            "current_scale": (0x9c8b, 1, registerType.HOLDING, registerDataType.SCALE, int, "Current Scale Factor", "", 2),
-
-            "l1_voltage": (0x9c8c, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1 Voltage", "V", 2),
-            "l2_voltage": (0x9c8d, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2 Voltage", "V", 2),
-            "l3_voltage": (0x9c8e, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3 Voltage", "V", 2),
-            "l1n_voltage": (0x9c8f, 1, registerType.HOLDING, registerDataType.UINT16, int, "L1-N Voltage", "V", 2),
-            "l2n_voltage": (0x9c90, 1, registerType.HOLDING, registerDataType.UINT16, int, "L2-N Voltage", "V", 2),
-            "l3n_voltage": (0x9c91, 1, registerType.HOLDING, registerDataType.UINT16, int, "L3-N Voltage", "V", 2),
-            "voltage_scale": (0x9c92, 1, registerType.HOLDING, registerDataType.SCALE, int, "Voltage Scale Factor", "", 2),
-
-            "power_ac": (0x9c93, 1, registerType.HOLDING, registerDataType.INT16, int, "Power", "W", 2),
-            "power_ac_scale": (0x9c94, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Scale Factor", "", 2),
-
-            "frequency": (0x9c95, 1, registerType.HOLDING, registerDataType.UINT16, int, "Frequency", "Hz", 2),
-            "frequency_scale": (0x9c96, 1, registerType.HOLDING, registerDataType.SCALE, int, "Frequency Scale Factor", "", 2),
-
-            "power_apparent": (0x9c97, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Apparent)", "VA", 2),
-            "power_apparent_scale": (0x9c98, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Apparent) Scale Factor", "", 2),
-            "power_reactive": (0x9c99, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Reactive)", "VAr", 2),
-            "power_reactive_scale": (0x9c9a, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Reactive) Scale Factor", "", 2),
-            "power_factor": (0x9c9b, 1, registerType.HOLDING, registerDataType.INT16, int, "Power Factor", "%", 2),
-            "power_factor_scale": (0x9c9c, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Factor Scale Factor", "", 2),
-
-            "energy_total": (0x9c9d, 2, registerType.HOLDING, registerDataType.ACC32, int, "Total Energy", "Wh", 2),
-            "energy_total_scale": (0x9c9f, 1, registerType.HOLDING, registerDataType.SCALE, int, "Total Energy Scale Factor", "", 2),
-
-            "current_dc": (0x9ca0, 1, registerType.HOLDING, registerDataType.UINT16, int, "DC Current", "A", 2),
-            "current_dc_scale": (0x9ca1, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Current Scale Factor", "", 2),
-
-            "voltage_dc": (0x9ca2, 1, registerType.HOLDING, registerDataType.UINT16, int, "DC Voltage", "V", 2),
-            "voltage_dc_scale": (0x9ca3, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Voltage Scale Factor", "", 2),
-
-            "power_dc": (0x9ca4, 1, registerType.HOLDING, registerDataType.INT16, int, "DC Power", "W", 2),
-            "power_dc_scale": (0x9ca5, 1, registerType.HOLDING, registerDataType.SCALE, int, "DC Power Scale Factor", "", 2),
-
-            "temperature": (0x9ca7, 1, registerType.HOLDING, registerDataType.INT16, int, "Temperature", "°C", 2),
-            "temperature_scale": (0x9caa, 1, registerType.HOLDING, registerDataType.SCALE, int, "Temperature Scale Factor", "", 2),
-
-            "status": (0x9cab, 1, registerType.HOLDING, registerDataType.UINT16, int, "Status", INVERTER_STATUS_MAP, 2),
-            "vendor_status": (0x9cac, 1, registerType.HOLDING, registerDataType.UINT16, int, "Vendor Status", "", 2),
-
-            "rrcr_state": (0xf000, 1, registerType.HOLDING, registerDataType.UINT16, int, "RRCR State", "", 3),
-            "active_power_limit": (0xf001, 1, registerType.HOLDING, registerDataType.UINT16, int, "Active Power Limit", "%", 3),
-            "cosphi": (0xf002, 2, registerType.HOLDING, registerDataType.FLOAT32, int, "CosPhi", "", 3),
-
-            "commit_power_control_settings": (0xf100, 1, registerType.HOLDING, registerDataType.INT16, int, "Commit Power Control Settings", "", 4),
-            "restore_power_control_default_settings": (0xf101, 1, registerType.HOLDING, registerDataType.INT16, int, "Restore Power Control Default Settings", "", 4),
-
-            "reactive_power_config": (0xf103, 2, registerType.HOLDING, registerDataType.INT32, int, "Reactive Power Config", REACTIVE_POWER_CONFIG_MAP, 4),
-            "reactive_power_response_time": (0xf105, 2, registerType.HOLDING, registerDataType.UINT32, int, "Reactive Power Response Time", "ms", 4),
-
-            "advanced_power_control_enable": (0xf142, 2, registerType.HOLDING, registerDataType.UINT16, int, "Advanced Power Control Enable", "", 4),
-
-            "export_control_mode": (0xf700, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Mode", "", 5),
-            "export_control_limit_mode": (0xf701, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Limit Mode", EXPORT_CONTROL_LIMIT_MAP, 5),
-            "export_control_site_limit": (0xf702, 2, registerType.HOLDING, registerDataType.FLOAT32, int, "Export Control Site Limit", "W", 5),
-
-            "storage_control_mode": (0xe004, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage Control Mode", "", 6),
-            "storage_ac_charge_policy": (0xe005, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage AC Charge Policy", "", 6),
-            "storage_ac_charge_limit": (0xe006, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Storage AC Charge Limit", "", 6),
-            "storage_backup_reserved_setting": (0xe008, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Storage Backup Reserved Setting", "%", 6),
-            "storage_default_mode": (0xe00a, 1, registerType.HOLDING, registerDataType.UINT16, int, "Storage Charge/Discharge Default Mode", "", 6),
-            "rc_cmd_timeout": (0xe00B, 2, registerType.HOLDING, registerDataType.UINT32, int, "Remote Control Command Timeout", "s", 6),
-            "rc_cmd_mode": (0xe00d, 1, registerType.HOLDING, registerDataType.UINT16, int, "Remote Control Command Mode", "", 6),
-            "rc_charge_limit": (0xe00e, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Remote Control Command Charge Limit", "W", 6),
-            "rc_discharge_limit": (0xe010, 2, registerType.HOLDING, registerDataType.FLOAT32, float, "Remote Control Command Discharge Limit", "W", 6)
-
-        }
-
-        self.meter_dids = [
-            (0x9cfc, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1),
-            (0x9daa, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1),
-            (0x9e59, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1)
+        self._topology = None
+
+    def _topology_candidates(self):
+        # Every meter and battery slot, with the register that tells whether
+        # it is installed and the values it reads when it is not
+        if isinstance(self, AsyncSolarEdge):
+            meter, battery = AsyncMeter, AsyncBattery
+        else:
+            meter, battery = Meter, Battery
+
+        return [
+            (meter(offset=idx, parent=self, unit=self.unit), "c_sunspec_did", (0, False))
+            for idx in range(len(METER_REGISTER_OFFSETS))
+        ] + [
+            (battery(offset=idx, parent=self, unit=self.unit), "c_deviceaddress", (255, False))
+            for idx in range(len(BATTERY_REGISTER_OFFSETS))
+        ]
+
+    def _topology_probes(self, candidates):
+        # The serial number, which keys the topology cache, is one of the
+        # identity registers probed on every read rather than cached
+        requests = [(self, block) for block in self._identity_blocks()]
+        requests += [(self, block) for block in self._read_cover(frozenset(self.identity_probe))]
+
+        for device, marker, absent in candidates:
+            requests += [(device, block) for block in device._read_cover(frozenset((marker,)))]
+
+        return requests
+
+    def _identity_probes(self, present):
+        return [
+            (device, block)
+            for device, marker in present
+            for block in device._read_cover(frozenset(device.register_groups["identity"]))
         ]
 
-        self.battery_dids = [
-            (0xe140, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1),
-            (0xe240, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1)
-#            (0xe340, 1, registerType.HOLDING, registerDataType.UINT16, int, "", "", 1)
+    def _topology_results(self, requests, values):
+        results = {}
+
+        for (device, block), block_values in zip(requests, values):
+            if device is self:
+                self._cache_block(block, block_values)
+
+            results.setdefault(device, {}).update(block_values)
+
+        return results
+
+    def _topology_revalidate(self, candidates, results):
+        # Returns the serial number, the installed devices, and whether they
+        # match the cached topology, in which case their identity registers
+        # are restored from the cache instead of read
+        serial = results.get(self, {}).get("c_serialnumber")
+        present = [
+            (device, marker)
+            for device, marker, absent in candidates
+            if results.get(device, {}).get(marker, False) not in absent
         ]
 
-    def meters(self):
-        meters = [self._read(v) for v in self.meter_dids]
+        entry = self.topology_cache.get(serial) if self.topology_cache and serial else None
+
+        if entry is None or set(entry["devices"]) != {device.model for device, marker in present}:
+            return serial, present, False
+
+        for device, marker in present:
+            identity = entry["devices"][device.model]
+
+            if not isinstance(identity, dict) or identity.get(marker) != results[device][marker]:
+                return serial, present, False
+
+        for device, marker in present:
+            device._restore_identity(entry["devices"][device.model])
+
+        return serial, present, True
+
+    def _topology_store(self, serial, present, results):
+        for device, marker in present:
+            device._restore_identity(results.get(device, {}))
+
+        if not self.topology_cache or not serial:
+            return
+
+        # Only cache a complete probe
+        if all(results.get(device) for device, marker in present):
+            self.topology_cache.put(serial, self.unit, {device.model: results[device] for device, marker in present})
+
+    def _topology_finish(self, candidates, present, serial):
+        devices = {device.model: device for device, marker in present}
+
+        for device, marker, absent in candidates:
+            if device.model not in devices:
+                device.close()
+
+        # Without the inverter's own serial number the probe likely failed,
+        # so leave the topology to be discovered again on the next call
+        if serial:
+            if self._topology is not None:
+                for device in self._topology.values():
+                    device.close()
+
+            self._topology = devices
+
+        return dict(devices)
 
-        return {f"Meter{idx + 1}": Meter(offset=idx, parent=self) for idx, v in enumerate(meters) if v}
+    def discover(self, refresh=False):
+        if self._topology is not None and not refresh:
+            return dict(self._topology)
 
-    def batteries(self):
-        batteries = [self._read(v) for v in self.battery_dids]
+        candidates = self._topology_candidates()
+        requests = self._topology_probes(candidates)
+        results = self._topology_results(requests, _read_blocks(requests))
+        serial, present, cached = self._topology_revalidate(candidates, results)
 
-        return {f"Battery{idx + 1}": Battery(offset=idx, parent=self) for idx, v in enumerate(batteries) if v != 255}
+        if not cached:
+            requests = self._identity_probes(present)
+            self._topology_store(serial, present, self._topology_results(requests, _read_blocks(requests)))
+
+        return self._topology_finish(candidates, present, serial)
+
+    def meters(self, refresh=False):
+        return {k: v for k, v in self.discover(refresh).items() if k.startswith("Meter")}
+
+    def batteries(self, refresh=False):
+        return {k: v for k, v in self.discover(refresh).items() if k.startswith("Battery")}
+
+    def close(self):
+        if self._topology is not None:
+            for device in self._topology.values():
+                device.close()
+
+            self._topology = None
+
+        super().close()
 
 class Meter(SolarEdge):
 
+    wordorder = Endian.BIG
+    identity_batch = 1
+    register_groups = {
+        "identity": (
+            "c_manufacturer",
+            "c_model",
+            "c_option",
+            "c_version",
+            "c_serialnumber",
+            "c_deviceaddress",
+            "c_sunspec_did",
+            "c_sunspec_length"
+        ),
+        "power": (
+            "current",
+            "l1_current",
+            "l2_current",
+            "l3_current",
+            "current_scale",
+            "voltage_ln",
+            "l1n_voltage",
+            "l2n_voltage",
+            "l3n_voltage",
+            "voltage_ll",
+            "l12_voltage",
+            "l23_voltage",
+            "l31_voltage",
+            "voltage_scale",
+            "frequency",
+            "frequency_scale",
+            "power",
+            "l1_power",
+            "l2_power",
+            "l3_power",
+            "power_scale",
+            "power_apparent",
+            "l1_power_apparent",
+            "l2_power_apparent",
+            "l3_power_apparent",
+            "power_apparent_scale",
+            "power_reactive",
+            "l1_power_reactive",
+            "l2_power_reactive",
+            "l3_power_reactive",
+            "power_reactive_scale",
+            "power_factor",
+            "l1_power_factor",
+            "l2_power_factor",
+            "l3_power_factor",
+            "power_factor_scale"
+        ),
+        "energy": (
+            "export_energy_active",
+            "l1_export_energy_active",
+            "l2_export_energy_active",
+            "l3_export_energy_active",
+            "import_energy_active",
+            "l1_import_energy_active",
+            "l2_import_energy_active",
+            "l3_import_energy_active",
+            "energy_active_scale",
+            "export_energy_apparent",
+            "l1_export_energy_apparent",
+            "l2_export_energy_apparent",
+            "l3_export_energy_apparent",
+            "import_energy_apparent",
+            "l1_import_energy_apparent",
+            "l2_import_energy_apparent",
+            "l3_import_energy_apparent",
+            "energy_apparent_scale",
+            "import_energy_reactive_q1",
+            "l1_import_energy_reactive_q1",
+            "l2_import_energy_reactive_q1",
+            "l3_import_energy_reactive_q1",
+            "import_energy_reactive_q2",
+            "l1_import_energy_reactive_q2",
+            "l2_import_energy_reactive_q2",
+            "l3_import_energy_reactive_q2",
+            "export_energy_reactive_q3",
+            "l1_export_energy_reactive_q3",
+            "l2_export_energy_reactive_q3",
+            "l3_export_energy_reactive_q3",
+            "export_energy_reactive_q4",
+            "l1_export_energy_reactive_q4",
+            "l2_export_energy_reactive_q4",
+            "l3_export_energy_reactive_q4",
+            "energy_reactive_scale"
+        )
+    }
+    scale_factors = {
+        "current": "current_scale",
+        "l1_current": "current_scale",
+        "l2_current": "current_scale",
+        "l3_current": "current_scale",
+        "voltage_ln": "voltage_scale",
+        "l1n_voltage": "voltage_scale",
+        "l2n_voltage": "voltage_scale",
+        "l3n_voltage": "voltage_scale",
+        "voltage_ll": "voltage_scale",
+        "l12_voltage": "voltage_scale",
+        "l23_voltage": "voltage_scale",
+        "l31_voltage": "voltage_scale",
+        "frequency": "frequency_scale",
+        "power": "power_scale",
+        "l1_power": "power_scale",
+        "l2_power": "power_scale",
+        "l3_power": "power_scale",
+        "power_apparent": "power_apparent_scale",
+        "l1_power_apparent": "power_apparent_scale",
+        "l2_power_apparent": "power_apparent_scale",
+        "l3_power_apparent": "power_apparent_scale",
+        "power_reactive": "power_reactive_scale",
+        "l1_power_reactive": "power_reactive_scale",
+        "l2_power_reactive": "power_reactive_scale",
+        "l3_power_reactive": "power_reactive_scale",
+        "power_factor": "power_factor_scale",
+        "l1_power_factor": "power_factor_scale",
+        "l2_power_factor": "power_factor_scale",
+        "l3_power_factor": "power_factor_scale",
+        "export_energy_active": "energy_active_scale",
+        "l1_export_energy_active": "energy_active_scale",
+        "l2_export_energy_active": "energy_active_scale",
+        "l3_export_energy_active": "energy_active_scale",
+        "import_energy_active": "energy_active_scale",
+        "l1_import_energy_active": "energy_active_scale",
+        "l2_import_energy_active": "energy_active_scale",
+        "l3_import_energy_active": "energy_active_scale",
+        "export_energy_apparent": "energy_apparent_scale",
+        "l1_export_energy_apparent": "energy_apparent_scale",
+        "l2_export_energy_apparent": "energy_apparent_scale",
+        "l3_export_energy_apparent": "energy_apparent_scale",
+        "import_energy_apparent": "energy_apparent_scale",
+        "l1_import_energy_apparent": "energy_apparent_scale",
+        "l2_import_energy_apparent": "energy_apparent_scale",
+        "l3_import_energy_apparent": "energy_apparent_scale",
+        "import_energy_reactive_q1": "energy_reactive_scale",
+        "l1_import_energy_reactive_q1": "energy_reactive_scale",
+        "l2_import_energy_reactive_q1": "energy_reactive_scale",
+        "l3_import_energy_reactive_q1": "energy_reactive_scale",
+        "import_energy_reactive_q2": "energy_reactive_scale",
+        "l1_import_energy_reactive_q2": "energy_reactive_scale",
+        "l2_import_energy_reactive_q2": "energy_reactive_scale",
+        "l3_import_energy_reactive_q2": "energy_reactive_scale",
+        "export_energy_reactive_q3": "energy_reactive_scale",
+        "l1_export_energy_reactive_q3": "energy_reactive_scale",
+        "l2_export_energy_reactive_q3": "energy_reactive_scale",
+        "l3_export_energy_reactive_q3": "energy_reactive_scale",
+        "export_energy_reactive_q4": "energy_reactive_scale",
+        "l1_export_energy_reactive_q4": "energy_reactive_scale",
+        "l2_export_energy_reactive_q4": "energy_reactive_scale",
+        "l3_export_energy_reactive_q4": "energy_reactive_scale"
+    }
+
+    register_table = MappingProxyType({
+        "c_manufacturer": (0x9cbb, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
+        "c_model": (0x9ccb, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
+        "c_option": (0x9cdb, 8, registerType.HOLDING, registerDataType.STRING, str, "Mode", "", 1),
+        "c_version": (0x9ce3, 8, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
+        "c_serialnumber": (0x9ceb, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
+        "c_deviceaddress": (0x9cfb, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
+        "c_sunspec_did": (0x9cfc, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", C_SUNSPEC_DID_MAP, 2),
+        "c_sunspec_length": (0x9cfd, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec Length", "16Bit Words", 2),
+
+        "current": (0x9cfe, 1, registerType.HOLDING, registerDataType.INT16, int, "Current", "A", 2),
+        "l1_current": (0x9cff, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Current", "A", 2),
+        "l2_current": (0x9d00, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Current", "A", 2),
+        "l3_current": (0x9d01, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Current", "A", 2),
+        "current_scale": (0x9d02, 1, registerType.HOLDING, registerDataType.SCALE, int, "Current Scale Factor", "", 2),
+
+        "voltage_ln": (0x9d03, 1, registerType.HOLDING, registerDataType.INT16, int, "L-N Voltage", "V", 2),
+        "l1n_voltage": (0x9d04, 1, registerType.HOLDING, registerDataType.INT16, int, "L1-N Voltage", "V", 2),
+        "l2n_voltage": (0x9d05, 1, registerType.HOLDING, registerDataType.INT16, int, "L2-N Voltage", "V", 2),
+        "l3n_voltage": (0x9d06, 1, registerType.HOLDING, registerDataType.INT16, int, "L3-N Voltage", "V", 2),
+        "voltage_ll": (0x9d07, 1, registerType.HOLDING, registerDataType.INT16, int, "L-L Voltage", "V", 2),
+        "l12_voltage": (0x9d08, 1, registerType.HOLDING, registerDataType.INT16, int, "L1-l2 Voltage", "V", 2),
+        "l23_voltage": (0x9d09, 1, registerType.HOLDING, registerDataType.INT16, int, "L2-l3 Voltage", "V", 2),
+        "l31_voltage": (0x9d0a, 1, registerType.HOLDING, registerDataType.INT16, int, "L3-l1 Voltage", "V", 2),
+        "voltage_scale": (0x9d0b, 1, registerType.HOLDING, registerDataType.SCALE, int, "Voltage Scale Factor", "", 2),
+
+        "frequency": (0x9d0c, 1, registerType.HOLDING, registerDataType.INT16, int, "Frequency", "Hz", 2),
+        "frequency_scale": (0x9d0d, 1, registerType.HOLDING, registerDataType.SCALE, int, "Frequency Scale Factor", "", 2),
+
+        "power": (0x9d0e, 1, registerType.HOLDING, registerDataType.INT16, int, "Power", "W", 2),
+        "l1_power": (0x9d0f, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power", "W", 2),
+        "l2_power": (0x9d10, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power", "W", 2),
+        "l3_power": (0x9d11, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power", "W", 2),
+        "power_scale": (0x9d12, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Scale Factor", "", 2),
+
+        "power_apparent": (0x9d13, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Apparent)", "VA", 2),
+        "l1_power_apparent": (0x9d14, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power (Apparent)", "VA", 2),
+        "l2_power_apparent": (0x9d15, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power (Apparent)", "VA", 2),
+        "l3_power_apparent": (0x9d16, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power (Apparent)", "VA", 2),
+        "power_apparent_scale": (0x9d17, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Apparent) Scale Factor", "", 2),
+
+        "power_reactive": (0x9d18, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Reactive)", "VAr", 2),
+        "l1_power_reactive": (0x9d19, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power (Reactive)", "VAr", 2),
+        "l2_power_reactive": (0x9d1a, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power (Reactive)", "VAr", 2),
+        "l3_power_reactive": (0x9d1b, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power (Reactive)", "VAr", 2),
+        "power_reactive_scale": (0x9d1c, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Reactive) Scale Factor", "", 2),
+
+        "power_factor": (0x9d1d, 1, registerType.HOLDING, registerDataType.INT16, int, "Power Factor", "", 2),
+        "l1_power_factor": (0x9d1e, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power Factor", "", 2),
+        "l2_power_factor": (0x9d1f, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power Factor", "", 2),
+        "l3_power_factor": (0x9d20, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power Factor", "", 2),
+        "power_factor_scale": (0x9d21, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Factor Scale Factor", "", 2),
+
+        "export_energy_active": (0x9d22, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Active)", "Wh", 2),
+        "l1_export_energy_active": (0x9d24, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Active)", "Wh", 2),
+        "l2_export_energy_active": (0x9d26, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Active)", "Wh", 2),
+        "l3_export_energy_active": (0x9d28, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Active)", "Wh", 2),
+        "import_energy_active": (0x9d2a, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Active)", "Wh", 2),
+        "l1_import_energy_active": (0x9d2c, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Active)", "Wh", 2),
+        "l2_import_energy_active": (0x9d2e, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Active)", "Wh", 2),
+        "l3_import_energy_active": (0x9d30, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Active)", "Wh", 2),
+        "energy_active_scale": (0x9d32, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Active) Scale Factor", "", 2),
+
+        "export_energy_apparent": (0x9d33, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Apparent)", "VAh", 3),
+        "l1_export_energy_apparent": (0x9d35, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Apparent)", "VAh", 3),
+        "l2_export_energy_apparent": (0x9d37, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Apparent)", "VAh", 3),
+        "l3_export_energy_apparent": (0x9d39, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Apparent)", "VAh", 3),
+        "import_energy_apparent": (0x9d3b, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Apparent)", "VAh", 3),
+        "l1_import_energy_apparent": (0x9d3d, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Apparent)", "VAh", 3),
+        "l2_import_energy_apparent": (0x9d3f, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Apparent)", "VAh", 3),
+        "l3_import_energy_apparent": (0x9d41, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Apparent)", "VAh", 3),
+        "energy_apparent_scale": (0x9d43, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Apparent) Scale Factor", "", 3),
+
+        "import_energy_reactive_q1": (0x9d44, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Reactive) Quadrant 1", "VArh", 3),
+        "l1_import_energy_reactive_q1": (0x9d46, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
+        "l2_import_energy_reactive_q1": (0x9d48, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
+        "l3_import_energy_reactive_q1": (0x9d4a, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
+        "import_energy_reactive_q2": (0x9d4c, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Reactive) Quadrant 2", "VArh", 3),
+        "l1_import_energy_reactive_q2": (0x9d4e, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
+        "l2_import_energy_reactive_q2": (0x9d50, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
+        "l3_import_energy_reactive_q2": (0x9d52, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
+        "export_energy_reactive_q3": (0x9d54, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Reactive) Quadrant 3", "VArh", 3),
+        "l1_export_energy_reactive_q3": (0x9d56, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
+        "l2_export_energy_reactive_q3": (0x9d58, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
+        "l3_export_energy_reactive_q3": (0x9d5a, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
+        "export_energy_reactive_q4": (0x9d5c, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Reactive) Quadrant 4", "VArh", 3),
+        "l1_export_energy_reactive_q4": (0x9d5e, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
+        "l2_export_energy_reactive_q4": (0x9d60, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
+        "l3_export_energy_reactive_q4": (0x9d62, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
+        "energy_reactive_scale": (0x9d64, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Reactive) Scale Factor", "", 3)
+    })
+
     def __init__(self, offset=False, *args, **kwargs):
         self.model = f"Meter{offset + 1}"
-        self.wordorder = Endian.BIG
 
         super().__init__(*args, **kwargs)
 
         self.offset = METER_REGISTER_OFFSETS[offset]
-        self.registers = {
-            "c_manufacturer": (0x9cbb + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
-            "c_model": (0x9ccb + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
-            "c_option": (0x9cdb + self.offset, 8, registerType.HOLDING, registerDataType.STRING, str, "Mode", "", 1),
-            "c_version": (0x9ce3 + self.offset, 8, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
-            "c_serialnumber": (0x9ceb + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
-            "c_deviceaddress": (0x9cfb + self.offset, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
-            "c_sunspec_did": (0x9cfc + self.offset, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", C_SUNSPEC_DID_MAP, 2),
-            "c_sunspec_length": (0x9cfd + self.offset, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec Length", "16Bit Words", 2),
-
-            "current": (0x9cfe + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Current", "A", 2),
-            "l1_current": (0x9cff + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Current", "A", 2),
-            "l2_current": (0x9d00 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Current", "A", 2),
-            "l3_current": (0x9d01 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Current", "A", 2),
-            "current_scale": (0x9d02 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Current Scale Factor", "", 2),
-
-            "voltage_ln": (0x9d03 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L-N Voltage", "V", 2),
-            "l1n_voltage": (0x9d04 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1-N Voltage", "V", 2),
-            "l2n_voltage": (0x9d05 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2-N Voltage", "V", 2),
-            "l3n_voltage": (0x9d06 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3-N Voltage", "V", 2),
-            "voltage_ll": (0x9d07 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L-L Voltage", "V", 2),
-            "l12_voltage": (0x9d08 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1-l2 Voltage", "V", 2),
-            "l23_voltage": (0x9d09 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2-l3 Voltage", "V", 2),
-            "l31_voltage": (0x9d0a + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3-l1 Voltage", "V", 2),
-            "voltage_scale": (0x9d0b + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Voltage Scale Factor", "", 2),
-
-            "frequency": (0x9d0c + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Frequency", "Hz", 2),
-            "frequency_scale": (0x9d0d + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Frequency Scale Factor", "", 2),
-
-            "power": (0x9d0e + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Power", "W", 2),
-            "l1_power": (0x9d0f + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power", "W", 2),
-            "l2_power": (0x9d10 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power", "W", 2),
-            "l3_power": (0x9d11 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power", "W", 2),
-            "power_scale": (0x9d12 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Scale Factor", "", 2),
-
-            "power_apparent": (0x9d13 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Apparent)", "VA", 2),
-            "l1_power_apparent": (0x9d14 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power (Apparent)", "VA", 2),
-            "l2_power_apparent": (0x9d15 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power (Apparent)", "VA", 2),
-            "l3_power_apparent": (0x9d16 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power (Apparent)", "VA", 2),
-            "power_apparent_scale": (0x9d17 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Apparent) Scale Factor", "", 2),
-
-            "power_reactive": (0x9d18 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Power (Reactive)", "VAr", 2),
-            "l1_power_reactive": (0x9d19 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power (Reactive)", "VAr", 2),
-            "l2_power_reactive": (0x9d1a + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power (Reactive)", "VAr", 2),
-            "l3_power_reactive": (0x9d1b + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power (Reactive)", "VAr", 2),
-            "power_reactive_scale": (0x9d1c + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power (Reactive) Scale Factor", "", 2),
-
-            "power_factor": (0x9d1d + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "Power Factor", "", 2),
-            "l1_power_factor": (0x9d1e + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L1 Power Factor", "", 2),
-            "l2_power_factor": (0x9d1f + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L2 Power Factor", "", 2),
-            "l3_power_factor": (0x9d20 + self.offset, 1, registerType.HOLDING, registerDataType.INT16, int, "L3 Power Factor", "", 2),
-            "power_factor_scale": (0x9d21 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Power Factor Scale Factor", "", 2),
-
-            "export_energy_active": (0x9d22 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Active)", "Wh", 2),
-            "l1_export_energy_active": (0x9d24 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Active)", "Wh", 2),
-            "l2_export_energy_active": (0x9d26 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Active)", "Wh", 2),
-            "l3_export_energy_active": (0x9d28 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Active)", "Wh", 2),
-            "import_energy_active": (0x9d2a + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Active)", "Wh", 2),
-            "l1_import_energy_active": (0x9d2c + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Active)", "Wh", 2),
-            "l2_import_energy_active": (0x9d2e + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Active)", "Wh", 2),
-            "l3_import_energy_active": (0x9d30 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Active)", "Wh", 2),
-            "energy_active_scale": (0x9d32 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Active) Scale Factor", "", 2),
-
-            "export_energy_apparent": (0x9d33 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Apparent)", "VAh", 3),
-            "l1_export_energy_apparent": (0x9d35 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Apparent)", "VAh", 3),
-            "l2_export_energy_apparent": (0x9d37 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Apparent)", "VAh", 3),
-            "l3_export_energy_apparent": (0x9d39 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Apparent)", "VAh", 3),
-            "import_energy_apparent": (0x9d3b + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Apparent)", "VAh", 3),
-            "l1_import_energy_apparent": (0x9d3d + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Apparent)", "VAh", 3),
-            "l2_import_energy_apparent": (0x9d3f + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Apparent)", "VAh", 3),
-            "l3_import_energy_apparent": (0x9d41 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Apparent)", "VAh", 3),
-            "energy_apparent_scale": (0x9d43 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Apparent) Scale Factor", "", 3),
-
-            "import_energy_reactive_q1": (0x9d44 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Reactive) Quadrant 1", "VArh", 3),
-            "l1_import_energy_reactive_q1": (0x9d46 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
-            "l2_import_energy_reactive_q1": (0x9d48 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
-            "l3_import_energy_reactive_q1": (0x9d4a + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Reactive) Quadrant 1", "VArh", 3),
-            "import_energy_reactive_q2": (0x9d4c + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Imported Energy (Reactive) Quadrant 2", "VArh", 3),
-            "l1_import_energy_reactive_q2": (0x9d4e + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
-            "l2_import_energy_reactive_q2": (0x9d50 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
-            "l3_import_energy_reactive_q2": (0x9d52 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Imported Energy (Reactive) Quadrant 2", "VArh", 3),
-            "export_energy_reactive_q3": (0x9d54 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Reactive) Quadrant 3", "VArh", 3),
-            "l1_export_energy_reactive_q3": (0x9d56 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
-            "l2_export_energy_reactive_q3": (0x9d58 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
-            "l3_export_energy_reactive_q3": (0x9d5a + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Reactive) Quadrant 3", "VArh", 3),
-            "export_energy_reactive_q4": (0x9d5c + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Total Exported Energy (Reactive) Quadrant 4", "VArh", 3),
-            "l1_export_energy_reactive_q4": (0x9d5e + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L1 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
-            "l2_export_energy_reactive_q4": (0x9d60 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L2 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
-            "l3_export_energy_reactive_q4": (0x9d62 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "L3 Exported Energy (Reactive) Quadrant 4", "VArh", 3),
-            "energy_reactive_scale": (0x9d64 + self.offset, 1, registerType.HOLDING, registerDataType.SCALE, int, "Energy (Reactive) Scale Factor", "", 3)
-        }
 
 class StorEdge(SolarEdge):
-    
-    def __init__(self, *args, **kwargs):
-        self.model = "StorEdge"
-        self.wordorder = Endian.LITTLE
-
-        super().__init__(*args, **kwargs)
 
-        self.registers = {
-            "export_control_mode": (0xe000, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Mode", EXPORT_CONTROL_MODE_MAP, 1),
-            "export_control_limit_mode": (0xe001, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Limit Mode", EXPORT_CONTROL_LIMIT_MAP, 1),
-            "export_control_site_limit": (0xe002, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Export Control Site Limit", "", 1),
-            
-            "storedge_control_mode": (0xe004, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Control Mode", STOREDGE_CONTROL_MODE, 1),
-            "storedge_ac_charge_policy": (0xe005, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge AC Charge Policy", STOREDGE_AC_CHARGE_POLICY, 1),
-            "storedge_ac_charge_limit": (0xe006, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge AC Charge Limit (kWh or %)", "", 1),
-            "storedge_backup_reserved": (0xe008, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Backup Reserved (%)", "", 1),
-
-            "storedge_remote_default_command_mode": (0xe00a, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Default Charge Mode", STOREDGE_CHARGE_DISCHARGE_MODE, 1),
-            "storedge_remote_command_timeout": (0xe00b, 2, registerType.HOLDING, registerDataType.UINT32, int, "StorEdge Remote Command Timeout", "", 1),
-            "storedge_remote_command_mode": (0xe00d, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Remote Command Mode", STOREDGE_CHARGE_DISCHARGE_MODE, 1),
-            "storedge_remote_charge_limit": (0xe00e, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Remote Command Charge Limit", "", 1),
-            "storedge_remote_discharge_limit": (0xe010, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Remote Command Discharge Limit", "", 1),
-        }
+    model = "StorEdge"
+    wordorder = Endian.LITTLE
+    register_groups = {
+        "storedge": (
+            "export_control_mode",
+            "export_control_limit_mode",
+            "export_control_site_limit",
+            "storedge_control_mode",
+            "storedge_ac_charge_policy",
+            "storedge_ac_charge_limit",
+            "storedge_backup_reserved",
+            "storedge_remote_default_command_mode",
+            "storedge_remote_command_timeout",
+            "storedge_remote_command_mode",
+            "storedge_remote_charge_limit",
+            "storedge_remote_discharge_limit"
+        )
+    }
+
+    register_table = MappingProxyType({
+        "export_control_mode": (0xe000, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Mode", EXPORT_CONTROL_MODE_MAP, 1),
+        "export_control_limit_mode": (0xe001, 1, registerType.HOLDING, registerDataType.UINT16, int, "Export Control Limit Mode", EXPORT_CONTROL_LIMIT_MAP, 1),
+        "export_control_site_limit": (0xe002, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Export Control Site Limit", "", 1),
+        
+        "storedge_control_mode": (0xe004, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Control Mode", STOREDGE_CONTROL_MODE, 1),
+        "storedge_ac_charge_policy": (0xe005, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge AC Charge Policy", STOREDGE_AC_CHARGE_POLICY, 1),
+        "storedge_ac_charge_limit": (0xe006, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge AC Charge Limit (kWh or %)", "", 1),
+        "storedge_backup_reserved": (0xe008, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Backup Reserved (%)", "", 1),
+
+        "storedge_remote_default_command_mode": (0xe00a, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Default Charge Mode", STOREDGE_CHARGE_DISCHARGE_MODE, 1),
+        "storedge_remote_command_timeout": (0xe00b, 2, registerType.HOLDING, registerDataType.UINT32, int, "StorEdge Remote Command Timeout", "", 1),
+        "storedge_remote_command_mode": (0xe00d, 1, registerType.HOLDING, registerDataType.UINT16, int, "StorEdge Remote Command Mode", STOREDGE_CHARGE_DISCHARGE_MODE, 1),
+        "storedge_remote_charge_limit": (0xe00e, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Remote Command Charge Limit", "", 1),
+        "storedge_remote_discharge_limit": (0xe010, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "StorEdge Remote Command Discharge Limit", "", 1),
+    })
 
 class Battery(SolarEdge):
 
+    wordorder = Endian.LITTLE
+    identity_batch = 1
+    register_groups = {
+        "identity": (
+            "c_manufacturer",
+            "c_model",
+            "c_version",
+            "c_serialnumber",
+            "c_deviceaddress",
+            "c_sunspec_did",
+            "rated_energy",
+            "maximum_charge_continuous_power",
+            "maximum_discharge_continuous_power",
+            "maximum_charge_peak_power",
+            "maximum_discharge_peak_power"
+        ),
+        "power": (
+            "average_temperature",
+            "maximum_temperature",
+            "instantaneous_voltage",
+            "instantaneous_current",
+            "instantaneous_power",
+            "soh",
+            "soe",
+            "status",
+            "status_internal",
+            "event_log",
+            "event_log_internal"
+        ),
+        "energy": (
+            "lifetime_export_energy_counter",
+            "lifetime_import_energy_counter",
+            "maximum_energy",
+            "available_energy"
+        )
+    }
+
+    register_table = MappingProxyType({
+        "c_manufacturer": (0xe100, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
+        "c_model": (0xe110, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
+        "c_version": (0xe120, 16, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
+        "c_serialnumber": (0xe130, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
+        "c_deviceaddress": (0xe140, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
+        "c_sunspec_did": (0xe141, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", "", 1),
+
+        "rated_energy": (0xe142, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Rated Energy", "Wh", 2),
+        "maximum_charge_continuous_power": (0xe144, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Charge Continuous Power", "W", 2),
+        "maximum_discharge_continuous_power": (0xe146, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Discharge Continuous Power", "W", 2),
+        "maximum_charge_peak_power": (0xe148, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Charge Peak Power", "W", 2),
+        "maximum_discharge_peak_power": (0xe14a, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Discharge Peak Power", "W", 2),
+
+        "average_temperature": (0xe16c, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Average Temperature", "°C", 2),
+        "maximum_temperature": (0xe16e, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Temperature", "°C", 2),
+
+        "instantaneous_voltage": (0xe170, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Voltage", "V", 2),
+        "instantaneous_current": (0xe172, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Current", "A", 2),
+        "instantaneous_power": (0xe174, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Power", "W", 2),
+
+        "lifetime_export_energy_counter": (0xe176, 4, registerType.HOLDING, registerDataType.UINT64, int, "Total Exported Energy", "Wh", 2),
+        "lifetime_import_energy_counter": (0xe17A, 4, registerType.HOLDING, registerDataType.UINT64, int, "Total Imported Energy", "Wh", 2),
+
+        "maximum_energy": (0xe17e, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Energy", "Wh", 2),
+        "available_energy": (0xe180, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Available Energy", "Wh", 2),
+
+        "soh": (0xe182, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "State of Health (SOH)", "%", 2),
+        "soe": (0xe184, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "State of Energy (SOE)", "%", 2),
+
+        "status": (0xe186, 2, registerType.HOLDING, registerDataType.UINT32, int, "Status", BATTERY_STATUS_MAP, 2),
+        "status_internal": (0xe188, 2, registerType.HOLDING, registerDataType.UINT32, int, "Internal Status", BATTERY_STATUS_MAP, 2),
+
+        "event_log": (0xe18a, 2, registerType.HOLDING, registerDataType.UINT16, int, "Event Log", "", 2),
+        "event_log_internal": (0xe192, 2, registerType.HOLDING, registerDataType.UINT16, int, "Internal Event Log", "", 2),
+    })
+
     def __init__(self, offset=False, *args, **kwargs):
         self.model = f"Battery{offset + 1}"
-        self.wordorder = Endian.LITTLE
 
         super().__init__(*args, **kwargs)
 
         self.offset = BATTERY_REGISTER_OFFSETS[offset]
-        self.registers = {
-            "c_manufacturer": (0xe100 + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Manufacturer", "", 1),
-            "c_model": (0xe110 + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Model", "", 1),
-            "c_version": (0xe120 + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Version", "", 1),
-            "c_serialnumber": (0xe130 + self.offset, 16, registerType.HOLDING, registerDataType.STRING, str, "Serial", "", 1),
-            "c_deviceaddress": (0xe140 + self.offset, 1, registerType.HOLDING, registerDataType.UINT16, int, "Modbus ID", "", 1),
-            "c_sunspec_did": (0xe141 + self.offset, 1, registerType.HOLDING, registerDataType.UINT16, int, "SunSpec DID", "", 1),
-
-            "rated_energy": (0xe142 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Rated Energy", "Wh", 2),
-            "maximum_charge_continuous_power": (0xe144 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Charge Continuous Power", "W", 2),
-            "maximum_discharge_continuous_power": (0xe146 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Discharge Continuous Power", "W", 2),
-            "maximum_charge_peak_power": (0xe148 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Charge Peak Power", "W", 2),
-            "maximum_discharge_peak_power": (0xe14a + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Discharge Peak Power", "W", 2),
-
-            "average_temperature": (0xe16c + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Average Temperature", "°C", 2),
-            "maximum_temperature": (0xe16e + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Temperature", "°C", 2),
-
-            "instantaneous_voltage": (0xe170 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Voltage", "V", 2),
-            "instantaneous_current": (0xe172 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Current", "A", 2),
-            "instantaneous_power": (0xe174 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Instantaneous Power", "W", 2),
-
-            "lifetime_export_energy_counter": (0xe176 + self.offset, 4, registerType.HOLDING, registerDataType.UINT64, int, "Total Exported Energy", "Wh", 2),
-            "lifetime_import_energy_counter": (0xe17A + self.offset, 4, registerType.HOLDING, registerDataType.UINT64, int, "Total Imported Energy", "Wh", 2),
-
-            "maximum_energy": (0xe17e + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Maximum Energy", "Wh", 2),
-            "available_energy": (0xe180 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "Available Energy", "Wh", 2),
-
-            "soh": (0xe182 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "State of Health (SOH)", "%", 2),
-            "soe": (0xe184 + self.offset, 2, registerType.HOLDING, registerDataType.SEFLOAT, float, "State of Energy (SOE)", "%", 2),
-
-            "status": (0xe186 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Status", BATTERY_STATUS_MAP, 2),
-            "status_internal": (0xe188 + self.offset, 2, registerType.HOLDING, registerDataType.UINT32, int, "Internal Status", BATTERY_STATUS_MAP, 2),
-
-            "event_log": (0xe18a + self.offset, 2, registerType.HOLDING, registerDataType.UINT16, int, "Event Log", "", 2),
-            "event_log_internal": (0xe192 + self.offset, 2, registerType.HOLDING, registerDataType.UINT16, int, "Internal Event Log", "", 2),
-        }
+
+
+class AsyncSolarEdge(SolarEdge):
+
+    def _connection_key(self):
+        # Async clients are bound to an event loop, never pool them
+        return None
+
+    def _create_client(self):
+        if self.mode is connectionType.RTU:
+            from pymodbus.client import AsyncModbusSerialClient
+
+            return AsyncModbusSerialClient(
+                port=self.device,
+                stopbits=self.stopbits,
+                parity=self.parity,
+                baudrate=self.baud,
+                timeout=self.timeout,
+                retries=0)
+        elif self.mode is connectionType.TCP:
+            from pymodbus.client import AsyncModbusTcpClient
+
+            # Retries are up to the retry policy, not the client
+            return AsyncModbusTcpClient(
+                host=self.host,
+                port=self.port,
+                timeout=self.timeout,
+                retries=0
+            )
+        else:
+            raise NotImplementedError(self.mode)
+
+    def _request_lock(self):
+        # A serial bus carries one request at a time, so concurrent reads of
+        # the devices on it, like those of discover() or asyncio.gather(),
+        # take turns. Modbus TCP matches responses by transaction ID.
+        if self.mode is not connectionType.RTU:
+            return None
+
+        if self._connection.async_lock is None:
+            self._connection.async_lock = _asyncio().Lock()
+
+        return self._connection.async_lock
+
+    async def _read_registers(self, rtype, address, length):
+        if rtype == registerType.HOLDING:
+            request = self.client.read_holding_registers
+            response_type = ReadHoldingRegistersResponse
+        elif rtype == registerType.INPUT:
+            request = self.client.read_input_registers
+            response_type = ReadInputRegistersResponse
+        else:
+            raise NotImplementedError(rtype)
+
+        metrics = self.metrics
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+
+        if breaker and not breaker.allow(time.monotonic()):
+            if metrics:
+                metrics.request_skipped(self)
+
+            return None
+
+        lock = self._request_lock()
+        outcome = "error"
+
+        for i in range(self.retries):
+            if i:
+                await _asyncio().sleep(policy.delay(i - 1))
+
+            if not self.connected():
+                connected = await self.connect()
+
+                if metrics:
+                    metrics.reconnected(self, connected)
+
+                if not connected:
+                    outcome = "error"
+                    continue
+
+            if metrics:
+                metrics.request_started(self, rtype, address, length)
+
+            if lock is not None:
+                await lock.acquire()
+
+            try:
+                start = time.monotonic()
+                result = await request(address, length, slave=self.unit)
+            except (ModbusException, OSError, AttributeError):
+                # pymodbus drops a serial transport that timed out twice,
+                # failing with AttributeError the second time
+                result = None
+            finally:
+                if lock is not None:
+                    lock.release()
+
+            elapsed = time.monotonic() - start
+            outcome = _request_result(result, response_type, length)
+
+            if metrics:
+                metrics.request_finished(self, rtype, address, length, outcome, elapsed, i)
+
+            if outcome == "ok":
+                self._connection.cost.observe(length, elapsed)
+                break
+            if not policy.retry(outcome):
+                break
+
+        self._record_outcome(breaker, outcome)
+
+        if outcome != "ok":
+            return None
+        if self.recorder is not None:
+            self._capture(rtype, address, result.registers)
+
+        return result.registers
+
+    async def _read_holding_registers(self, address, length):
+        wordorder = Endian.LITTLE if address in self.little_endian_registers else self.wordorder
+        registers = await self._read_registers(registerType.HOLDING, address, length)
+
+        if registers is None:
+            return None
+
+        return BinaryPayloadDecoder.fromRegisters(registers, byteorder=Endian.BIG, wordorder=wordorder)
+
+    async def _write_holding_register(self, address, value, dtype):
+        wordorder = Endian.LITTLE if address in self.little_endian_registers else self.wordorder
+        encoded_value = self._encode_value(value, dtype, wordorder)
+        lock = self._request_lock()
+
+        if lock is None:
+            return await self.client.write_registers(address=address, values=encoded_value, slave=self.unit)
+
+        async with lock:
+            return await self.client.write_registers(address=address, values=encoded_value, slave=self.unit)
+
+    async def _read(self, value):
+        return (await self._read_block(self._read_field(value))).get("value", False)
+
+    async def _read_block(self, block):
+        registers = await self._read_registers(block.rtype, block.address + self.offset, block.length)
+
+        if not registers:
+            return {}
+
+        return self._decode_block(block, registers)
+
+    async def _write(self, value, data):
+        return await super()._write(value, data)
+
+    async def connect(self):
+        return await self.client.connect()
+
+    def connected(self):
+        return self.client.connected
+
+    async def read(self, key):
+        if key not in self.registers:
+            raise KeyError(key)
+
+        return {key: await self._read(self.registers[key])}
+
+    async def write(self, key, data):
+        if key not in self.registers:
+            raise KeyError(key)
+
+        return await self._write(self.registers[key], data)
+
+    async def read_fields(self, keys, scaled=False):
+        results = {}
+
+        for block in self._read_cover(frozenset(keys)):
+            results.update(await self._read_block(block))
+
+        if scaled:
+            for rtype in registerType:
+                self._scale(results, rtype)
+
+        self._record(results, scaled)
+        return results
+
+    async def read_all(self, rtype=registerType.HOLDING, scaled=False):
+        results = {}
+
+        for block in self._read_plan(rtype):
+            values = self._cached_block(block)
+
+            if values is None:
+                values = await self._read_block(block)
+                self._cache_block(block, values)
+
+            results.update(values)
+
+        if self._identity_changed(results):
+            for block in self._identity_blocks(rtype):
+                values = await self._read_block(block)
+                self._cache_block(block, values)
+                results.update(values)
+
+            self._identity_changed(results)
+
+        if scaled:
+            self._scale(results, rtype)
+
+        self._record(results, scaled)
+        return results
+
+
+class AsyncInverter(AsyncSolarEdge, Inverter):
+
+    async def discover(self, refresh=False):
+        if self._topology is not None and not refresh:
+            return dict(self._topology)
+
+        candidates = self._topology_candidates()
+        requests = self._topology_probes(candidates)
+        values = await _asyncio().gather(*(device._read_block(block) for device, block in requests))
+        results = self._topology_results(requests, values)
+        serial, present, cached = self._topology_revalidate(candidates, results)
+
+        if not cached:
+            requests = self._identity_probes(present)
+            values = await _asyncio().gather(*(device._read_block(block) for device, block in requests))
+            self._topology_store(serial, present, self._topology_results(requests, values))
+
+        return self._topology_finish(candidates, present, serial)
+
+    async def meters(self, refresh=False):
+        return {k: v for k, v in (await self.discover(refresh)).items() if k.startswith("Meter")}
+
+    async def batteries(self, refresh=False):
+        return {k: v for k, v in (await self.discover(refresh)).items() if k.startswith("Battery")}
+
+
+class AsyncMeter(AsyncSolarEdge, Meter):
+    pass
+
+
+class AsyncStorEdge(AsyncSolarEdge, StorEdge):
+    pass
+
+
+class AsyncBattery(AsyncSolarEdge, Battery):
+    pass
+
+
+def _pipeline_requests(client, requests, timeout, window=PIPELINE_WINDOW):
+    # Send Modbus TCP read requests back-to-back on a shared socket, keeping
+    # up to `window` of them in flight, and match the responses by
+    # transaction ID. Each request has `timeout` to be answered. A unit that
+    # lets a request time out is given up on for this call: its requests
+    # still in flight run out their own timeout while the other units are
+    # drained, and its queued ones are not sent, like those of units whose
+    # circuit breaker is open. Returns the raw registers per request index,
+    # the indexes given up on, and the result of the other requests that
+    # were sent but failed, so the caller can decide whether to retry them.
+    if not client.is_socket_open() and not client.connect():
+        return {}, set(), {}
+
+    sock = client.socket
+
+    if sock is None:
+        return {}, set(), {}
+
+    previous_timeout = sock.gettimeout()
+    queue = iter(enumerate(requests))
+    pending = {}
+    responses = {}
+    failed = set()
+    results = {}
+    timed_out = set()
+    allowed = {}
+    buffer = b""
+
+    def expire(now):
+        for tid in [tid for tid, request in pending.items() if now - request[5] >= timeout]:
+            n, function, device, block, address, start = pending.pop(tid)
+            failed.add(n)
+
+            # The requests in flight to a unit time out together, that is
+            # one failure to its breaker
+            if device.unit not in timed_out:
+                timed_out.add(device.unit)
+                device._record_outcome(device.circuit_breaker, "error")
+
+            if device.metrics:
+                device.metrics.request_finished(device, block.rtype, address, block.length, "error", now - start, 0)
+
+    try:
+        while True:
+            frames = []
+
+            while len(pending) < window:
+                request = next(queue, None)
+
+                if request is None:
+                    break
+
+                n, (device, block) = request
+
+                # Ask the breaker of each unit once, so a half open breaker
+                # lets the unit's requests through as one probe
+                if device.unit not in allowed:
+                    breaker = device.circuit_breaker
+                    allowed[device.unit] = not breaker or breaker.allow(time.monotonic())
+
+                if device.unit in timed_out or not allowed[device.unit]:
+                    failed.add(n)
+
+                    if device.metrics:
+                        device.metrics.request_skipped(device)
+
+                    continue
+
+                tid = client.transaction.getNextTID()
+                function = 0x04 if block.rtype == registerType.INPUT else 0x03
+                address = block.address + device.offset
+                frames.append(struct.pack(">HHHBBHH", tid, 0, 6, device.unit, function, address, block.length))
+
+                if device.metrics:
+                    device.metrics.request_started(device, block.rtype, address, block.length)
+
+                pending[tid] = (n, function, device, block, address, time.monotonic())
+
+            if frames:
+                sock.sendall(b"".join(frames))
+
+            if not pending:
+                break
+
+            # Wait no longer than the oldest request in flight has left
+            now = time.monotonic()
+            remaining = min(request[5] for request in pending.values()) + timeout - now
+
+            if remaining <= 0:
+                expire(now)
+                continue
+
+            sock.settimeout(remaining)
+
+            try:
+                data = sock.recv(4096)
+            except socket.timeout:
+                expire(time.monotonic())
+                continue
+
+            if not data:
+                break
+
+            buffer += data
+            desynchronised = False
+
+            while len(buffer) >= 7:
+                tid, protocol, length, unit = struct.unpack_from(">HHHB", buffer)
+
+                # A frame that is not Modbus TCP leaves no way to find the
+                # next one, the requests in flight fail with the connection
+                if protocol != 0 or length > MBAP_MAX_LENGTH:
+                    desynchronised = True
+                    break
+
+                if len(buffer) < 6 + length:
+                    break
+
+                pdu = buffer[7:6 + length]
+                buffer = buffer[6 + length:]
+
+                # Late answers to requests that timed out are dropped here
+                if tid not in pending:
+                    continue
+
+                n, function, device, block, address, start = pending.pop(tid)
+                count = block.length
+
+                if unit != device.unit or len(pdu) < 2:
+                    result = results[n] = "error"
+                elif pdu[0] == function and pdu[1] == count * 2 and len(pdu) == 2 + count * 2:
+                    responses[n] = list(struct.unpack_from(f">{count}H", pdu, 2))
+                    result = "ok"
+
+                    if device.recorder is not None:
+                        device._capture(block.rtype, address, responses[n])
+                elif pdu[0] == function | 0x80:
+                    # Acknowledge and slave device busy ask to try again later
+                    result = "busy" if pdu[1] in (5, 6) else "exception"
+                    results[n] = result
+                elif pdu[0] == function:
+                    result = results[n] = "short"
+                else:
+                    result = results[n] = "error"
+
+                device._record_outcome(device.circuit_breaker, result)
+
+                if device.metrics:
+                    device.metrics.request_finished(device, block.rtype, address, count, result, time.monotonic() - start, 0)
+
+            if desynchronised:
+                break
+    except OSError:
+        pass
+    finally:
+        for n, function, device, block, address, start in pending.values():
+            results[n] = "error"
+
+            if device.metrics:
+                device.metrics.request_finished(device, block.rtype, address, block.length, "error", time.monotonic() - start, 0)
+
+        if pending or timed_out:
+            # Late responses would be mistaken for replies to the next request
+            client.close()
+        else:
+            sock.settimeout(previous_timeout)
+
+    return responses, failed, results
+
+
+def _read_blocks(requests, window=PIPELINE_WINDOW):
+    # Read (device, block) pairs on the same connection, pipelined over
+    # Modbus TCP, and return the decoded values of each. Blocks of units
+    # that timed out or whose breaker is open are not read again, failed
+    # requests are retried on their own as far as the retry policy allows,
+    # with the pipelined attempt counting as the first.
+    device = requests[0][0] if requests else None
+    responses = {}
+    failed = set()
+    results = {}
+
+    if device is not None and device.mode is connectionType.TCP:
+        with device._connection.lock:
+            responses, failed, results = _pipeline_requests(device.client, requests, device.timeout, window)
+
+    values = []
+
+    for n, (device, block) in enumerate(requests):
+        if n in responses:
+            values.append(device._decode_block(block, responses[n]))
+        elif n in failed or (n in results and not device.retry_policy.retry(results[n])):
+            values.append({})
+        else:
+            values.append(device._read_block(block, 1 if n in results else 0))
+
+    return values
+
+
+def _crc16(frame):
+    crc = 0xffff
+
+    for byte in frame:
+        crc ^= byte
+
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xa001 if crc & 1 else crc >> 1
+
+    return struct.pack("<H", crc)
+
+
+def _scan_timeout(timeout, minimum, elapsed):
+    # Once units answer, the round trip is known and waiting much longer
+    # than it for an absent unit is wasted time
+    return min(timeout, max(minimum, SCAN_TIMEOUT_FACTOR * elapsed))
+
+
+def _scan_tcp(client, units, timeout, window=PIPELINE_WINDOW):
+    # Pipeline SunSpec header reads to every unit, keeping up to `window`
+    # in flight, each with its own deadline. Gateways answer for absent
+    # units with an exception or not at all.
+    if not client.is_socket_open() and not client.connect():
+        return []
+
+    sock = client.socket
+    previous_timeout = sock.gettimeout()
+    queue = iter(units)
+    pending = {}
+    found = []
+    buffer = b""
+    stale = False
+
+    try:
+        while True:
+            frames = []
+
+            while len(pending) < window:
+                unit = next(queue, None)
+
+                if unit is None:
+                    break
+
+                tid = client.transaction.getNextTID()
+                frames.append(struct.pack(">HHHBBHH", tid, 0, 6, unit, 0x03, SUNSPEC_ADDRESS, 2))
+                pending[tid] = (unit, time.monotonic())
+
+            if frames:
+                sock.sendall(b"".join(frames))
+
+            if not pending:
+                break
+
+            now = time.monotonic()
+            expired = [tid for tid, (unit, start) in pending.items() if now - start >= timeout]
+
+            if expired:
+                for tid in expired:
+                    del pending[tid]
+
+                stale = True
+                continue
+
+            sock.settimeout(min(start for unit, start in pending.values()) + timeout - now)
+
+            try:
+                data = sock.recv(4096)
+            except socket.timeout:
+                continue
+
+            if not data:
+                break
+
+            buffer += data
+
+            while len(buffer) >= 7:
+                tid, protocol, length = struct.unpack_from(">HHH", buffer)
+
+                if len(buffer) < 6 + length:
+                    break
+
+                pdu = buffer[7:6 + length]
+                buffer = buffer[6 + length:]
+
+                if tid not in pending:
+                    continue
+
+                unit, start = pending.pop(tid)
+
+                if pdu == b"\x03\x04" + SUNSPEC_ID:
+                    found.append(unit)
+                    timeout = _scan_timeout(timeout, SCAN_MIN_TIMEOUT, time.monotonic() - start)
+    except OSError:
+        stale = True
+    finally:
+        if stale or pending:
+            # Late responses would be mistaken for replies to the next request
+            client.close()
+        else:
+            sock.settimeout(previous_timeout)
+
+    return sorted(found)
+
+
+def _scan_rtu(client, units, timeout, minimum):
+    # Probe one unit at a time, reading the response straight off the
+    # serial port so an absent unit costs no more than the timeout
+    if not client.is_socket_open() and not client.connect():
+        return []
+
+    port = client.socket
+    previous_timeout = port.timeout
+    found = []
+
+    try:
+        for unit in units:
+            frame = struct.pack(">BBHH", unit, 0x03, SUNSPEC_ADDRESS, 2)
+            expected = bytes((unit, 0x03, 0x04)) + SUNSPEC_ID
+            response = b""
+
+            port.reset_input_buffer()
+            start = time.monotonic()
+            port.write(frame + _crc16(frame))
+
+            # 9 bytes for the registers, 5 for an exception
+            while len(response) < 9 and not (len(response) >= 5 and response[1] & 0x80):
+                remaining = start + timeout - time.monotonic()
+
+                if remaining <= 0:
+                    break
+
+                port.timeout = remaining
+                data = port.read(9 - len(response))
+
+                if not data:
+                    break
+
+                response += data
+
+            if response[:7] == expected and response[7:9] == _crc16(expected):
+                found.append(unit)
+                timeout = _scan_timeout(timeout, minimum, time.monotonic() - start)
+    except OSError:
+        pass
+    finally:
+        port.timeout = previous_timeout
+
+    return found
+
+
+def scan(host=False, port=False, device=False, units=SCAN_UNITS, probe_timeout=SCAN_TIMEOUT, window=PIPELINE_WINDOW, parent=False, **kwargs):
+    # Find the inverters on a Modbus TCP gateway or RS485 bus by the SunSpec
+    # header at 0x9c40. Returns an Inverter per unit that answered, sharing
+    # one connection.
+    probe = Inverter(host=host, port=port, device=device, parent=parent, **kwargs)
+
+    try:
+        with probe._connection.lock:
+            if probe.mode is connectionType.TCP:
+                found = _scan_tcp(probe.client, units, probe_timeout, window)
+            else:
+                # Never wait less than twice the time the response takes
+                # on the wire
+                cost = probe.link_cost
+                minimum = max(SCAN_MIN_TIMEOUT, 2 * (cost.request_overhead + 2 * cost.register_cost))
+                found = _scan_rtu(probe.client, units, max(probe_timeout, minimum), minimum)
+
+        return [Inverter(parent=probe, unit=unit) for unit in found]
+    finally:
+        probe.close()
+
+
+def read_all_pipelined(devices, rtype=registerType.HOLDING, window=PIPELINE_WINDOW, scaled=False):
+    results = [{} for device in devices]
+    connections = {}
+
+    for idx, device in enumerate(devices):
+        if isinstance(device, AsyncSolarEdge):
+            raise TypeError(f"{device} is asynchronous, use asyncio.gather() instead")
+
+        for block in device._read_plan(rtype):
+            values = device._cached_block(block)
+
+            if values is not None:
+                results[idx].update(values)
+            else:
+                connections.setdefault(id(device._connection), []).append((idx, device, block))
+
+    for requests in connections.values():
+        values = _read_blocks([(device, block) for idx, device, block in requests], window)
+
+        for (idx, device, block), values in zip(requests, values):
+            device._cache_block(block, values)
+            results[idx].update(values)
+
+    for idx, device in enumerate(devices):
+        if device._identity_changed(results[idx]):
+            for block in device._identity_blocks(rtype):
+                values = device._read_block(block)
+                device._cache_block(block, values)
+                results[idx].update(values)
+
+            device._identity_changed(results[idx])
+
+        if scaled:
+            device._scale(results[idx], rtype)
+
+        device._record(results[idx], scaled)
+
+    return results
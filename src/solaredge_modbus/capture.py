@@ -0,0 +1,322 @@
+import collections
+import os
+import struct
+import threading
+import time
+
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_read_message import ReadInputRegistersResponse
+
+
+# A capture file starts with MAGIC and a version byte, followed by one
+# record per block read: a header, the device model, the source and the raw
+# registers, all big endian. The source is the connection the block was
+# read over, host:port or the serial device.
+MAGIC = b"SEMC"
+VERSION = 2
+RECORD = struct.Struct(">dBBHHBB")
+
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+
+
+CapturedBlock = collections.namedtuple("CapturedBlock", ("timestamp", "source", "model", "unit", "function", "address", "registers"))
+
+
+class Recorder:
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+        if self._file.tell() == 0:
+            self._file.write(MAGIC + bytes((VERSION,)))
+            self._file.flush()
+        else:
+            _check_header(path)
+
+    def __repr__(self):
+        return f"Recorder({self.path}, {self.records} records)"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self, model, unit, function, address, registers, timestamp=None, source=""):
+        if timestamp is None:
+            timestamp = time.time()
+
+        model = model.encode("utf-8")[:255]
+        source = source.encode("utf-8")[:255]
+        data = RECORD.pack(timestamp, unit, function, address, len(registers), len(model), len(source))
+        data += model + source + struct.pack(f">{len(registers)}H", *registers)
+
+        # One write per record, flushed, so a capture cut short by a crash
+        # loses at most the record being written
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._file.write(data)
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 1)
+
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a capture file")
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f"{path} has unsupported capture version {header[len(MAGIC)]}")
+
+
+class Capture:
+
+    def __init__(self, path):
+        self.path = path
+
+        _check_header(path)
+
+    def __repr__(self):
+        return f"Capture({self.path})"
+
+    def __iter__(self):
+        # Records are read one at a time, so long captures are streamed
+        # instead of loaded whole
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC) + 1)
+
+            while True:
+                header = f.read(RECORD.size)
+
+                # A truncated last record means the capture was cut short
+                if len(header) < RECORD.size:
+                    break
+
+                timestamp, unit, function, address, count, length, source_length = RECORD.unpack(header)
+                size = length + source_length + count * 2
+                data = f.read(size)
+
+                if len(data) < size:
+                    break
+
+                model = data[:length].decode("utf-8", errors="replace")
+                source = data[length:length + source_length].decode("utf-8", errors="replace")
+                registers = list(struct.unpack_from(f">{count}H", data, length + source_length))
+
+                yield CapturedBlock(timestamp, source, model, unit, function, address, registers)
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def sources(self):
+        return sorted({block.source for block in self})
+
+    def _devices(self, devices, source):
+        # Blocks are matched to devices by source, unit and model. The source
+        # of a device is the connection it polls over, unless given.
+        return {
+            (device._connection.label if source is None else source, device.unit, device.model): device
+            for device in devices
+        }
+
+    def decode(self, devices, source=None):
+        # Decode every captured block with the current decoders of the
+        # matching device. Yields the capture time, the device and the
+        # values of each block, blocks of unknown devices are skipped.
+        devices = self._devices(devices, source)
+
+        for block in self:
+            device = devices.get((block.source, block.unit, block.model))
+
+            if device is None:
+                continue
+
+            values = device._decode_captured(block.function, block.address, block.registers)
+
+            if values:
+                yield block.timestamp, device, values
+
+    def columns(self, devices, scaled=False, source=None):
+        # Decode the capture in bulk: the blocks of each device are grouped
+        # by address and length, and each group decoded in one go. Returns
+        # the device and the columns of each group, with a timestamp column.
+        import numpy
+
+        from . import registerType
+
+        devices = self._devices(devices, source)
+        groups = {}
+
+        for block in self:
+            device = devices.get((block.source, block.unit, block.model))
+
+            if device is None:
+                continue
+
+            timestamps, registers = groups.setdefault((device, block.function, block.address, len(block.registers)), ([], []))
+            timestamps.append(block.timestamp)
+            registers.append(block.registers)
+
+        results = []
+
+        for (device, function, address, length), (timestamps, registers) in groups.items():
+            rtype = registerType.INPUT if function == READ_INPUT_REGISTERS else registerType.HOLDING
+            columns = device.decode_bulk(address, numpy.array(registers, dtype=numpy.uint16), rtype, scaled)
+
+            if columns:
+                columns["timestamp"] = numpy.array(timestamps)
+                results.append((device, columns))
+
+        return results
+
+
+class _ReplayCursor:
+
+    # The position of one read in the capture, and the current value of
+    # the registers it covers. Registers never captured, like the gaps a
+    # read plan bridges, read as zero.
+    __slots__ = ("blocks", "pending", "registers")
+
+    def __init__(self, blocks, count):
+        self.blocks = blocks
+        self.pending = None
+        self.registers = [0] * count
+
+
+class ReplayClient:
+
+    # Stands in for a pymodbus client. Every captured register is replayed
+    # in capture order, each read taking the next captured value of the
+    # registers it covers, so devices poll through a capture as fast as
+    # they can even if their read plan changed since it was taken. Only the
+    # blocks of `source` are replayed, if given. The capture is streamed,
+    # each distinct read keeping its own position in it.
+    socket = None
+
+    def __init__(self, capture, source=None):
+        self.capture = capture
+        self.source = source
+
+        self._cursors = {}
+        self.rewind()
+
+    def __repr__(self):
+        return f"ReplayClient({self.capture.path}, {self.reads} reads)"
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def is_socket_open(self):
+        return True
+
+    @property
+    def connected(self):
+        return True
+
+    def rewind(self):
+        self.reads = 0
+
+        for cursor in self._cursors.values():
+            cursor.blocks.close()
+
+        self._cursors = {}
+
+    def _blocks(self, unit, function):
+        for block in self.capture:
+            if block.unit == unit and block.function == function and (self.source is None or block.source == self.source):
+                yield block
+
+    def _read(self, function, address, count, slave):
+        key = (slave, function, address, count)
+        cursor = self._cursors.get(key)
+
+        if cursor is None:
+            cursor = self._cursors[key] = _ReplayCursor(self._blocks(slave, function), count)
+
+        # Take the captured blocks covering the read in order, until one
+        # would take a register a second time, which is kept for the next
+        # read
+        end = address + count
+        updated = set()
+
+        while len(updated) < count:
+            block = cursor.pending or next(cursor.blocks, None)
+            cursor.pending = None
+
+            if block is None:
+                break
+
+            start = max(address, block.address)
+            stop = min(end, block.address + len(block.registers))
+
+            if start >= stop:
+                continue
+
+            if not updated.isdisjoint(range(start, stop)):
+                cursor.pending = block
+                break
+
+            cursor.registers[start - address:stop - address] = block.registers[start - block.address:stop - block.address]
+            updated.update(range(start, stop))
+
+        if not updated:
+            return None
+
+        self.reads += 1
+        return list(cursor.registers)
+
+    def read_holding_registers(self, address, count=1, slave=0, **kwargs):
+        registers = self._read(READ_HOLDING_REGISTERS, address, count, slave)
+
+        if registers is None:
+            # Past the end of the capture, like an illegal data address
+            return ExceptionResponse(READ_HOLDING_REGISTERS, 0x02, slave=slave)
+
+        return ReadHoldingRegistersResponse(registers, slave=slave)
+
+    def read_input_registers(self, address, count=1, slave=0, **kwargs):
+        registers = self._read(READ_INPUT_REGISTERS, address, count, slave)
+
+        if registers is None:
+            return ExceptionResponse(READ_INPUT_REGISTERS, 0x02, slave=slave)
+
+        return ReadInputRegistersResponse(registers, slave=slave)
+
+    def write_registers(self, *args, **kwargs):
+        raise NotImplementedError("captures are read-only")
+
+    def replay(self, device):
+        # Serve the reads of a device, and of the devices created with it
+        # as parent afterwards, from this capture. The device gets a
+        # connection of its own, other devices sharing its connection keep
+        # polling the bus.
+        from . import CONNECTIONS, LinkCost
+
+        # Replayed reads take no time worth fitting, keep the estimates of
+        # the link the capture was taken on
+        cost = device._connection.cost
+        connection = CONNECTIONS.acquire(None, lambda: self)
+        connection.cost = LinkCost(cost.request_overhead, cost.register_cost, adaptive=False)
+        connection.label = device._connection.label if self.source is None else self.source
+
+        CONNECTIONS.release(device._connection)
+        device._connection = connection
+        device.client = self
+
+        return device
@@ -0,0 +1,95 @@
+import math
+import time
+
+from .values import implemented
+
+
+# Default (absolute, relative) deadband per register unit, for scaled
+# values. A value is reported when it moves more than the larger of the
+# two away from the last reported value. Counters and registers without
+# a unit are reported on any change.
+DEADBANDS = {
+    "W": (5, 0.01),
+    "VA": (5, 0.01),
+    "VAr": (5, 0.01),
+    "A": (0.05, 0.01),
+    "V": (0.5, 0.005),
+    "Hz": (0.01, 0),
+    "%": (0.5, 0),
+    "°C": (0.5, 0),
+}
+
+HEARTBEAT = 300
+
+
+class ChangeFilter:
+
+    def __init__(self, device=None, deadbands=None, heartbeat=HEARTBEAT, default=(0, 0), clock=time.monotonic):
+        self.heartbeat = heartbeat
+        self.default = default
+        self.clock = clock
+        self.deadbands = {}
+        self.scale_factors = {}
+
+        if device is not None:
+            self.scale_factors = device.scale_factors
+
+            for key, value in device.registers.items():
+                unit = value[6]
+
+                # Enumerated registers carry a status map instead of a unit
+                if isinstance(unit, str):
+                    self.deadbands[key] = DEADBANDS.get(unit, default)
+
+        if deadbands:
+            self.deadbands.update(deadbands)
+
+        self._reported = {}
+
+    def reset(self, keys=None):
+        if keys is None:
+            self._reported = {}
+        else:
+            for key in keys:
+                self._reported.pop(key, None)
+
+    def _changed(self, key, value, previous):
+        # Strings, and registers that are not implemented or stop being so,
+        # only compare equal or not
+        numeric = all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and implemented(v)
+            for v in (value, previous)
+        )
+
+        if not numeric:
+            return type(value) is not type(previous) or value != previous
+
+        if math.isnan(value) or math.isnan(previous):
+            return math.isnan(value) is not math.isnan(previous)
+
+        absolute, relative = self.deadbands.get(key, self.default)
+        return abs(value - previous) > max(absolute, relative * abs(previous))
+
+    def filter(self, values, timestamp=None):
+        now = self.clock() if timestamp is None else timestamp
+        changes = {}
+
+        for key, value in values.items():
+            reported = self._reported.get(key)
+
+            if reported is None or now - reported[1] >= self.heartbeat:
+                changes[key] = value
+            elif self._changed(key, value, reported[0]):
+                changes[key] = value
+
+        # Unscaled values are meaningless without their scale factor
+        for key in list(changes):
+            scale = self.scale_factors.get(key)
+
+            if scale in values:
+                changes[scale] = values[scale]
+
+        for key, value in changes.items():
+            self._reported[key] = (value, now)
+
+        return changes
@@ -0,0 +1,315 @@
+import collections
+import json
+import os
+import threading
+import time
+
+from .retry import RetryPolicy
+
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 1000
+FLUSH_INTERVAL = 1
+SPOOL_SIZE = 100 * 1024 * 1024
+
+# Sinks are retried after a growing pause, up to a minute, while they fail
+EXPORT_RETRY_POLICY = RetryPolicy(backoff=1, multiplier=2, max_backoff=60, jitter=0.1)
+
+
+class Spool:
+
+    # Records that could not be written yet, as JSON lines appended to a
+    # file, read back from the front in batches. A replayed batch is only
+    # committed once written, so records may be written twice after a
+    # crash but are not lost. Only records not replayed yet count towards
+    # `max_size`, the replayed ones are dropped from the file when it would
+    # grow past it.
+    def __init__(self, path, max_size=SPOOL_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        self._offset = 0
+        self._next = 0
+
+    def __repr__(self):
+        return f"Spool({self.path}, {self.size()} bytes)"
+
+    def size(self):
+        # Bytes not replayed yet
+        with self._lock:
+            return os.fstat(self._file.fileno()).st_size - self._offset
+
+    def append(self, records):
+        data = b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records)
+
+        with self._lock:
+            if self._file.closed:
+                return False
+
+            size = os.fstat(self._file.fileno()).st_size
+
+            if size + len(data) > self.max_size and self._offset:
+                self._compact()
+                size = os.fstat(self._file.fileno()).st_size
+
+            if size + len(data) > self.max_size:
+                self.dropped += len(records)
+                return False
+
+            self._file.write(data)
+            self._file.flush()
+
+        return True
+
+    def read(self, count):
+        records = []
+
+        with self._lock:
+            self._file.seek(self._offset)
+
+            while len(records) < count:
+                line = self._file.readline()
+
+                # A line cut short by a crash has no newline, skip it
+                if not line.endswith(b"\n"):
+                    break
+
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+
+            self._next = self._file.tell()
+
+        return records
+
+    def _compact(self):
+        # Rewrite the file without the replayed records. The new file is
+        # moved into place, so a crash leaves either the old or the new one.
+        path = f"{self.path}.tmp"
+        self._file.seek(self._offset)
+
+        with open(path, "wb") as f:
+            while True:
+                data = self._file.read(1024 * 1024)
+
+                if not data:
+                    break
+
+                f.write(data)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(path, self.path)
+        self._file.close()
+        self._file = open(self.path, "a+b")
+
+        self._next = max(0, self._next - self._offset)
+        self._offset = 0
+
+    def commit(self):
+        # Drop the records read last, and empty the file once all of them
+        # are replayed
+        with self._lock:
+            self._offset = self._next
+
+            if self._offset >= os.fstat(self._file.fileno()).st_size:
+                self._file.truncate(0)
+                self._offset = self._next = 0
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ExportPipeline:
+
+    def __init__(
+        self, sink, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+        spool=None, spool_size=SPOOL_SIZE, retry_policy=EXPORT_RETRY_POLICY
+    ):
+        self.sink = sink
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_policy = retry_policy
+        self.spool = Spool(spool, spool_size) if spool else None
+
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.last_error = None
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._writing = False
+
+    def __repr__(self):
+        return f"ExportPipeline({len(self._queue)} queued, {self.written} written, {self.spooled} spooled, {self.dropped} dropped)"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="solaredge-export", daemon=True)
+            self._thread.start()
+
+        return self
+
+    def stop(self, timeout=None):
+        # Write what is queued, then spool anything the sink did not take
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+
+        with self._condition:
+            self._condition.notify_all()
+
+        self._thread.join(timeout)
+        self._thread = None
+
+        if self.spool is not None:
+            self.spool.close()
+
+    def _overflow(self, records):
+        if self.spool is not None and self.spool.append(records):
+            self.spooled += len(records)
+        else:
+            self.dropped += len(records)
+
+    def put(self, record):
+        # Never blocks on the sink: when the queue is full, the record goes
+        # to the spool, or is dropped without one
+        return self.put_all((record,))
+
+    def put_all(self, records):
+        with self._condition:
+            room = self.queue_size - len(self._queue)
+            records = list(records)
+            self._queue.extend(records[:room])
+            self._condition.notify()
+
+        if len(records) > room:
+            self._overflow(records[room:])
+            return False
+
+        return True
+
+    def _requeue(self, batch):
+        # Without a spool, a batch the sink did not take goes back to the
+        # front of the queue. Like put(), a full queue drops the newest
+        # records.
+        with self._condition:
+            self._queue.extendleft(reversed(batch))
+
+            while len(self._queue) > self.queue_size:
+                self._queue.pop()
+                self.dropped += 1
+
+    def _next_batch(self):
+        # Wait for a record, then at most `flush_interval` for a full batch
+        with self._condition:
+            if not self._queue and not self._stopping.is_set():
+                self._condition.wait(self.flush_interval)
+
+            if self._queue and not self._stopping.is_set():
+                self._condition.wait_for(lambda: len(self._queue) >= self.batch_size or self._stopping.is_set(), self.flush_interval)
+
+            self._writing = bool(self._queue)
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def _write(self, batch):
+        try:
+            self.sink(batch)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = e
+            return False
+
+        self.written += len(batch)
+        self.batches += 1
+        return True
+
+    def _run(self):
+        failures = 0
+
+        while True:
+            batch = self._next_batch()
+            spooled = False
+
+            # Catch up on the spool while there is nothing new to write
+            if not batch and self.spool is not None and not self._stopping.is_set():
+                batch = self.spool.read(self.batch_size)
+                spooled = True
+
+            if not batch:
+                if self._stopping.is_set():
+                    break
+
+                continue
+
+            written = self._write(batch)
+            self._writing = False
+
+            if written:
+                failures = 0
+
+                if spooled:
+                    self.spool.commit()
+                    self.replayed += len(batch)
+
+                continue
+
+            # A failed replay stays in the spool, new records go there
+            if not spooled:
+                if self.spool is not None:
+                    self._overflow(batch)
+                else:
+                    self._requeue(batch)
+
+            if self._stopping.is_set():
+                # No point retrying, spool what is left
+                with self._condition:
+                    batch = list(self._queue)
+                    self._queue.clear()
+
+                if batch:
+                    self._overflow(batch)
+
+                break
+
+            self._stopping.wait(self.retry_policy.delay(failures))
+            failures += 1
+
+    def flush(self, timeout=None):
+        # Wait until the queue has been handed to the sink, or spooled
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._condition.notify()
+
+        while (self._queue or self._writing) and self._thread is not None:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+            self._stopping.wait(0.01)
+
+        return not self._queue
@@ -0,0 +1,144 @@
+import array
+import bisect
+import time
+
+from .values import implemented
+
+# numpy is optional and slow to import, so it is only loaded the first time
+# a window or view is taken
+numpy = False
+
+
+def _numpy():
+    global numpy
+
+    if numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+    return numpy
+
+
+class History:
+
+    def __init__(self, keys, capacity):
+        if capacity <= 0:
+            raise ValueError(capacity)
+
+        self.capacity = capacity
+        self.keys = tuple(keys)
+
+        # One preallocated column of doubles per register, plus timestamps.
+        # Appending overwrites a slot in place, so polling never allocates.
+        empty = array.array("d", [float("nan")]) * capacity
+        self.timestamps = array.array("d", empty)
+        self.columns = {key: array.array("d", empty) for key in self.keys}
+
+        self._columns = tuple(self.columns.items())
+        self._next = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return f"History({len(self.keys)} registers, {self._length}/{self.capacity} samples)"
+
+    def append(self, values, timestamp=None):
+        i = self._next
+        nan = float("nan")
+
+        self.timestamps[i] = time.time() if timestamp is None else timestamp
+
+        for key, column in self._columns:
+            value = values.get(key, nan)
+
+            # Registers that are not implemented, and strings, are stored as NaN
+            if not implemented(value) or not isinstance(value, (int, float)):
+                value = nan
+
+            column[i] = value
+
+        self._next = (i + 1) % self.capacity
+
+        if self._length < self.capacity:
+            self._length += 1
+
+    def clear(self):
+        self._next = 0
+        self._length = 0
+
+    def _index(self, n):
+        # Physical slot of the n-th oldest sample
+        return (self._next - self._length + n) % self.capacity
+
+    def _bounds(self, start, end):
+        timestamps = _Chronological(self)
+        first = 0 if start is None else bisect.bisect_left(timestamps, start)
+        last = self._length if end is None else bisect.bisect_right(timestamps, end)
+
+        return first, max(first, last)
+
+    def _slice(self, column, first, last):
+        if first == last:
+            return column[0:0]
+
+        begin = self._index(first)
+        end = self._index(last - 1) + 1
+
+        if begin < end:
+            return column[begin:end]
+        if _numpy() is not None and isinstance(column, numpy.ndarray):
+            return numpy.concatenate((column[begin:], column[:end]))
+
+        return column[begin:] + column[:end]
+
+    def window(self, start=None, end=None, keys=None):
+        # Samples with start <= timestamp <= end, oldest first. With numpy
+        # each column is a view on the ring buffer, unless the window wraps
+        # around its end; without numpy the columns are lists.
+        first, last = self._bounds(start, end)
+        keys = ("timestamp",) + (self.keys if keys is None else tuple(keys))
+
+        if _numpy() is not None:
+            return {key: self._slice(self.view(key), first, last) for key in keys}
+
+        return {key: self._slice(self._column(key), first, last).tolist() for key in keys}
+
+    def _column(self, key):
+        return self.timestamps if key == "timestamp" else self.columns[key]
+
+    def view(self, key):
+        # Zero-copy numpy view on the raw column, in ring order
+        if _numpy() is None:
+            raise ImportError("numpy is required for numpy views")
+
+        return numpy.frombuffer(self._column(key), dtype=numpy.float64)
+
+    def latest(self):
+        if not self._length:
+            return {}
+
+        i = self._index(self._length - 1)
+        result = {"timestamp": self.timestamps[i]}
+        result.update((key, column[i]) for key, column in self._columns)
+
+        return result
+
+
+class _Chronological:
+
+    # Timestamps in chronological order as a sequence, for bisect
+
+    __slots__ = ("history",)
+
+    def __init__(self, history):
+        self.history = history
+
+    def __len__(self):
+        return len(self.history)
+
+    def __getitem__(self, n):
+        return self.history.timestamps[self.history._index(n)]
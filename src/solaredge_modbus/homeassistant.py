@@ -0,0 +1,242 @@
+import json
+import math
+
+from .values import implemented
+
+
+DISCOVERY_PREFIX = "homeassistant"
+STATE_PREFIX = "solaredge"
+
+# Home Assistant device class and state class per register unit. Energy
+# registers that are integers are lifetime counters, the others are
+# capacities.
+UNITS = {
+    "W": ("power", "measurement"),
+    "VA": ("apparent_power", "measurement"),
+    "VAr": ("reactive_power", "measurement"),
+    "A": ("current", "measurement"),
+    "V": ("voltage", "measurement"),
+    "Hz": ("frequency", "measurement"),
+    "°C": ("temperature", "measurement"),
+    "%": (None, "measurement"),
+    "s": ("duration", "measurement"),
+    "ms": ("duration", "measurement"),
+    "Wh": ("energy", "total_increasing"),
+    "VAh": (None, "total_increasing"),
+    "VArh": (None, "total_increasing")
+}
+
+# Units Home Assistant spells differently
+UNIT_NAMES = {
+    "VAr": "var",
+    "VArh": "varh"
+}
+
+# Registers that have a device class of their own, percentages or numbers
+# without a unit
+DEVICE_CLASSES = {
+    "power_factor": "power_factor",
+    "l1_power_factor": "power_factor",
+    "l2_power_factor": "power_factor",
+    "l3_power_factor": "power_factor",
+    "soe": "battery"
+}
+
+# Register groups that hold settings rather than measurements
+DIAGNOSTIC_GROUPS = frozenset(("power_control", "storedge"))
+
+
+class HomeAssistantDiscovery:
+
+    def __init__(self, prefix=DISCOVERY_PREFIX, state_prefix=STATE_PREFIX, entities=None):
+        self.prefix = prefix
+        self.state_prefix = state_prefix
+        self.entities = dict(entities or {})
+        self.published = 0
+
+        self._templates = {}
+        self._devices = {}
+
+    def __repr__(self):
+        return f"HomeAssistantDiscovery({len(self._devices)} devices, {self.published} published)"
+
+    def _template(self, device):
+        # The entity configs of a device class without the device specific
+        # parts, generated once from its register map
+        cls = device.__class__
+        templates = self._templates.get(cls)
+
+        if templates is not None:
+            return templates
+
+        groups = {k: group for group, keys in device.register_groups.items() for k in keys}
+        scales = set(device.scale_factors.values())
+        templates = {}
+
+        for key, (address, length, rtype, dtype, vtype, label, fmt, batch) in device.register_table.items():
+            group = groups.get(key)
+
+            if group is None or group == "identity" or key in scales:
+                continue
+
+            config = {"name": label}
+
+            if isinstance(fmt, str) and fmt in UNITS:
+                device_class, state_class = UNITS[fmt]
+
+                if fmt == "Wh" and vtype is not int:
+                    device_class, state_class = "energy_storage", "measurement"
+
+                device_class = DEVICE_CLASSES.get(key, device_class)
+
+                if device_class:
+                    config["device_class"] = device_class
+
+                config["state_class"] = state_class
+                config["unit_of_measurement"] = UNIT_NAMES.get(fmt, fmt)
+                config["value_template"] = f"{{{{ value_json.{key} }}}}"
+            elif isinstance(fmt, (list, dict)):
+                # Enumerations are published as numbers, possibly as floats,
+                # and named by the template
+                names = dict(enumerate(fmt)) if isinstance(fmt, list) else fmt
+                names = {str(k): v for k, v in names.items()}
+
+                config["device_class"] = "enum"
+                config["options"] = list(dict.fromkeys((*names.values(), "Unknown")))
+                config["value_template"] = f"{{{{ {json.dumps(names)}.get(value_json.{key} | int(-1) | string, 'Unknown') }}}}"
+            elif fmt == "" and vtype in (int, float):
+                # Numbers without a unit, like power factors, only get a
+                # state class when their device class says what they are
+                if key in DEVICE_CLASSES:
+                    config["device_class"] = DEVICE_CLASSES[key]
+                    config["state_class"] = "measurement"
+
+                config["value_template"] = f"{{{{ value_json.{key} }}}}"
+            else:
+                continue
+
+            if group in DIAGNOSTIC_GROUPS:
+                config["entity_category"] = "diagnostic"
+
+            templates[key] = config
+
+        self._templates[cls] = templates
+        return templates
+
+    def _identity(self, device, values):
+        previous = self._devices.get(device)
+        keys = ("c_serialnumber", "c_manufacturer", "c_model", "c_version")
+
+        # Identity registers held back, like by a ChangeFilter, keep their
+        # last value
+        if previous is None:
+            identity = tuple(values.get(k) for k in keys)
+        else:
+            identity = tuple(values.get(k, v) for k, v in zip(keys, previous[0]))
+
+        identity = tuple(v if implemented(v) else None for v in identity)
+
+        if not identity[0]:
+            return None
+
+        return identity
+
+    def state_topic(self, serial):
+        return f"{self.state_prefix}/{serial}"
+
+    def _configs(self, device, identity, values):
+        serial, manufacturer, model, version = identity
+        node = f"solaredge_{serial}"
+        info = {
+            "identifiers": [node],
+            "name": f"SolarEdge {serial}",
+            "manufacturer": manufacturer,
+            "model": model,
+            "sw_version": version,
+            "serial_number": serial
+        }
+        messages = {}
+
+        # Only the registers the device implements get an entity, decided
+        # when its identity is first seen so entities do not come and go.
+        # Extra entities are added to the devices that have a value for
+        # them.
+        templates = dict(self._template(device))
+
+        for key, template in self.entities.items():
+            templates[key] = dict({"name": key, "value_template": f"{{{{ value_json.{key} }}}}"}, **template)
+
+        for key, template in templates.items():
+            value = values.get(key)
+
+            if value is None or not implemented(value):
+                continue
+
+            config = dict(template)
+            config["unique_id"] = f"{node}_{key}"
+            config["state_topic"] = self.state_topic(serial)
+            config["device"] = info
+            messages[f"{self.prefix}/sensor/{node}/{key}/config"] = json.dumps(config)
+
+        return messages
+
+    def messages(self, readings):
+        # Discovery messages for a whole fleet, as (topic, payload) pairs to
+        # publish retained. Devices are only published when new or when
+        # their identity changed, and the entities of devices that are gone,
+        # or changed identity, are removed with an empty payload.
+        messages = []
+        present = set()
+
+        for device, values in readings:
+            present.add(device)
+            identity = self._identity(device, values or {})
+
+            if identity is None:
+                continue
+
+            previous = self._devices.get(device)
+
+            if previous is not None and previous[0] == identity:
+                continue
+
+            configs = self._configs(device, identity, values)
+
+            if previous is not None:
+                messages += [(topic, "") for topic in previous[1] if topic not in configs]
+
+            messages += configs.items()
+            self._devices[device] = (identity, tuple(configs))
+
+        for device in [device for device in self._devices if device not in present]:
+            messages += [(topic, "") for topic in self._devices.pop(device)[1]]
+
+        self.published += len(messages)
+        return messages
+
+    def state(self, device, values):
+        # The state message of a device, all its values as one JSON object.
+        # Registers that are not implemented, and values that are not
+        # finite, are published as null.
+        identity = self._identity(device, values)
+
+        if identity is None:
+            return None
+
+        payload = {}
+
+        for key, value in values.items():
+            if not implemented(value) or (type(value) is float and not math.isfinite(value)):
+                value = None
+
+            payload[key] = value
+
+        return self.state_topic(identity[0]), json.dumps(payload)
+
+    def forget(self, device=None):
+        # Publish the devices again on the next call to messages(), after
+        # the broker lost its retained messages
+        if device is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(device, None)
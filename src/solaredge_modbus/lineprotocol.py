@@ -0,0 +1,186 @@
+import math
+import time
+
+from .values import implemented
+
+
+# Identity registers written as tags, when a device has them. Numeric
+# registers are written as fields, the numeric tags too.
+TAGS = (
+    "c_manufacturer",
+    "c_model",
+    "c_option",
+    "c_version",
+    "c_serialnumber",
+    "c_deviceaddress",
+    "c_sunspec_did"
+)
+
+# Measurement per device class, by class name so the async devices share
+# the measurement of their sync counterparts
+MEASUREMENTS = {
+    "Inverter": "inverter",
+    "Meter": "meter",
+    "Battery": "battery",
+    "StorEdge": "storedge"
+}
+
+# Device classes whose integer registers are written as integers, like the
+# InfluxDB examples wrote the battery. The others are written as floats.
+INTEGERS = ("Battery",)
+
+PRECISIONS = {
+    "ns": 1,
+    "us": 10 ** 3,
+    "ms": 10 ** 6,
+    "s": 10 ** 9
+}
+
+
+def _escape(value, characters=",= "):
+    value = str(value).replace("\\", "\\\\")
+
+    for character in characters:
+        value = value.replace(character, f"\\{character}")
+
+    return value.replace("\n", "\\n")
+
+
+class LineProtocol:
+
+    def __init__(self, tags=TAGS, measurements=None, precision="ns", integers=None, extra_tags=None):
+        if precision not in PRECISIONS:
+            raise ValueError(f"unsupported precision {precision}")
+
+        self.tags = tuple(tags)
+        self.measurements = dict(MEASUREMENTS, **(measurements or {}))
+        self.precision = precision
+        self.integers = integers
+        self.extra_tags = dict(extra_tags or {})
+
+        self.lines = []
+
+        self._layouts = {}
+        self._devices = {}
+
+    def __repr__(self):
+        return f"LineProtocol({len(self.lines)} lines, precision={self.precision})"
+
+    def __len__(self):
+        return len(self.lines)
+
+    def _layout(self, device):
+        # Measurement, tag keys, field prefixes and integer suffix of a
+        # device class, derived once from its register map
+        cls = device.__class__
+        layout = self._layouts.get(cls)
+
+        if layout is None:
+            measurement = next(
+                (self.measurements[c.__name__] for c in cls.__mro__ if c.__name__ in self.measurements),
+                device.model.lower()
+            )
+            tags = tuple(k for k in self.tags if k in device.register_table)
+            fields = {
+                k: f"{_escape(k)}="
+                for k, v in device.register_table.items()
+                if v[4] in (int, float)
+            }
+            integers = self.integers
+
+            if integers is None:
+                integers = any(c.__name__ in INTEGERS for c in cls.__mro__)
+
+            layout = (_escape(measurement, ", "), tags, fields, "i" if integers else "")
+            self._layouts[cls] = layout
+
+        return layout
+
+    def _tags(self, device, tags, values):
+        # The escaped tag string of a device is kept until its identity
+        # changes, it is the same on every poll. Identity registers missing
+        # from the values, like those a ChangeFilter held back, keep their
+        # last value.
+        cached = self._devices.get(device)
+
+        if cached is None:
+            identity = tuple(values.get(k) for k in tags)
+        else:
+            identity = tuple(values.get(k, v) for k, v in zip(tags, cached[0]))
+
+            if identity == cached[0]:
+                return cached[1]
+
+        pairs = dict(self.extra_tags)
+
+        for k, v in zip(tags, identity):
+            # Registers that are not implemented are left out, and empty
+            # tag values are not allowed
+            if v is not None and v != "" and implemented(v):
+                pairs[k] = v
+
+        tags = "".join(f",{_escape(k)}={_escape(v)}" for k, v in sorted(pairs.items()))
+        self._devices[device] = (identity, tags)
+
+        return tags
+
+    def timestamp(self, timestamp=None):
+        if timestamp is None:
+            return time.time_ns() // PRECISIONS[self.precision]
+
+        return int(timestamp * 10 ** 9) // PRECISIONS[self.precision]
+
+    def _add(self, device, values, timestamp):
+        if not values:
+            return False
+
+        measurement, tags, fields, suffix = self._layout(device)
+        parts = []
+
+        for key, value in values.items():
+            prefix = fields.get(key)
+
+            if prefix is None:
+                continue
+
+            # Numbers without a suffix are floats, so integers are written
+            # as is unless they are stored as integers. Strings, and
+            # registers that are not implemented, whose values are
+            # subclasses of int and float, are skipped.
+            vtype = type(value)
+
+            if vtype is int:
+                parts.append(f"{prefix}{value}{suffix}")
+            elif vtype is float and math.isfinite(value):
+                parts.append(f"{prefix}{value}")
+
+        if not parts:
+            return False
+
+        self.lines.append(f"{measurement}{self._tags(device, tags, values)} {','.join(parts)} {timestamp}")
+        return True
+
+    def add(self, device, values, timestamp=None):
+        # Append one line for the values of a device, as returned by
+        # read_all(), and return whether there was anything to write
+        return self._add(device, values, self.timestamp(timestamp))
+
+    def add_all(self, readings, timestamp=None):
+        # Add (device, values) pairs sharing one timestamp, and return the
+        # number of lines added
+        timestamp = self.timestamp(timestamp)
+
+        return sum(self._add(device, values, timestamp) for device, values in readings)
+
+    def payload(self):
+        # The lines added so far as one payload, emptying the buffer
+        payload = "\n".join(self.lines)
+        self.lines.clear()
+
+        return payload
+
+    def forget(self, device=None):
+        if device is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(device, None)
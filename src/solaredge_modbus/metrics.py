@@ -0,0 +1,247 @@
+import bisect
+import threading
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+HOOKS = ("pre_request", "post_request", "decode", "reconnect")
+
+REQUEST_RESULTS = ("ok", "exception", "busy", "short", "error")
+
+
+class Histogram:
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def cumulative(self):
+        total = 0
+
+        for le, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield le, total
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0,
+            "max": self.max,
+            "buckets": {str(le): count for le, count in self.cumulative()}
+        }
+
+
+class DeviceMetrics:
+
+    __slots__ = ("requests", "retries", "skipped", "reconnects", "reconnect_failures", "registers", "request_seconds", "decode_seconds")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.requests = dict.fromkeys(REQUEST_RESULTS, 0)
+        self.retries = 0
+        self.skipped = 0
+        self.reconnects = 0
+        self.reconnect_failures = 0
+        self.registers = 0
+        self.request_seconds = Histogram(buckets)
+        self.decode_seconds = Histogram(buckets)
+
+    def merge(self, other):
+        for result, count in other.requests.items():
+            self.requests[result] += count
+
+        self.retries += other.retries
+        self.skipped += other.skipped
+        self.reconnects += other.reconnects
+        self.reconnect_failures += other.reconnect_failures
+        self.registers += other.registers
+        self.request_seconds.merge(other.request_seconds)
+        self.decode_seconds.merge(other.decode_seconds)
+
+    def as_dict(self):
+        return {
+            "requests": dict(self.requests),
+            "retries": self.retries,
+            "skipped": self.skipped,
+            "reconnects": self.reconnects,
+            "reconnect_failures": self.reconnect_failures,
+            "registers": self.registers,
+            "request_seconds": self.request_seconds.as_dict(),
+            "decode_seconds": self.decode_seconds.as_dict()
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Metrics:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.hooks = {event: [] for event in HOOKS}
+        self.devices = {}
+
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Metrics({len(self.devices)} devices)"
+
+    def add_hook(self, event, hook):
+        if event not in self.hooks:
+            raise KeyError(event)
+
+        self.hooks[event].append(hook)
+
+    def remove_hook(self, event, hook):
+        self.hooks[event].remove(hook)
+
+    def reset(self):
+        with self._lock:
+            self.devices = {}
+
+    def _device(self, device):
+        # Devices on different connections are polled from different
+        # threads, so counters are only updated holding the lock
+        labels = (device._connection.label, device.unit, device.model)
+        metrics = self.devices.get(labels)
+
+        if metrics is None:
+            metrics = self.devices[labels] = DeviceMetrics(self.buckets)
+
+        return metrics
+
+    def _snapshot(self):
+        # A copy of the counters of each device, to export without holding
+        # the lock
+        with self._lock:
+            snapshot = []
+
+            for labels, metrics in self.devices.items():
+                copy = DeviceMetrics(self.buckets)
+                copy.merge(metrics)
+                snapshot.append((labels, copy))
+
+        return snapshot
+
+    def request_started(self, device, rtype, address, length):
+        for hook in self.hooks["pre_request"]:
+            hook(device, rtype, address, length)
+
+    def request_finished(self, device, rtype, address, length, result, elapsed, attempt):
+        with self._lock:
+            metrics = self._device(device)
+            metrics.requests[result] += 1
+            metrics.request_seconds.observe(elapsed)
+
+            if attempt:
+                metrics.retries += 1
+            if result == "ok":
+                metrics.registers += length
+
+        for hook in self.hooks["post_request"]:
+            hook(device, rtype, address, length, result, elapsed)
+
+    def request_skipped(self, device):
+        with self._lock:
+            self._device(device).skipped += 1
+
+    def decoded(self, device, block, values, elapsed):
+        with self._lock:
+            self._device(device).decode_seconds.observe(elapsed)
+
+        for hook in self.hooks["decode"]:
+            hook(device, block, values, elapsed)
+
+    def reconnected(self, device, connected):
+        with self._lock:
+            metrics = self._device(device)
+
+            if connected:
+                metrics.reconnects += 1
+            else:
+                metrics.reconnect_failures += 1
+
+        for hook in self.hooks["reconnect"]:
+            hook(device, connected)
+
+    def as_dict(self):
+        devices = {}
+        connections = {}
+
+        for (connection, unit, model), metrics in self._snapshot():
+            devices[f"{connection}/{unit}/{model}"] = metrics.as_dict()
+            connections.setdefault(connection, DeviceMetrics(self.buckets)).merge(metrics)
+
+        return {
+            "connections": {connection: metrics.as_dict() for connection, metrics in connections.items()},
+            "devices": devices
+        }
+
+    def prometheus(self, prefix="solaredge"):
+        lines = []
+        devices = [
+            (f"connection=\"{_escape(connection)}\",unit=\"{unit}\",device=\"{_escape(model)}\"", metrics)
+            for (connection, unit, model), metrics in self._snapshot()
+        ]
+
+        def counter(name, help, value):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+
+            for labels, metrics in devices:
+                lines.append(f"{prefix}_{name}{{{labels}}} {value(metrics)}")
+
+        def histogram(name, help, value):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+
+            for labels, metrics in devices:
+                histogram = value(metrics)
+
+                for le, count in histogram.cumulative():
+                    lines.append(f"{prefix}_{name}_bucket{{{labels},le=\"{'+Inf' if le == float('inf') else le}\"}} {count}")
+
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+
+        lines.append(f"# HELP {prefix}_requests_total Modbus read requests by result.")
+        lines.append(f"# TYPE {prefix}_requests_total counter")
+
+        for labels, metrics in devices:
+            for result, count in metrics.requests.items():
+                lines.append(f"{prefix}_requests_total{{{labels},result=\"{result}\"}} {count}")
+
+        counter("retries_total", "Modbus read requests that were retries.", lambda m: m.retries)
+        counter("skipped_total", "Reads skipped while the circuit breaker was open.", lambda m: m.skipped)
+        counter("reconnects_total", "Successful reconnects.", lambda m: m.reconnects)
+        counter("reconnect_failures_total", "Failed reconnects.", lambda m: m.reconnect_failures)
+        counter("registers_read_total", "Registers read.", lambda m: m.registers)
+        histogram("request_duration_seconds", "Duration of Modbus read requests.", lambda m: m.request_seconds)
+        histogram("decode_duration_seconds", "Duration of decoding read blocks.", lambda m: m.decode_seconds)
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
@@ -0,0 +1,107 @@
+import random
+import threading
+
+
+# Request results worth retrying: no or a broken response, and devices
+# that report they are busy. Other exception responses, like an illegal
+# address, will not go away by asking again.
+RETRY_ON = frozenset(("error", "short", "busy"))
+
+
+class CircuitBreaker:
+
+    def __init__(self, failures=5, timeout=30, max_timeout=600):
+        self.threshold = failures
+        self.base_timeout = timeout
+        self.max_timeout = max_timeout
+
+        self.failures = 0
+        self.timeout = timeout
+        self.open_until = None
+        self.trips = 0
+
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"CircuitBreaker({self.state}, failures={self.failures}, trips={self.trips})"
+
+    @property
+    def state(self):
+        if self.open_until is None:
+            return "closed"
+        if self._probing:
+            return "half-open"
+
+        return "open"
+
+    def allow(self, now):
+        # While open, skip the device until the timeout expires, then let a
+        # single probe through
+        with self._lock:
+            if self.open_until is None:
+                return True
+            if self._probing or now < self.open_until:
+                return False
+
+            self._probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.timeout = self.base_timeout
+            self.open_until = None
+            self._probing = False
+
+    def failure(self, now):
+        with self._lock:
+            self.failures += 1
+
+            if self._probing or self.failures >= self.threshold:
+                # Back off further each time a probe fails
+                if self._probing:
+                    self.timeout = min(self.timeout * 2, self.max_timeout)
+
+                self.open_until = now + self.timeout
+                self.trips += 1
+                self._probing = False
+
+
+class RetryPolicy:
+
+    def __init__(
+        self, backoff=0.05, multiplier=2, max_backoff=1, jitter=0.5, retry_on=RETRY_ON,
+        breaker_failures=5, breaker_timeout=30, breaker_max_timeout=600
+    ):
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = frozenset(retry_on)
+        self.breaker_failures = breaker_failures
+        self.breaker_timeout = breaker_timeout
+        self.breaker_max_timeout = breaker_max_timeout
+
+        self._random = random.Random()
+
+    def __repr__(self):
+        return f"RetryPolicy(backoff={self.backoff}, multiplier={self.multiplier}, max_backoff={self.max_backoff}, jitter={self.jitter}, retry_on={sorted(self.retry_on)})"
+
+    def retry(self, result):
+        return result in self.retry_on
+
+    def delay(self, retry):
+        # Exponential backoff before the n-th retry, randomised by up to
+        # `jitter` either way so devices on a bus do not retry in lockstep
+        delay = min(self.backoff * self.multiplier ** retry, self.max_backoff)
+        return delay * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    def breaker(self):
+        if not self.breaker_failures:
+            return None
+
+        return CircuitBreaker(self.breaker_failures, self.breaker_timeout, self.breaker_max_timeout)
+
+
+RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,188 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+
+class ScheduledRead:
+
+    __slots__ = (
+        "device", "group", "keys", "period", "phase", "callback", "scaled",
+        "release", "deadline", "runs", "overruns", "skipped", "errors",
+        "max_lateness", "busy_time", "last_error", "active"
+    )
+
+    def __init__(self, device, group, keys, period, phase, callback, scaled):
+        self.device = device
+        self.group = group
+        self.keys = keys
+        self.period = period
+        self.phase = phase
+        self.callback = callback
+        self.scaled = scaled
+
+        self.release = 0
+        self.deadline = 0
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.max_lateness = 0
+        self.busy_time = 0
+        self.last_error = None
+        self.active = True
+
+    def __repr__(self):
+        return f"ScheduledRead({self.name}, period={self.period}, phase={self.phase})"
+
+    @property
+    def name(self):
+        return f"{self.device.model}@{self.device.unit}.{self.group}"
+
+    def schedule(self, now):
+        # Release at the next wall-clock tick of the period, e.g. on every
+        # whole second or every ten minutes past the hour, and expect the
+        # read to complete before the tick after that.
+        ticks = math.floor((now - self.phase) / self.period) + 1
+        release = ticks * self.period + self.phase
+
+        if self.release and release > self.release + self.period:
+            self.skipped += int((release - self.release) / self.period) - 1
+
+        self.release = release
+        self.deadline = release + self.period
+
+
+class Scheduler:
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.reads = []
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._stop = threading.Event()
+
+    def add(self, device, group, period, callback=None, phase=0, scaled=False):
+        if isinstance(group, str):
+            if group not in device.register_groups:
+                raise KeyError(group)
+
+            keys = frozenset(device.register_groups[group])
+        else:
+            keys = frozenset(group)
+            group = ",".join(sorted(keys))
+
+        if period <= 0:
+            raise ValueError(period)
+
+        read = ScheduledRead(device, group, keys, period, phase, callback, scaled)
+        read.schedule(self.clock())
+
+        self.reads.append(read)
+        heapq.heappush(self._queue, (read.release, next(self._sequence), read))
+
+        return read
+
+    def remove(self, read):
+        read.active = False
+        self.reads.remove(read)
+
+    def _released(self, now):
+        # Move every read whose tick has passed from the release queue into
+        # a ready list, ordered by deadline
+        ready = []
+
+        while self._queue and self._queue[0][0] <= now:
+            release, sequence, read = heapq.heappop(self._queue)
+
+            if read.active:
+                heapq.heappush(ready, (read.deadline, sequence, read))
+
+        return ready
+
+    def _dispatch(self, read):
+        start = self.clock()
+        lateness = start - read.release
+
+        if lateness > read.max_lateness:
+            read.max_lateness = lateness
+
+        try:
+            values = read.device.read_fields(read.keys, scaled=read.scaled)
+
+            if read.callback:
+                read.callback(read.device, values, start)
+        except Exception as e:
+            read.errors += 1
+            read.last_error = e
+
+        end = self.clock()
+        read.runs += 1
+        read.busy_time += end - start
+
+        if end > read.deadline:
+            read.overruns += 1
+
+        read.schedule(end)
+        heapq.heappush(self._queue, (read.release, next(self._sequence), read))
+
+    def run_pending(self):
+        ready = self._released(self.clock())
+        dispatched = 0
+
+        while ready:
+            deadline, sequence, read = heapq.heappop(ready)
+            self._dispatch(read)
+            dispatched += 1
+
+            # Reads released while this one ran compete on deadline
+            for item in self._released(self.clock()):
+                heapq.heappush(ready, item)
+
+        return dispatched
+
+    def next_release(self):
+        while self._queue and not self._queue[0][2].active:
+            heapq.heappop(self._queue)
+
+        return self._queue[0][0] if self._queue else None
+
+    def run(self, until=None):
+        self._stop.clear()
+
+        while not self._stop.is_set():
+            if until is not None and self.clock() >= until:
+                break
+
+            self.run_pending()
+            release = self.next_release()
+
+            if release is None:
+                break
+
+            if until is not None:
+                release = min(release, until)
+
+            delay = release - self.clock()
+
+            if delay > 0:
+                self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            read.name: {
+                "period": read.period,
+                "runs": read.runs,
+                "overruns": read.overruns,
+                "skipped": read.skipped,
+                "errors": read.errors,
+                "max_lateness": read.max_lateness,
+                "utilisation": read.busy_time / (read.runs * read.period) if read.runs else 0
+            }
+            for read in self.reads
+        }
@@ -0,0 +1,596 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import threading
+import time
+
+from pymodbus.constants import Endian
+
+from . import (
+    Inverter, Meter, StorEdge, Battery,
+    METER_REGISTER_OFFSETS, BATTERY_REGISTER_OFFSETS, STRUCT_FORMATS, SUNSPEC_NOTIMPLEMENTED,
+    registerDataType, _crc16
+)
+
+
+# Typical scaled values per register unit, the base around which
+# measurements evolve
+UNIT_VALUES = {
+    "W": 3000,
+    "VA": 3100,
+    "VAr": 250,
+    "A": 13,
+    "V": 230,
+    "Hz": 50,
+    "°C": 40,
+    "%": 95,
+    "Wh": 12000000,
+    "VAh": 13000000,
+    "VArh": 1000000,
+    "ms": 1000,
+    "s": 3600
+}
+
+# Scale factor used to encode registers of each unit
+UNIT_SCALES = {
+    "A": -2,
+    "V": -1,
+    "Hz": -2,
+    "°C": -2,
+    "%": -2
+}
+
+# Relative amplitude of the slow swing of measurements of each unit
+MEASUREMENT_UNITS = {
+    "W": 0.2,
+    "VA": 0.2,
+    "VAr": 0.2,
+    "A": 0.2,
+    "V": 0.02,
+    "Hz": 0.002,
+    "°C": 0.05
+}
+
+COUNTER_UNITS = {"Wh", "VAh", "VArh"}
+
+IDENTITY = {
+    "Inverter": {"c_model": "SE5000H", "c_sunspec_did": 101, "c_sunspec_length": 50},
+    "Meter": {
+        "c_model": "WND-3Y-400-MB", "c_option": "Export+Import", "c_sunspec_did": 203, "c_sunspec_length": 105,
+        "power_factor": 95, "l1_power_factor": 95, "l2_power_factor": 95, "l3_power_factor": 95
+    },
+    "Battery": {"c_model": "BYD Battery-Box", "c_sunspec_did": 802, "rated_energy": 9700, "maximum_energy": 9700, "available_energy": 5000},
+    "StorEdge": {}
+}
+
+DEFAULTS = {
+    "c_id": "SunS",
+    "c_did": 1,
+    "c_length": 65,
+    "c_manufacturer": "SolarEdge",
+    "c_version": "0004.0019",
+    "status": 4,
+    "soe": 50
+}
+
+RTU_FRAME_LENGTHS = {3: 8, 4: 8, 6: 8}
+
+
+def _template(cls, offset=None):
+    # Register addresses depend on the offset of an instance, so create a
+    # throwaway one on a connection that is never opened
+    parent = Inverter(host="simulator.invalid", port=0)
+    device = parent
+
+    try:
+        if cls is not Inverter:
+            device = cls(parent=parent) if offset is None else cls(offset=offset, parent=parent)
+
+        return device
+    finally:
+        if device is not parent:
+            device.close()
+
+        parent.close()
+
+
+class SimulatedDevice:
+
+    def __init__(self, cls, unit, offset=None, serial=None, rng=None):
+        self.cls = cls
+        self.name = cls.__name__ if offset is None else f"{cls.__name__}{offset + 1}"
+        template = _template(cls, offset)
+        self.registers = template.registers
+        self.wordorder = template.wordorder
+        self.little_endian_registers = set(template.little_endian_registers)
+        scale_factors = template.scale_factors
+        self.unimplemented = set()
+        self.evolve = True
+
+        self.values = dict(DEFAULTS)
+        self.values.update(IDENTITY[cls.__name__])
+        self.values["c_deviceaddress"] = unit
+        self.values["c_serialnumber"] = serial or f"7E{unit:02X}{(offset or 0) + 1:02X}{rng.randrange(0x10000):04X}"
+
+        self.scales = {}
+        measurements = set(template.register_groups.get("power", ()))
+        self.kinds = {}
+
+        for key, value in self.registers.items():
+            address, length, rtype, dtype, vtype, label, fmt, batch = value
+            unit_name = fmt if isinstance(fmt, str) else ""
+
+            if key not in self.values and vtype is not str:
+                self.values[key] = UNIT_VALUES.get(unit_name, 0)
+
+            if key in scale_factors:
+                self.scales.setdefault(scale_factors[key], UNIT_SCALES.get(unit_name, -2 if key.endswith("power_factor") else 0))
+
+            if unit_name in COUNTER_UNITS and vtype is int:
+                # Wh per second at the typical power
+                self.kinds[key] = ("counter", UNIT_VALUES["W"] / 3600, 0)
+            elif unit_name in MEASUREMENT_UNITS and key in measurements:
+                self.kinds[key] = ("measurement", MEASUREMENT_UNITS[unit_name], rng.uniform(0, 2 * math.pi))
+
+        self.values.update(self.scales)
+        self.scale_factors = {key: scale for key, scale in scale_factors.items() if key in self.registers}
+
+    def __repr__(self):
+        return f"SimulatedDevice({self.name})"
+
+    def value(self, key, elapsed, rng):
+        value = self.values.get(key, 0)
+        kind = self.kinds.get(key) if self.evolve else None
+
+        if kind is None:
+            return value
+
+        kind, rate, phase = kind
+
+        if kind == "counter":
+            return value + rate * elapsed
+
+        return value * (1 + rate * math.sin(2 * math.pi * elapsed / 300 + phase)) + rng.gauss(0, abs(value) * 0.001)
+
+    def encode(self, key, elapsed, rng):
+        address, length, rtype, dtype, vtype, label, fmt, batch = self.registers[key]
+
+        if key in self.unimplemented:
+            sentinel = SUNSPEC_NOTIMPLEMENTED[dtype.name]
+
+            if dtype == registerDataType.STRING:
+                return bytes(length * 2)
+
+            data = sentinel.to_bytes(length * 2, "big")
+        elif dtype == registerDataType.STRING:
+            return str(self.values.get(key, "")).encode("utf-8")[:length * 2].ljust(length * 2, b"\x00")
+        else:
+            value = self.value(key, elapsed, rng)
+            code = STRUCT_FORMATS[dtype]
+
+            if key in self.scale_factors:
+                value /= 10.0 ** self.values.get(self.scale_factors[key], 0)
+
+            if code.isupper():
+                # Stay clear of the not implemented sentinels, all ones for
+                # unsigned and the lowest value for signed registers
+                value = min(max(int(round(value)), 0), (1 << (length * 16)) - 2)
+            elif code != "f":
+                bits = length * 16 - 1
+                value = min(max(int(round(value)), 1 - (1 << bits)), (1 << bits) - 1)
+
+            data = struct.pack(f">{code}", value)
+
+            if len(data) < length * 2:
+                data = bytes(length * 2 - len(data)) + data
+
+        if self.wordorder == Endian.LITTLE or address in self.little_endian_registers:
+            data = b"".join(data[i:i + 2] for i in reversed(range(0, len(data), 2)))
+
+        return data
+
+
+class SimulatedUnit:
+
+    def __init__(self, unit=1, meters=1, batteries=0, storedge=True, seed=None):
+        self.unit = unit
+        self.rng = random.Random(seed)
+        self.devices = {}
+        self.image = {}
+        self.written = set()
+        self.start = time.monotonic()
+        self.refreshed = None
+
+        self._add(SimulatedDevice(Inverter, unit, rng=self.rng))
+
+        for offset in range(min(meters, len(METER_REGISTER_OFFSETS))):
+            self._add(SimulatedDevice(Meter, unit, offset, rng=self.rng))
+
+        for offset in range(min(batteries, len(BATTERY_REGISTER_OFFSETS))):
+            self._add(SimulatedDevice(Battery, unit, offset, rng=self.rng))
+
+        if storedge:
+            self._add(SimulatedDevice(StorEdge, unit, rng=self.rng))
+
+        # Registers can appear in more than one map, the first one owns them
+        self.fields = []
+        owned = set()
+
+        for device in self.devices.values():
+            for key, value in device.registers.items():
+                addresses = range(value[0], value[0] + value[1])
+
+                if not owned.intersection(addresses):
+                    owned.update(addresses)
+                    self.fields.append((device, key, addresses))
+
+        # Inverter.discover() probes these for absent devices
+        for offset in range(meters, len(METER_REGISTER_OFFSETS)):
+            self.image[_template(Meter, offset).registers["c_sunspec_did"][0]] = 0
+        for offset in range(batteries, len(BATTERY_REGISTER_OFFSETS)):
+            self.image[_template(Battery, offset).registers["c_deviceaddress"][0]] = 255
+
+        self.refresh(force=True)
+
+    def __repr__(self):
+        return f"SimulatedUnit({self.unit}, {', '.join(self.devices)})"
+
+    def __getitem__(self, name):
+        return self.devices[name]
+
+    def _add(self, device):
+        self.devices[device.name] = device
+
+    def refresh(self, tick=1.0, force=False):
+        now = time.monotonic()
+
+        if not force and self.refreshed is not None and now - self.refreshed < tick:
+            return
+
+        self.refreshed = now
+        elapsed = now - self.start
+
+        for device, key, addresses in self.fields:
+            # Written registers keep the written value
+            if self.written and self.written.intersection(addresses):
+                continue
+
+            data = device.encode(key, elapsed, self.rng)
+            self.image.update(zip(addresses, struct.unpack(f">{len(addresses)}H", data)))
+
+    def read(self, address, count):
+        addresses = range(address, address + count)
+
+        if not any(a in self.image for a in addresses):
+            return None
+
+        return [self.image.get(a, 0) for a in addresses]
+
+    def write(self, address, values):
+        addresses = range(address, address + len(values))
+
+        if not any(a in self.image for a in addresses):
+            return False
+
+        self.image.update(zip(addresses, values))
+        self.written.update(addresses)
+        return True
+
+
+class _ModbusProtocol(asyncio.Protocol):
+
+    def __init__(self, simulator, rtu):
+        self.simulator = simulator
+        self.rtu = rtu
+        self.buffer = b""
+        self.transport = None
+        self.ready = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+
+        while True:
+            frame = self._rtu_frame() if self.rtu else self._tcp_frame()
+
+            if frame is None:
+                return
+
+            self._respond(*frame)
+
+    def _tcp_frame(self):
+        if len(self.buffer) < 7:
+            return None
+
+        tid, pid, length, unit = struct.unpack(">HHHB", self.buffer[:7])
+
+        if len(self.buffer) < 6 + length:
+            return None
+
+        pdu = self.buffer[7:6 + length]
+        self.buffer = self.buffer[6 + length:]
+
+        return unit, pdu, struct.pack(">HH", tid, pid)
+
+    def _rtu_frame(self):
+        if len(self.buffer) < 2:
+            return None
+
+        function = self.buffer[1]
+
+        if function == 16:
+            if len(self.buffer) < 7:
+                return None
+
+            length = 9 + self.buffer[6]
+        elif function in RTU_FRAME_LENGTHS:
+            length = RTU_FRAME_LENGTHS[function]
+        else:
+            # Unknown function, resynchronise on the next frame
+            self.buffer = b""
+            return None
+
+        if len(self.buffer) < length:
+            return None
+
+        frame, self.buffer = self.buffer[:length], self.buffer[length:]
+
+        if _crc16(frame[:-2]) != frame[-2:]:
+            self.buffer = b""
+            return None
+
+        return frame[0], frame[1:-2], None
+
+    def _respond(self, unit, pdu, header):
+        response = self.simulator.handle(unit, pdu)
+
+        if response is None:
+            return
+
+        if self.rtu:
+            frame = bytes([unit]) + response
+            frame += _crc16(frame)
+        else:
+            frame = header + struct.pack(">HB", len(response) + 1, unit) + response
+
+        delay = self.simulator.delay(len(frame))
+        loop = asyncio.get_running_loop()
+
+        if self.rtu:
+            # A serial line answers one request at a time
+            self.ready = max(self.ready, loop.time()) + delay
+            loop.call_at(self.ready, self._write, frame)
+        else:
+            loop.call_later(delay, self._write, frame)
+
+    def _write(self, frame):
+        if not self.transport.is_closing():
+            self.transport.write(frame)
+
+
+class _PtyTransport(asyncio.Transport):
+
+    def __init__(self, loop, fd):
+        super().__init__()
+        self.loop = loop
+        self.fd = fd
+        self.closing = False
+
+    def write(self, data):
+        os.write(self.fd, data)
+
+    def is_closing(self):
+        return self.closing
+
+    def close(self):
+        self.closing = True
+        self.loop.remove_reader(self.fd)
+
+
+class Simulator:
+
+    def __init__(self, host="127.0.0.1", port=0, framer="tcp", latency=0, jitter=0, baud=None, tick=1.0, seed=None):
+        if framer not in ("tcp", "rtu", "pty"):
+            raise NotImplementedError(framer)
+
+        self.host = host
+        self.port = port
+        self.framer = framer
+        self.latency = latency
+        self.jitter = jitter
+        self.baud = baud
+        self.tick = tick
+        self.units = {}
+        self.requests = 0
+        self.device = None
+
+        self._rng = random.Random(seed)
+        self._seed = seed
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._pty = None
+
+    def __repr__(self):
+        return f"Simulator({self.framer}, {self.address}, units={list(self.units)})"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def address(self):
+        if self.framer == "pty":
+            return self.device
+
+        return f"{self.host}:{self.port}"
+
+    def add_unit(self, unit=1, meters=1, batteries=0, storedge=True):
+        seed = None if self._seed is None else self._seed + unit
+        self.units[unit] = SimulatedUnit(unit, meters, batteries, storedge, seed)
+
+        return self.units[unit]
+
+    def delay(self, length):
+        delay = self.latency + self._rng.uniform(0, self.jitter)
+
+        if self.baud:
+            # 11 bits per character on the wire
+            delay += length * 11 / self.baud
+
+        return delay
+
+    def _exception(self, function, code):
+        return struct.pack(">BB", function | 0x80, code)
+
+    def handle(self, unit, pdu):
+        # Unknown units do not answer, like a gateway without that slave
+        if unit not in self.units or not pdu:
+            return None
+
+        self.requests += 1
+        device = self.units[unit]
+        function = pdu[0]
+
+        if function in (3, 4) and len(pdu) == 5:
+            address, count = struct.unpack(">HH", pdu[1:5])
+
+            if not 1 <= count <= 125:
+                return self._exception(function, 3)
+
+            device.refresh(self.tick)
+            registers = device.read(address, count)
+
+            if registers is None:
+                return self._exception(function, 2)
+
+            return struct.pack(f">BB{count}H", function, count * 2, *registers)
+        elif function == 6 and len(pdu) == 5:
+            address, value = struct.unpack(">HH", pdu[1:5])
+
+            if not device.write(address, [value]):
+                return self._exception(function, 2)
+
+            return pdu
+        elif function == 16 and len(pdu) >= 6:
+            address, count, length = struct.unpack(">HHB", pdu[1:6])
+
+            if count * 2 != length or len(pdu) != 6 + length:
+                return self._exception(function, 3)
+
+            if not device.write(address, list(struct.unpack(f">{count}H", pdu[6:]))):
+                return self._exception(function, 2)
+
+            return pdu[:5]
+
+        return self._exception(function, 1)
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+
+        if self.framer == "pty":
+            import tty
+
+            master, slave = os.openpty()
+            tty.setraw(slave)
+            protocol = _ModbusProtocol(self, rtu=True)
+            protocol.connection_made(_PtyTransport(loop, master))
+            loop.add_reader(master, lambda: protocol.data_received(os.read(master, 4096)))
+
+            self._pty = (master, slave, protocol)
+            self.device = os.ttyname(slave)
+        else:
+            rtu = self.framer == "rtu"
+            self._server = await loop.create_server(lambda: _ModbusProtocol(self, rtu), self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+            if rtu:
+                self.device = f"socket://{self.host}:{self.port}"
+
+    def start(self):
+        if not self.units:
+            self.add_unit()
+
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+
+            try:
+                self._loop.run_until_complete(self._serve())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="solaredge-simulator", daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            raise errors[0]
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        def shutdown():
+            if self._server:
+                self._server.close()
+            if self._pty:
+                self._pty[2].transport.close()
+
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+        self._loop.close()
+
+        if self._pty:
+            os.close(self._pty[0])
+            os.close(self._pty[1])
+
+        self._loop = None
+        self._server = None
+        self._pty = None
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--host", type=str, default="127.0.0.1", help="Listen address")
+    argparser.add_argument("--port", type=int, default=1502, help="Listen port")
+    argparser.add_argument("--framer", type=str, default="tcp", choices=["tcp", "rtu", "pty"], help="Modbus TCP, RTU over TCP or RTU on a pseudo terminal")
+    argparser.add_argument("--unit", type=int, nargs="+", default=[1], help="Modbus device addresses")
+    argparser.add_argument("--meters", type=int, default=1, help="Meters per unit")
+    argparser.add_argument("--batteries", type=int, default=0, help="Batteries per unit")
+    argparser.add_argument("--latency", type=float, default=0, help="Response delay")
+    argparser.add_argument("--jitter", type=float, default=0, help="Random extra response delay")
+    argparser.add_argument("--baud", type=int, help="Simulated line speed")
+    argparser.add_argument("--seed", type=int, help="Random seed")
+    args = argparser.parse_args()
+
+    simulator = Simulator(args.host, args.port, args.framer, args.latency, args.jitter, args.baud, seed=args.seed)
+
+    for unit in args.unit:
+        simulator.add_unit(unit, args.meters, args.batteries)
+
+    with simulator:
+        print(simulator)
+
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+
+
+class TopologyCache:
+
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"TopologyCache({self.path})"
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(entries, dict):
+            return {}
+
+        return entries
+
+    def get(self, serial):
+        entry = self.load().get(serial)
+
+        if not isinstance(entry, dict) or not isinstance(entry.get("devices"), dict):
+            return None
+
+        return entry
+
+    def _save(self, entries):
+        # Write a sibling file and rename it over the cache, so a crash
+        # never leaves a truncated cache behind
+        path = f"{self.path}.tmp"
+
+        try:
+            with open(path, "w") as f:
+                json.dump(entries, f, indent=4)
+
+            os.replace(path, self.path)
+        except OSError:
+            return False
+
+        return True
+
+    def put(self, serial, unit, devices):
+        with self._lock:
+            entries = self.load()
+            entries[serial] = {
+                "unit": unit,
+                "updated": time.time(),
+                "devices": devices
+            }
+
+            return self._save(entries)
+
+    def remove(self, serial):
+        with self._lock:
+            entries = self.load()
+
+            if entries.pop(serial, None) is None:
+                return False
+
+            return self._save(entries)
@@ -0,0 +1,40 @@
+# Registers holding the SunSpec not implemented pattern decode as the false
+# value of their type, 0, 0.0 or "False". They are returned as these
+# subclasses, which compare and print the same, so consumers can still tell
+# them apart from a reading of zero.
+class NotImplementedValue:
+
+    __slots__ = ()
+
+
+class NotImplementedInt(NotImplementedValue, int):
+
+    __slots__ = ()
+
+
+class NotImplementedFloat(NotImplementedValue, float):
+
+    __slots__ = ()
+
+
+class NotImplementedStr(NotImplementedValue, str):
+
+    __slots__ = ()
+
+
+NOT_IMPLEMENTED = {
+    int: NotImplementedInt(False),
+    float: NotImplementedFloat(False),
+    str: NotImplementedStr(False)
+}
+
+
+def not_implemented(vtype):
+    if vtype in NOT_IMPLEMENTED:
+        return NOT_IMPLEMENTED[vtype]
+
+    return vtype(False)
+
+
+def implemented(value):
+    return not isinstance(value, NotImplementedValue)
@@ -0,0 +1,40 @@
+import pytest
+
+import solaredge_modbus
+from solaredge_modbus.simulator import Simulator
+
+
+@pytest.fixture
+def simulator():
+    # A Modbus TCP gateway with an inverter, a meter and a battery on unit 1.
+    # Values only change on refresh(force=True).
+    with Simulator(seed=1, tick=60) as simulator:
+        simulator.add_unit(1, meters=1, batteries=1)
+        yield simulator
+
+
+@pytest.fixture
+def second_simulator():
+    # Another gateway with the same layout and other serial numbers
+    with Simulator(seed=2, tick=60) as simulator:
+        simulator.add_unit(1, meters=1, batteries=1)
+        yield simulator
+
+
+@pytest.fixture
+def empty_simulator():
+    # A gateway without units, for tests that add their own. The simulator
+    # starts with unit 1 unless units were added before.
+    with Simulator(seed=1, tick=60) as simulator:
+        simulator.units.clear()
+        yield simulator
+
+
+@pytest.fixture
+def inverter(simulator):
+    inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+
+    try:
+        yield inverter
+    finally:
+        inverter.close()
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+import solaredge_modbus
+from solaredge_modbus.simulator import Simulator
+
+
+@pytest.fixture(scope="module")
+def serial():
+    with Simulator(seed=1, framer="pty") as simulator:
+        simulator.add_unit(1, meters=2, batteries=1)
+        yield simulator
+
+
+def test_discover_rtu(serial):
+    # The probes of discover() and reads gathered by the caller take turns
+    # on the bus
+    async def discover():
+        inverter = solaredge_modbus.AsyncInverter(device=serial.device, baud=115200, timeout=0.5)
+        await inverter.connect()
+
+        try:
+            devices = await inverter.discover()
+            values = await asyncio.gather(*(device.read_all() for device in (inverter, *devices.values())))
+        finally:
+            inverter.close()
+
+        return devices, values
+
+    devices, values = asyncio.run(discover())
+
+    assert sorted(devices) == ["Battery1", "Meter1", "Meter2"]
+    assert [v["c_serialnumber"] for v in values[1:]] == [serial.units[1][name].values["c_serialnumber"] for name in devices]
+    assert values[0]["current"] > 0
+
+
+def test_discover_rtu_absent(serial):
+    # Probes that time out are failed reads, and the bus recovers
+    async def discover():
+        inverter = solaredge_modbus.AsyncInverter(device=serial.device, baud=115200, timeout=0.2, unit=2, retries=1)
+        await inverter.connect()
+
+        try:
+            devices = await inverter.discover()
+            present = solaredge_modbus.AsyncInverter(parent=inverter, unit=1)
+            values = await present.read_all()
+        finally:
+            inverter.close()
+
+        return devices, values
+
+    devices, values = asyncio.run(discover())
+
+    assert devices == {}
+    assert values["c_serialnumber"] == serial.units[1]["Inverter"].values["c_serialnumber"]
@@ -0,0 +1,99 @@
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.fixture
+def simulators(simulator, second_simulator):
+    return simulator, second_simulator
+
+
+@pytest.fixture
+def capture(simulators, tmp_path):
+    path = tmp_path / "capture.bin"
+    recorder = solaredge_modbus.Recorder(path)
+
+    for simulator in simulators:
+        inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+        inverter.recorder = recorder
+        inverter.read_all()
+        inverter.close()
+
+    recorder.close()
+    return solaredge_modbus.Capture(path)
+
+
+def test_sources(simulators, capture):
+    assert capture.sources() == sorted(simulator.address for simulator in simulators)
+
+    for simulator in simulators:
+        inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+        serials = {values["c_serialnumber"] for timestamp, device, values in capture.decode([inverter]) if "c_serialnumber" in values}
+        inverter.close()
+
+        assert serials == {simulator.units[1]["Inverter"].values["c_serialnumber"]}
+
+
+def test_replay_private_connection(simulators, capture):
+    simulator = simulators[0]
+    inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+    replayed = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+    client = solaredge_modbus.ReplayClient(capture, source=simulator.address)
+
+    try:
+        client.replay(replayed)
+
+        assert replayed._connection is not inverter._connection
+        assert inverter.client is not client
+        assert replayed.read_all()["c_serialnumber"] == simulator.units[1]["Inverter"].values["c_serialnumber"]
+        assert client.reads
+
+        requests = simulator.requests
+        assert inverter.read_all()
+        assert simulator.requests > requests
+    finally:
+        replayed.close()
+        inverter.close()
+
+
+@pytest.mark.parametrize("kept", [1, solaredge_modbus.capture.RECORD.size + 1])
+def test_truncated(capture, kept):
+    # Cut the last record short, in its header or after it
+    blocks = list(capture)
+    last = blocks[-1]
+    size = solaredge_modbus.capture.RECORD.size + len(last.model) + len(last.source) + len(last.registers) * 2
+
+    with open(capture.path, "r+b") as f:
+        f.truncate(capture.size() - size + kept)
+
+    assert list(capture) == blocks[:-1]
+
+
+def test_replay_in_order(simulator, inverter, tmp_path):
+    path = tmp_path / "capture.bin"
+    unit = simulator.units[1]
+    replayed = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+
+    try:
+        with solaredge_modbus.Recorder(path) as recorder:
+            inverter.recorder = recorder
+            polled = []
+
+            for current in (10, 20, 30):
+                unit["Inverter"].values["current"] = current
+                unit.refresh(force=True)
+                polled.append(inverter.read_all(scaled=True)["current"])
+
+        client = solaredge_modbus.ReplayClient(solaredge_modbus.Capture(path))
+        client.replay(replayed)
+
+        assert [replayed.read_all(scaled=True)["current"] for n in range(3)] == polled
+        assert len(set(polled)) == 3
+        assert "current" not in replayed.read_all()
+
+        # A read plan that differs from the captured one takes the next
+        # value of each register too
+        client.rewind()
+        assert [replayed.read_fields(["current"], scaled=True)["current"] for n in range(3)] == polled
+    finally:
+        replayed.close()
@@ -0,0 +1,45 @@
+import threading
+
+import solaredge_modbus
+
+
+def test_shared_client(simulator):
+    connections = len(solaredge_modbus.CONNECTIONS)
+    first = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+    second = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+    meter = solaredge_modbus.Meter(offset=0, parent=first)
+
+    assert first._connection is second._connection is meter._connection
+    assert first.client is second.client is meter.client
+    assert len(solaredge_modbus.CONNECTIONS) == connections + 1
+
+    # The client stays open until the last device using it is closed
+    assert first.read_all()
+    first.close()
+    meter.close()
+    assert second.connected()
+    assert second.read_all()["c_serialnumber"] == simulator.units[1]["Inverter"].values["c_serialnumber"]
+
+    second.close()
+    assert not second.connected()
+    assert len(solaredge_modbus.CONNECTIONS) == connections
+
+
+def test_threads(simulator, inverter):
+    # Devices polled from their own threads do not interleave frames on
+    # the shared client
+    devices = {"Inverter": inverter, **inverter.discover()}
+    serials = {name: set() for name in devices}
+
+    def poll(name):
+        for i in range(20):
+            serials[name].add(devices[name].read("c_serialnumber")["c_serialnumber"])
+
+    threads = [threading.Thread(target=poll, args=(name,)) for name in devices]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert serials == {name: {simulator.units[1][name].values["c_serialnumber"]} for name in devices}
@@ -0,0 +1,44 @@
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.fixture
+def changes(inverter):
+    return solaredge_modbus.ChangeFilter(inverter, heartbeat=300)
+
+
+def test_deadband(changes):
+    # 5 W or 1% for power, any change for status
+    assert changes.filter({"power_ac": 3000.0, "status": 4}, timestamp=0) == {"power_ac": 3000.0, "status": 4}
+    assert changes.filter({"power_ac": 3025.0, "status": 4}, timestamp=1) == {}
+    assert changes.filter({"power_ac": 3031.0, "status": 5}, timestamp=2) == {"power_ac": 3031.0, "status": 5}
+
+    # Every value is passed on once per heartbeat
+    assert changes.filter({"power_ac": 3031.0, "status": 5}, timestamp=302) == {"power_ac": 3031.0, "status": 5}
+
+
+def test_scale_factor(changes):
+    # Unscaled values are passed on with their scale factor, which did not
+    # change itself
+    assert changes.filter({"power_ac": 30000, "power_ac_scale": -1}, timestamp=0)
+    assert changes.filter({"power_ac": 30400, "power_ac_scale": -1}, timestamp=1) == {"power_ac": 30400, "power_ac_scale": -1}
+
+
+def test_not_implemented(simulator, inverter, changes):
+    changes.filter(inverter.read_all(scaled=True), timestamp=0)
+    assert changes.filter(inverter.read_all(scaled=True), timestamp=1) == {}
+
+    # A value that stops being implemented is passed on, even if it was
+    # zero before
+    simulator.units[1]["Inverter"].values["power_ac"] = 0
+    simulator.units[1].refresh(force=True)
+    assert changes.filter(inverter.read_all(scaled=True), timestamp=2)["power_ac"] == 0
+
+    simulator.units[1]["Inverter"].unimplemented.add("power_ac")
+    simulator.units[1].refresh(force=True)
+    values = changes.filter(inverter.read_all(scaled=True), timestamp=3)
+
+    assert "power_ac" in values
+    assert not solaredge_modbus.implemented(values["power_ac"])
+    assert changes.filter(inverter.read_all(scaled=True), timestamp=4) == {}
@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+import solaredge_modbus
+from solaredge_modbus import registerDataType, registerType
+
+
+# A register of each data type, and the device that has it. Strings are
+# all identity registers, which read_all() serves from its cache.
+REGISTERS = [
+    ("UINT16", "Inverter", "current"),
+    ("UINT32", "Meter1", "export_energy_active"),
+    ("UINT64", "Battery1", "lifetime_export_energy_counter"),
+    ("INT16", "Meter1", "current"),
+    ("SCALE", "Inverter", "current_scale"),
+    ("ACC32", "Inverter", "energy_total"),
+    ("FLOAT32", "Inverter", "cosphi"),
+    ("SEFLOAT", "Battery1", "average_temperature"),
+    ("INT32", "Inverter", "reactive_power_config"),
+    ("STRING", "Inverter", "c_version")
+]
+
+
+@pytest.fixture
+def devices(inverter):
+    devices = {
+        "Inverter": inverter,
+        "Meter1": solaredge_modbus.Meter(offset=0, parent=inverter),
+        "Battery1": solaredge_modbus.Battery(offset=0, parent=inverter)
+    }
+
+    yield devices
+
+    for device in devices.values():
+        device.close()
+
+
+@pytest.mark.parametrize("dtype, name, key", REGISTERS, ids=[dtype for dtype, name, key in REGISTERS])
+def test_not_implemented(simulator, devices, dtype, name, key):
+    device = devices[name]
+    assert device.register_table[key][3] == registerDataType[dtype]
+    vtype = device.register_table[key][4]
+    unit = simulator.units[1]
+
+    unit[name].unimplemented.add(key)
+    unit.refresh(force=True)
+
+    value = device.read(key)[key]
+    assert value == vtype(False)
+    assert not solaredge_modbus.implemented(value)
+
+    if key not in device.register_groups["identity"]:
+        value = device.read_all()[key]
+        assert value == vtype(False)
+        assert not solaredge_modbus.implemented(value)
+
+
+@pytest.mark.parametrize("dtype, registers, value", [
+    (registerDataType.INT16, [0x8000], 0),
+    (registerDataType.INT16, [0x8001], -32767),
+    (registerDataType.INT32, [0x8000, 0x0000], 0),
+    (registerDataType.INT32, [0x8000, 0x0001], -2147483647)
+])
+def test_signed_not_implemented(dtype, registers, value):
+    # Only the exact bit pattern is not implemented
+    block = solaredge_modbus._ReadBlock(registerType.HOLDING, 0, len(registers), (("value", 0, len(registers), dtype, int),))
+
+    assert block.decode(registers)["value"] == value
+
+
+def test_scale_not_implemented(simulator, inverter, tmp_path):
+    # A scale factor that is not implemented reads as 0, which must not be
+    # taken as a factor of 1
+    unit = simulator.units[1]
+    recorder = solaredge_modbus.Recorder(tmp_path / "capture.bin")
+
+    unit["Inverter"].unimplemented.add("power_ac_scale")
+    unit.refresh(force=True)
+    inverter.recorder = recorder
+
+    try:
+        values = inverter.read_all(scaled=True)
+    finally:
+        inverter.recorder = None
+        recorder.close()
+
+    assert values["power_ac"] == 0
+    assert not solaredge_modbus.implemented(values["power_ac"])
+    assert solaredge_modbus.implemented(values["power_dc"])
+
+    columns = solaredge_modbus.Capture(tmp_path / "capture.bin").columns([inverter], scaled=True)
+    columns = next(columns for device, columns in columns if "power_ac" in columns)
+
+    assert math.isnan(columns["power_ac"][0])
+    assert columns["power_dc"][0] == pytest.approx(values["power_dc"])
@@ -0,0 +1,45 @@
+import os
+
+from solaredge_modbus.export import Spool
+
+
+def test_spool_size_counts_pending_records(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    record = "x" * 97
+    spool = Spool(str(path), max_size=1000)
+
+    # Ten records of 100 bytes fill it
+    assert all(spool.append([f"{n}{record[1:]}"]) for n in range(10))
+    assert not spool.append([record])
+    assert spool.dropped == 1
+
+    # Replayed records make room again, and are dropped from the file
+    assert [r[0] for r in spool.read(4)] == ["0", "1", "2", "3"]
+    spool.commit()
+    assert spool.size() == 600
+
+    assert spool.append([f"a{record[1:]}"] * 4)
+    assert os.path.getsize(path) == 1000
+    assert spool.size() == 1000
+    assert not spool.append([record])
+
+    assert [r[0] for r in spool.read(10)] == ["4", "5", "6", "7", "8", "9", "a", "a", "a", "a"]
+    spool.commit()
+    assert spool.size() == 0
+    spool.close()
+
+
+def test_spool_compact_while_replaying(tmp_path):
+    # Records read but not committed yet survive a compaction
+    spool = Spool(str(tmp_path / "spool.jsonl"), max_size=60)
+
+    assert spool.append([1, 2, 3, 4, 5])
+    spool.read(2)
+    spool.commit()
+    assert spool.read(1) == [3]
+
+    assert spool.append(["x" * 48])
+    spool.commit()
+
+    assert spool.read(10) == [4, 5, "x" * 48]
+    spool.close()
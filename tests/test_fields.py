@@ -0,0 +1,33 @@
+import pytest
+
+
+def test_read_fields(simulator, inverter):
+    keys = ["power_ac", "power_dc", "status"]
+    requests = simulator.requests
+
+    values = inverter.read_fields(keys)
+
+    # Only the keys and their scale factors are returned, read with as few
+    # requests as the cover has blocks
+    assert set(values) == {"power_ac", "power_ac_scale", "power_dc", "power_dc_scale", "status"}
+    assert simulator.requests - requests == len(inverter._read_cover(frozenset(keys)))
+
+    scaled = inverter.read_fields(keys, scaled=True)
+    expected = inverter.read_all(scaled=True)
+
+    assert set(scaled) == set(keys)
+    assert scaled == {key: pytest.approx(expected[key]) for key in keys}
+
+
+def test_read_fields_unknown(inverter):
+    with pytest.raises(KeyError):
+        inverter.read_fields(["power_ac", "unknown"])
+
+
+def test_cover_limits(inverter):
+    # Keys all over the map are covered by requests of at most 125 registers
+    cover = inverter._read_cover(frozenset(inverter.register_table))
+    keys = {field[0] for block in cover for field in block.fields}
+
+    assert keys == set(inverter.register_table)
+    assert all(block.length <= 125 for block in cover)
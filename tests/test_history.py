@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+
+def test_scaled_samples(inverter):
+    history = inverter.enable_history(4)
+
+    scaled = inverter.read_all(scaled=True)
+    sample = history.latest()
+    inverter.read_all()
+
+    assert "current_scale" not in history.keys
+    assert history.latest()["current"] == sample["current"] == pytest.approx(scaled["current"])
+
+
+def test_unscaled_fields(inverter):
+    history = inverter.enable_history(4, ["current", "status"])
+
+    scaled = inverter.read_fields(["current", "status"], scaled=True)
+    inverter.read_fields(["current", "status"])
+
+    assert history.latest()["current"] == pytest.approx(scaled["current"])
+    assert history.latest()["status"] == 4
+
+
+def test_not_implemented(simulator, inverter):
+    history = inverter.enable_history(4, ["current", "l2_current", "status"])
+    unit = simulator.units[1]
+
+    unit["Inverter"].unimplemented.update(("l2_current", "status"))
+    unit.refresh(force=True)
+    inverter.read_all()
+
+    sample = history.latest()
+    assert math.isnan(sample["l2_current"])
+    assert math.isnan(sample["status"])
+    assert sample["current"] > 0
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.fixture
+def configs(inverter):
+    # Discovery configs per device class and register
+    configs = {}
+
+    for device in (inverter, inverter.discover()["Meter1"]):
+        messages = solaredge_modbus.HomeAssistantDiscovery().messages([(device, device.read_all(scaled=True))])
+        configs[device.__class__.__name__] = {topic.split("/")[-2]: json.loads(payload) for topic, payload in messages}
+
+    return configs
+
+
+def test_units(configs):
+    assert configs["Inverter"]["power_ac"]["unit_of_measurement"] == "W"
+    assert configs["Inverter"]["power_ac"]["device_class"] == "power"
+    assert configs["Inverter"]["power_factor"]["unit_of_measurement"] == "%"
+    assert not [key for key in configs["Inverter"] if key.endswith("_scale")]
+
+
+@pytest.mark.parametrize("key", ["power_factor", "l1_power_factor"])
+def test_without_unit(configs, key):
+    config = configs["Meter"][key]
+
+    assert "unit_of_measurement" not in config
+    assert config["device_class"] == "power_factor"
+    assert config["state_class"] == "measurement"
+
+
+def test_not_implemented(simulator, inverter):
+    simulator.units[1]["Inverter"].unimplemented.update(("l2_current", "temperature"))
+    simulator.units[1].refresh(force=True)
+    values = inverter.read_all(scaled=True)
+
+    discovery = solaredge_modbus.HomeAssistantDiscovery()
+    entities = {topic.split("/")[-2] for topic, payload in discovery.messages([(inverter, values)])}
+    topic, payload = discovery.state(inverter, values)
+    state = json.loads(payload)
+
+    assert "current" in entities
+    assert "l2_current" not in entities
+    assert "temperature" not in entities
+    assert state["l2_current"] is None
+    assert state["temperature"] is None
+    assert state["current"] > 0
@@ -0,0 +1,34 @@
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Inverter", "c_serialnumber"),
+    ("Inverter", "c_sunspec_did"),
+    ("Meter1", "c_serialnumber"),
+    ("Battery1", "c_serialnumber"),
+    ("Battery1", "c_sunspec_did")
+])
+def test_identity_change(simulator, inverter, name, key):
+    # Keep the read plan from changing with the timings of the requests
+    inverter.link_cost = solaredge_modbus.LinkCost.tcp(adaptive=False)
+    device = inverter if name == "Inverter" else inverter.discover()[name]
+    simulated = simulator.units[1][name]
+
+    device.read_all()
+
+    # Cached identity registers are not read again
+    requests = simulator.requests
+    device.read_all()
+    assert simulator.requests - requests == len(device._read_plan()) - len(device._identity_blocks())
+
+    # Replacing the device changes the probed registers, and the cached
+    # ones are read again
+    simulated.values[key] = 7 if key == "c_sunspec_did" else "replaced"
+    simulated.values["c_model"] = "replaced"
+    simulator.units[1].refresh(force=True)
+
+    values = device.read_all()
+    assert values[key] == simulated.values[key]
+    assert values["c_model"] == "replaced"
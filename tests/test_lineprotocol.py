@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.fixture
+def readings(inverter):
+    devices = [inverter, *inverter.discover().values()]
+
+    return {device.__class__.__name__: (device, device.read_all(scaled=True)) for device in devices}
+
+
+def _split(line):
+    return re.split(r"(?<!\\) ", line)
+
+
+def _fields(line):
+    measurement, fields, timestamp = _split(line)
+    return dict(field.split("=") for field in fields.split(","))
+
+
+def test_field_types(readings):
+    line_protocol = solaredge_modbus.LineProtocol()
+    line_protocol.add_all(readings.values(), timestamp=0)
+    lines = dict(zip(readings, line_protocol.payload().split("\n")))
+
+    # Integers are floats, except on batteries
+    assert _fields(lines["Inverter"])["status"] == "4"
+    assert _fields(lines["Meter"])["c_sunspec_did"] == "203"
+    assert _fields(lines["Battery"])["status"] == "4i"
+
+    # Numeric tags are fields as well
+    for line in lines.values():
+        assert "c_sunspec_did=" in _split(line)[0]
+        assert {"c_deviceaddress", "c_sunspec_did"} <= set(_fields(line))
+
+
+@pytest.mark.parametrize("integers, suffix", [(True, "i"), (False, "")])
+def test_integers(readings, integers, suffix):
+    line_protocol = solaredge_modbus.LineProtocol(integers=integers)
+
+    for device, values in readings.values():
+        line_protocol.add(device, values, timestamp=0)
+        assert _fields(line_protocol.payload())["c_deviceaddress"] == f"1{suffix}"
+
+
+def test_not_implemented(simulator, inverter):
+    simulator.units[1]["Inverter"].unimplemented.update(("l2_current", "status", "c_version"))
+    simulator.units[1].refresh(force=True)
+    values = inverter.read_all(scaled=True)
+
+    line_protocol = solaredge_modbus.LineProtocol(integers=True)
+    line_protocol.add(inverter, values, timestamp=0)
+    line = line_protocol.payload()
+    fields = _fields(line)
+
+    assert "current" in fields
+    assert "l2_current" not in fields
+    assert "status" not in fields
+    assert "c_version=" not in _split(line)[0]
+    assert "c_serialnumber=" in _split(line)[0]
@@ -0,0 +1,60 @@
+import random
+import threading
+
+import pytest
+
+import solaredge_modbus
+
+
+@pytest.mark.parametrize("cost", [
+    solaredge_modbus.LinkCost.tcp(),
+    solaredge_modbus.LinkCost.rtu(9600),
+    solaredge_modbus.LinkCost.rtu(115200)
+], ids=["tcp", "rtu9600", "rtu115200"])
+def test_bridge_gap_settles(cost):
+    # Noisy timings on a steady link do not move the bridge gap around
+    rng = random.Random(1)
+    request_overhead, register_cost = cost.request_overhead, cost.register_cost
+    gaps = set()
+
+    for i in range(2000):
+        length = rng.choice((2, 10, 40, 70, 125))
+        cost.observe(length, request_overhead + length * register_cost + rng.gauss(0, request_overhead * 0.2))
+
+        if i >= 100:
+            gaps.add(cost.bridge_gap)
+
+    assert len(gaps) == 1
+
+
+def test_bridge_gap_follows_link():
+    cost = solaredge_modbus.LinkCost.tcp()
+    assert cost.bridge_gap == solaredge_modbus.MAX_READ_LENGTH
+
+    cost.request_overhead = cost.register_cost * 20
+    assert cost.bridge_gap == 16
+
+    # Within the hysteresis of the current step
+    cost.request_overhead = cost.register_cost * 13
+    assert cost.bridge_gap == 16
+
+    cost.request_overhead = cost.register_cost * 11
+    assert cost.bridge_gap == 8
+
+
+def test_observe_threads():
+    # Devices sharing a connection observe requests from their own threads
+    cost = solaredge_modbus.LinkCost.tcp()
+    threads = [
+        threading.Thread(target=lambda: [cost.observe(length, 0.01 + length * 0.0001) for length in (2, 125) * 5000])
+        for i in range(4)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cost._n == pytest.approx((1 - cost.decay ** 40000) / (1 - cost.decay))
+    assert cost.request_overhead == pytest.approx(0.01)
+    assert cost.register_cost == pytest.approx(0.0001)
@@ -0,0 +1,39 @@
+import threading
+import types
+
+import solaredge_modbus
+from solaredge_modbus import registerType
+
+
+def test_concurrent_updates():
+    metrics = solaredge_modbus.Metrics()
+    devices = [
+        types.SimpleNamespace(_connection=types.SimpleNamespace(label=f"10.0.0.{n}:1502"), unit=1, model="Inverter")
+        for n in range(4)
+    ]
+    threads = 8
+    requests = 5000
+
+    def poll(n):
+        device = devices[n % len(devices)]
+
+        for i in range(requests):
+            metrics.request_finished(device, registerType.HOLDING, 40000, 10, "ok", 0.01, 0)
+            metrics.decoded(device, None, {}, 0.001)
+
+    workers = [threading.Thread(target=poll, args=(n,)) for n in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    while any(worker.is_alive() for worker in workers):
+        metrics.as_dict()
+
+    for worker in workers:
+        worker.join()
+
+    connections = metrics.as_dict()["connections"]
+
+    assert sum(connection["requests"]["ok"] for connection in connections.values()) == threads * requests
+    assert sum(connection["registers"] for connection in connections.values()) == threads * requests * 10
+    assert sum(connection["decode_seconds"]["count"] for connection in connections.values()) == threads * requests
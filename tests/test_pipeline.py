@@ -0,0 +1,112 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+import solaredge_modbus
+
+
+class Gateway:
+
+    # A Modbus TCP server that answers each read with whatever frame
+    # `reply(tid, unit, function, count)` makes of it
+    def __init__(self, reply):
+        self.reply = reply
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        connection, address = self.server.accept()
+        buffer = b""
+
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(4096)
+                except OSError:
+                    return
+
+                if not data:
+                    return
+
+                buffer += data
+
+                while len(buffer) >= 12:
+                    tid, protocol, length, unit, function, address, count = struct.unpack_from(">HHHBBHH", buffer)
+                    buffer = buffer[12:]
+                    connection.sendall(self.reply(tid, unit, function, count))
+
+    def close(self):
+        self.server.close()
+
+
+def _frame(tid, unit, pdu, protocol=0):
+    return struct.pack(">HHHB", tid, protocol, len(pdu) + 1, unit) + pdu
+
+
+def _registers(function, count):
+    return struct.pack(f">BB{count}H", function, count * 2, *range(count))
+
+
+REPLIES = {
+    "ok": lambda tid, unit, function, count: _frame(tid, unit, _registers(function, count)),
+    "short": lambda tid, unit, function, count: _frame(tid, unit, _registers(function, count)[:-2]),
+    "no data": lambda tid, unit, function, count: _frame(tid, unit, bytes((function, count * 2))),
+    "empty": lambda tid, unit, function, count: _frame(tid, unit, b""),
+    "unit": lambda tid, unit, function, count: _frame(tid, unit + 1, _registers(function, count)),
+    "function": lambda tid, unit, function, count: _frame(tid, unit, _registers(function + 1, count)),
+    "busy": lambda tid, unit, function, count: _frame(tid, unit, bytes((function | 0x80, 6))),
+    "protocol": lambda tid, unit, function, count: _frame(tid, unit, _registers(function, count), protocol=1)
+}
+
+
+@pytest.fixture
+def pipeline():
+    # Pipeline the first blocks of an inverter's read plan, the second one
+    # answered with the given reply
+    gateways = []
+
+    def pipeline(reply):
+        replies = iter([REPLIES["ok"], REPLIES[reply], REPLIES["ok"]])
+        gateway = Gateway(lambda *request: next(replies, REPLIES["ok"])(*request))
+        gateways.append(gateway)
+
+        inverter = solaredge_modbus.Inverter(host="127.0.0.1", port=gateway.port, timeout=1)
+        requests = [(inverter, block) for block in inverter._read_plan()[:3]]
+
+        try:
+            return solaredge_modbus._pipeline_requests(inverter.client, requests, inverter.timeout)
+        finally:
+            inverter.close()
+
+    yield pipeline
+
+    for gateway in gateways:
+        gateway.close()
+
+
+@pytest.mark.parametrize("reply, result", [
+    ("short", "short"),
+    ("no data", "short"),
+    ("empty", "error"),
+    ("unit", "error"),
+    ("function", "error"),
+    ("busy", "busy")
+])
+def test_malformed_reply(pipeline, reply, result):
+    responses, failed, results = pipeline(reply)
+
+    assert sorted(responses) == [0, 2]
+    assert results == {1: result}
+    assert not failed
+
+
+def test_not_modbus_tcp(pipeline):
+    # A frame with another protocol id leaves the stream unreadable
+    responses, failed, results = pipeline("protocol")
+
+    assert 1 not in responses
+    assert results.get(1) == "error"
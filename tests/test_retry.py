@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+import solaredge_modbus
+
+
+def test_breaker():
+    breaker = solaredge_modbus.CircuitBreaker(failures=2, timeout=10, max_timeout=30)
+
+    breaker.failure(0)
+    assert breaker.state == "closed"
+    breaker.failure(1)
+    assert breaker.state == "open"
+    assert not breaker.allow(10)
+
+    # A single probe is let through once the timeout expired
+    assert breaker.allow(11)
+    assert breaker.state == "half-open"
+    assert not breaker.allow(11)
+
+    # A failed probe keeps it open twice as long, up to max_timeout
+    breaker.failure(11)
+    assert breaker.open_until == 31
+    assert breaker.allow(31)
+    breaker.failure(31)
+    assert breaker.open_until == 61
+
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.timeout == 10
+    assert breaker.trips == 3
+
+
+def test_retry_policy():
+    policy = solaredge_modbus.RetryPolicy(backoff=0.1, multiplier=2, max_backoff=0.3, jitter=0.5)
+
+    assert [policy.retry(result) for result in ("error", "short", "busy", "exception")] == [True, True, True, False]
+
+    for retry, delay in enumerate((0.1, 0.2, 0.3, 0.3)):
+        assert delay * 0.5 <= policy.delay(retry) <= delay * 1.5
+
+    assert solaredge_modbus.RetryPolicy(breaker_failures=0).breaker() is None
+
+
+@pytest.fixture
+def absent(simulator):
+    # Unit 2 does not answer, its breaker opens after two failed requests
+    inverter = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port, timeout=0.2, retries=1)
+    absent = solaredge_modbus.Inverter(parent=inverter, unit=2)
+    absent.retry_policy = solaredge_modbus.RetryPolicy(breaker_failures=2)
+
+    try:
+        yield inverter, absent
+    finally:
+        absent.close()
+        inverter.close()
+
+
+def test_absent_unit(simulator, absent):
+    inverter, absent = absent
+
+    assert absent.read_all() == {}
+    assert absent.circuit_breaker.state == "open"
+    assert absent.circuit_breaker.failures == 2
+
+    # Reads are skipped without waiting for a timeout, the other unit on
+    # the connection is read as usual
+    start = time.monotonic()
+    assert absent.read_all() == {}
+    assert time.monotonic() - start < 0.1
+    assert inverter.read_all()["c_serialnumber"] == simulator.units[1]["Inverter"].values["c_serialnumber"]
+    assert inverter.circuit_breaker is not absent.circuit_breaker
+    assert inverter.circuit_breaker.state == "closed"
+
+
+def test_absent_unit_pipelined(simulator, absent):
+    inverter, absent = absent
+
+    # The requests to the absent unit time out together, as one failure
+    values, missing = solaredge_modbus.read_all_pipelined([inverter, absent])
+
+    assert values["c_serialnumber"] == simulator.units[1]["Inverter"].values["c_serialnumber"]
+    assert missing == {}
+    assert absent.circuit_breaker.failures == 1
+
+    values, missing = solaredge_modbus.read_all_pipelined([inverter, absent])
+
+    assert missing == {}
+    assert absent.circuit_breaker.state == "open"
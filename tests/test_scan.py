@@ -0,0 +1,41 @@
+import pytest
+
+import solaredge_modbus
+from solaredge_modbus.simulator import Simulator
+
+
+@pytest.fixture
+def serial():
+    with Simulator(seed=1, tick=60, framer="pty") as simulator:
+        simulator.units.clear()
+        yield simulator
+
+
+def test_scan_tcp(empty_simulator):
+    simulator = empty_simulator
+    simulator.add_unit(2)
+    simulator.add_unit(5)
+
+    inverters = solaredge_modbus.scan(host=simulator.host, port=simulator.port, units=range(1, 8), probe_timeout=0.2)
+
+    try:
+        assert [inverter.unit for inverter in inverters] == [2, 5]
+        assert inverters[0]._connection is inverters[1]._connection
+        assert inverters[1].read_all()["c_serialnumber"] == simulator.units[5]["Inverter"].values["c_serialnumber"]
+    finally:
+        for inverter in inverters:
+            inverter.close()
+
+
+def test_scan_rtu(serial):
+    serial.add_unit(2)
+    serial.add_unit(4)
+
+    inverters = solaredge_modbus.scan(device=serial.device, baud=115200, units=range(1, 6), probe_timeout=0.2)
+
+    try:
+        assert [inverter.unit for inverter in inverters] == [2, 4]
+        assert inverters[0].read_all()["c_serialnumber"] == serial.units[2]["Inverter"].values["c_serialnumber"]
+    finally:
+        for inverter in inverters:
+            inverter.close()
@@ -0,0 +1,91 @@
+import solaredge_modbus
+
+
+class Clock:
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Device:
+
+    # Stands in for a device, each read taking `duration` on the clock
+    model = "Inverter"
+    unit = 1
+    register_groups = {"power": ("power_ac",), "energy": ("energy_total",)}
+
+    def __init__(self, clock, duration=0, error=None):
+        self.clock = clock
+        self.duration = duration
+        self.error = error
+        self.reads = []
+
+    def read_fields(self, keys, scaled=False):
+        self.reads.append((self.clock(), sorted(keys)))
+        self.clock.now += self.duration
+
+        if self.error:
+            raise self.error
+
+        return {key: 0 for key in keys}
+
+
+def test_release_on_ticks():
+    clock = Clock(13)
+    scheduler = solaredge_modbus.Scheduler(clock)
+    read = scheduler.add(Device(clock), "power", 10, phase=2)
+
+    assert read.release == 22
+    assert read.deadline == 32
+    assert scheduler.run_pending() == 0
+
+    clock.now = 22.5
+    assert scheduler.run_pending() == 1
+    assert read.release == 32
+    assert read.max_lateness == 0.5
+
+
+def test_earliest_deadline_first():
+    clock = Clock(0)
+    scheduler = solaredge_modbus.Scheduler(clock)
+    device = Device(clock)
+    callbacks = []
+
+    scheduler.add(device, "energy", 60, lambda device, values, timestamp: callbacks.append("energy"))
+    scheduler.add(device, "power", 1, lambda device, values, timestamp: callbacks.append("power"))
+
+    clock.now = 60
+    assert scheduler.run_pending() == 2
+    assert callbacks == ["power", "energy"]
+    assert device.reads == [(60, ["power_ac"]), (60, ["energy_total"])]
+
+
+def test_overrun():
+    clock = Clock(0)
+    scheduler = solaredge_modbus.Scheduler(clock)
+    read = scheduler.add(Device(clock, duration=3.5), "power", 1)
+
+    clock.now = 1
+    scheduler.run_pending()
+
+    # The read took past its deadline, and the ticks it ran over are skipped
+    assert read.overruns == 1
+    assert read.release == 5
+    assert read.skipped == 3
+    assert scheduler.stats()["Inverter@1.power"]["utilisation"] == 3.5
+
+
+def test_errors():
+    clock = Clock(0)
+    scheduler = solaredge_modbus.Scheduler(clock)
+    error = OSError("no route to host")
+    read = scheduler.add(Device(clock, error=error), ["power_ac"], 1)
+
+    clock.now = 1
+    assert scheduler.run_pending() == 1
+    assert read.errors == 1
+    assert read.last_error is error
+    assert read.release == 2
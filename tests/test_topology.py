@@ -0,0 +1,25 @@
+import solaredge_modbus
+
+
+def test_discover_follower(empty_simulator):
+    # The follower has a different meter and battery layout than unit 1
+    simulator = empty_simulator
+    simulator.add_unit(1, meters=1, batteries=0)
+    follower = simulator.add_unit(2, meters=2, batteries=1)
+
+    master = solaredge_modbus.Inverter(host=simulator.host, port=simulator.port)
+    inverter = solaredge_modbus.Inverter(parent=master, unit=2)
+
+    try:
+        devices = inverter.discover()
+
+        assert sorted(devices) == ["Battery1", "Meter1", "Meter2"]
+        assert all(device.unit == 2 for device in devices.values())
+
+        values = devices["Meter2"].read_all()
+        assert values["c_serialnumber"] == follower["Meter2"].values["c_serialnumber"]
+
+        assert sorted(master.discover()) == ["Meter1"]
+    finally:
+        inverter.close()
+        master.close()